@@ -0,0 +1,60 @@
+import time
+import numpy as np
+from src.atropos_env import SLAMAtroposEnv
+
+# --- Configuration ---
+NUM_STEPS = 200_000
+
+# --- Reference Implementation ---
+class LegacySLAMAtroposEnv(SLAMAtroposEnv):
+    """The original step(): Python scalar state, one np.random.normal call and a fresh observation per step."""
+    def reset(self, seed=None, options=None):
+        observation, info = super().reset(seed=seed, options=options)
+        self.fps, self.drift, self.keypoints, self.loop, self.semantic = (30.0, 1.0, 50, 0.1, 0.2)
+        return observation.copy(), info
+
+    def step(self, action):
+        self.step_count += 1
+        if action == 0:
+            self.fps -= 5
+            self.drift -= 0.1
+            self.keypoints += 20
+        elif action == 1:
+            self.fps += 5
+            self.drift += 0.15
+            self.keypoints -= 20
+        elif action == 2:
+            self.fps -= 2
+            self.drift -= 0.25
+            self.loop += 0.2
+            self.semantic += 0.15
+        self.drift += np.random.normal(0.0, 0.05)
+        self.loop *= 0.98
+        self.semantic *= 0.99
+        self.fps = np.clip(self.fps, 0, 120)
+        self.drift = max(0, self.drift)
+        self.keypoints = np.clip(self.keypoints, 0, 500)
+        self.loop = np.clip(self.loop, 0.0, 1.0)
+        self.semantic = np.clip(self.semantic, 0.0, 1.0)
+        reward = -self.drift - (0.2 / (self.fps + 1e-6))
+        terminated = self.step_count >= self.max_steps
+        observation = np.array([self.fps, self.drift, self.keypoints, self.loop, self.semantic], dtype=np.float32)
+        return observation, reward, terminated, False, {}
+
+# --- Benchmarking Function ---
+def steps_per_second(env, actions) -> float:
+    env.reset(seed=0)
+    start_time = time.perf_counter()
+    for action in actions:
+        _, _, terminated, _, _ = env.step(action)
+        if terminated:
+            env.reset()
+    return len(actions) / (time.perf_counter() - start_time)
+
+# --- Main ---
+if __name__ == "__main__":
+    actions = np.random.default_rng(0).integers(0, 3, size=NUM_STEPS).tolist()
+    before = steps_per_second(LegacySLAMAtroposEnv(), actions)
+    after = steps_per_second(SLAMAtroposEnv({"reuse_obs_buffer": True}), actions)
+    print(f"  before: {before:>10,.0f} steps/s")
+    print(f"  after : {after:>10,.0f} steps/s ({after / before:.1f}x)")
@@ -1,126 +1,199 @@
+import argparse
+import csv
+import json
 import time
 import numpy as np
 from qdrant_client import QdrantClient, models
-import google.generativeai as genai
 import os
 from dotenv import load_dotenv
 import sys
+from src.embedders import get_embedder
 
-# --- Gemini API Key Configuration ---
+# --- Embedding Backend Configuration ---
 load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    print("Error: GEMINI_API_KEY not found.")
-    sys.exit(1)
-genai.configure(api_key=GEMINI_API_KEY)
+embedder = get_embedder()
 
-# --- Qdrant Client ---
-client = QdrantClient(":memory:")
-
-# --- Embedding Function ---
-def gemini_embed(captions: list[str], task_type: str):
-    result = genai.embed_content(model="models/embedding-001", content=captions, task_type=task_type)
-    return result['embedding']
+COLLECTION_NAME = "hnsw_benchmark"
+UPSERT_BATCH_SIZE = 256
 
 # --- Load Captions ---
-def load_captions(filepath: str) -> list:
+def load_captions(filepath: str, limit: int = None) -> list:
     """Loads captions from the specified file."""
     if not os.path.exists(filepath):
         print(f"Error: Captions file not found at {filepath}")
         sys.exit(1)
-    
+
     keyframes = []
     with open(filepath, "r") as f:
         for i, line in enumerate(f):
+            if limit and i >= limit:
+                break
             parts = line.strip().split('\t')
-            if len(parts) == 2:
-                filename, caption = parts
-                keyframes.append({"id": i, "filename": filename, "caption": caption})
+            if len(parts) >= 2:
+                keyframes.append({"id": i, "filename": parts[0], "caption": parts[1]})
     return keyframes
 
-# --- Benchmarking Function ---
-def benchmark_hnsw(keyframes: list, m: int, ef_construct: int, ef_search: int):
-    """Benchmarks HNSW performance for a given set of parameters."""
-    # Create a new collection with the specified parameters
-    if client.collection_exists("slam_keyframes"):
-        client.delete_collection("slam_keyframes")
-    
+# --- Ground Truth ---
+def exact_knn(corpus: np.ndarray, queries: np.ndarray, k: int):
+    """
+    Returns the row indices of the exact top-k cosine neighbours of each
+    query (best first) and the k-th best score of each query.
+    """
+    corpus = corpus / np.maximum(np.linalg.norm(corpus, axis=1, keepdims=True), 1e-12)
+    queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+    neighbours = np.empty((len(queries), k), dtype=np.int64)
+    kth_scores = np.empty(len(queries), dtype=np.float32)
+    for start in range(0, len(queries), 1024):
+        scores = queries[start:start + 1024] @ corpus.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        neighbours[start:start + 1024] = np.take_along_axis(top, order, axis=1)
+        kth_scores[start:start + 1024] = top_scores.min(axis=1)
+    return neighbours, kth_scores
+
+# --- Benchmarking Functions ---
+def build_collection(client: QdrantClient, ids: list, corpus: np.ndarray, m: int, ef_construct: int) -> float:
+    """(Re)builds the collection with the given HNSW parameters and returns the build time in seconds."""
+    if client.collection_exists(COLLECTION_NAME):
+        client.delete_collection(COLLECTION_NAME)
+
+    start_time = time.perf_counter()
     client.create_collection(
-        collection_name="slam_keyframes",
-        vectors_config=models.VectorParams(size=768, distance=models.Distance.COSINE),
-        hnsw_config=models.HnswConfigDiff(m=m, ef_construct=ef_construct)
+        collection_name=COLLECTION_NAME,
+        vectors_config=models.VectorParams(size=corpus.shape[1], distance=models.Distance.COSINE),
+        hnsw_config=models.HnswConfigDiff(m=m, ef_construct=ef_construct, full_scan_threshold=1),
+        optimizers_config=models.OptimizersConfigDiff(indexing_threshold=1),
     )
+    for start in range(0, len(ids), UPSERT_BATCH_SIZE):
+        client.upsert(
+            collection_name=COLLECTION_NAME,
+            points=models.Batch(
+                ids=ids[start:start + UPSERT_BATCH_SIZE],
+                vectors=corpus[start:start + UPSERT_BATCH_SIZE].tolist(),
+            ),
+            wait=True,
+        )
+    # A server builds the HNSW graph asynchronously; wait until it is done.
+    while client.get_collection(COLLECTION_NAME).status != models.CollectionStatus.GREEN:
+        time.sleep(0.05)
+    return time.perf_counter() - start_time
 
-    # Index the keyframes
-    captions_batch = [k["caption"] for k in keyframes]
-    embeddings = gemini_embed(captions_batch, task_type="RETRIEVAL_DOCUMENT")
-    client.upsert(
-        collection_name="slam_keyframes",
-        points=[
-            models.PointStruct(id=k["id"], vector=emb, payload={"caption": k["caption"], "filename": k["filename"]})
-            for k, emb in zip(keyframes, embeddings)
-        ],
-        wait=True,
-    )
+def estimate_index_bytes(n: int, dim: int, m: int) -> int:
+    """Float32 vectors plus HNSW links (2*m neighbours on layer 0, ~m above it) as 4-byte IDs."""
+    return n * dim * 4 + n * (2 * m + m // 2) * 4
 
-    # Run a series of queries and measure performance
-    query_latencies = []
-    recalls = []
-    for i in range(100):
-        # Select a random keyframe as the query
-        query_keyframe = np.random.choice(keyframes)
-        query_caption = query_keyframe["caption"]
-        query_embedding = gemini_embed([query_caption], task_type="RETRIEVAL_QUERY")[0]
+def run_queries(client: QdrantClient, queries: np.ndarray, kth_scores: np.ndarray, ef_search: int, k: int) -> dict:
+    """
+    Runs every query once and reports recall@k, latency percentiles and QPS.
 
-        # Measure query latency
+    A result counts as a true neighbour if its score reaches the exact k-th
+    best score, so ties between equally similar keyframes are not penalised.
+    """
+    latencies = []
+    recalls = []
+    total_start = time.perf_counter()
+    for query, kth_score in zip(queries, kth_scores):
         start_time = time.perf_counter()
         search_results = client.query_points(
-            collection_name="slam_keyframes",
-            query=query_embedding,
-            limit=10,
-            search_params=models.SearchParams(hnsw_ef=ef_search)
+            collection_name=COLLECTION_NAME,
+            query=query.tolist(),
+            limit=k,
+            search_params=models.SearchParams(hnsw_ef=ef_search, exact=False),
         )
-        end_time = time.perf_counter()
-        query_latencies.append((end_time - start_time) * 1000)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+        hits = sum(point.score >= kth_score - 1e-5 for point in search_results.points)
+        recalls.append(min(hits, k) / k)
+    total_s = time.perf_counter() - total_start
 
-        # Measure recall
-        retrieved_ids = {result.id for result in search_results.points}
-        ground_truth_ids = {query_keyframe["id"]}
-        recall = len(retrieved_ids.intersection(ground_truth_ids)) / len(ground_truth_ids)
-        recalls.append(recall)
+    return {
+        f"recall@{k}": float(np.mean(recalls)),
+        "latency_ms_p50": float(np.percentile(latencies, 50)),
+        "latency_ms_p95": float(np.percentile(latencies, 95)),
+        "latency_ms_p99": float(np.percentile(latencies, 99)),
+        "qps": len(queries) / total_s,
+    }
 
-    return np.mean(query_latencies), np.mean(recalls)
+def run_suite(captions_file: str, m_values: list, ef_construct_values: list, ef_search_values: list,
+              num_queries: int = 100, k: int = 10, limit: int = None, url: str = None, seed: int = 0) -> list:
+    """
+    Sweeps HNSW parameters against exact kNN ground truth.
 
-# --- Main ---
-if __name__ == "__main__":
-    keyframes = load_captions("captions.txt")
+    The corpus and the queries are embedded once; the collection is rebuilt
+    once per (m, ef_construct) and every ef_search is measured against it.
+    """
+    keyframes = load_captions(captions_file, limit=limit)
     if not keyframes:
         print("Error: No keyframes were loaded. Exiting.")
         sys.exit(1)
 
-    # Define the parameter grid to search
-    m_values = [8, 16, 32, 64]
-    ef_construct_values = [64, 128, 256, 512]
-    ef_search_values = [32, 64, 128, 256]
+    print(f"Embedding {len(keyframes)} keyframes and {num_queries} queries once...")
+    ids = np.array([k["id"] for k in keyframes], dtype=np.int64)
+    corpus = embedder.embed([k["caption"] for k in keyframes], task_type="RETRIEVAL_DOCUMENT")
+    rng = np.random.default_rng(seed)
+    query_rows = rng.choice(len(keyframes), size=min(num_queries, len(keyframes)), replace=False)
+    queries = embedder.embed([keyframes[i]["caption"] for i in query_rows], task_type="RETRIEVAL_QUERY")
+    _, kth_scores = exact_knn(corpus, queries, k)
+
+    if url:
+        client = QdrantClient(url=url)
+    else:
+        print("Warning: local Qdrant mode always searches exhaustively; pass --url to measure real HNSW indexes.")
+        client = QdrantClient(":memory:")
 
-    # Run the benchmark
     results = []
     for m in m_values:
         for ef_construct in ef_construct_values:
+            build_s = build_collection(client, ids.tolist(), corpus, m, ef_construct)
             for ef_search in ef_search_values:
                 print(f"Testing m={m}, ef_construct={ef_construct}, ef_search={ef_search}...")
-                latency, recall = benchmark_hnsw(keyframes, m, ef_construct, ef_search)
-                results.append({
+                result = {
                     "m": m,
                     "ef_construct": ef_construct,
                     "ef_search": ef_search,
-                    "latency_ms": latency,
-                    "recall": recall
-                })
-                print(f"  Result: latency={latency:.2f}ms, recall={recall:.2f}")
-
-    # Print the best results
-    best_latency = min(results, key=lambda x: x["latency_ms"])
-    best_recall = max(results, key=lambda x: x["recall"])
-    print(f"\nBest latency: {best_latency['latency_ms']:.2f}ms (recall={best_latency['recall']:.2f}) with m={best_latency['m']}, ef_construct={best_latency['ef_construct']}, ef_search={best_latency['ef_search']}")
-    print(f"Best recall: {best_recall['recall']:.2f} (latency={best_recall['latency_ms']:.2f}ms) with m={best_recall['m']}, ef_construct={best_recall['ef_construct']}, ef_search={best_recall['ef_search']}")
\ No newline at end of file
+                    "num_vectors": len(ids),
+                    "build_s": build_s,
+                    "index_bytes_est": estimate_index_bytes(len(ids), corpus.shape[1], m),
+                    **run_queries(client, queries, kth_scores, ef_search, k),
+                }
+                results.append(result)
+                print(f"  Result: recall@{k}={result[f'recall@{k}']:.3f}, p50={result['latency_ms_p50']:.2f}ms, "
+                      f"p99={result['latency_ms_p99']:.2f}ms, qps={result['qps']:.0f}, build={build_s:.2f}s")
+    return results
+
+def write_results(results: list, output_prefix: str):
+    """Writes the sweep results as <prefix>.json and <prefix>.csv."""
+    with open(f"{output_prefix}.json", "w") as f:
+        json.dump(results, f, indent=2)
+    with open(f"{output_prefix}.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"\nResults written to {output_prefix}.json and {output_prefix}.csv")
+
+def print_best(results: list, k: int = 10):
+    best_latency = min(results, key=lambda x: x["latency_ms_p50"])
+    best_recall = max(results, key=lambda x: x[f"recall@{k}"])
+    print(f"\nBest latency: {best_latency['latency_ms_p50']:.2f}ms (recall@{k}={best_latency[f'recall@{k}']:.3f}) with m={best_latency['m']}, ef_construct={best_latency['ef_construct']}, ef_search={best_latency['ef_search']}")
+    print(f"Best recall@{k}: {best_recall[f'recall@{k}']:.3f} (latency={best_recall['latency_ms_p50']:.2f}ms) with m={best_recall['m']}, ef_construct={best_recall['ef_construct']}, ef_search={best_recall['ef_search']}")
+
+# --- Main ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Qdrant HNSW parameters against exact kNN ground truth.")
+    parser.add_argument("--captions", default="captions.txt", help="Captions file (filename<TAB>caption per line).")
+    parser.add_argument("--limit", type=int, default=None, help="Only load the first N caption lines.")
+    parser.add_argument("--queries", type=int, default=100, help="Number of query captions.")
+    parser.add_argument("-k", type=int, default=10, help="Neighbours per query for recall@k.")
+    parser.add_argument("--url", default=None, help="Qdrant server URL; defaults to local in-memory mode.")
+    parser.add_argument("-o", "--output", default="hnsw_benchmark_results", help="Output path prefix for JSON/CSV.")
+    args = parser.parse_args()
+
+    # Define the parameter grid to search
+    m_values = [8, 16, 32, 64]
+    ef_construct_values = [64, 128, 256, 512]
+    ef_search_values = [32, 64, 128, 256]
+
+    results = run_suite(args.captions, m_values, ef_construct_values, ef_search_values,
+                        num_queries=args.queries, k=args.k, limit=args.limit, url=args.url)
+    write_results(results, args.output)
+    print_best(results, k=args.k)
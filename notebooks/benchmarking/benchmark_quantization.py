@@ -0,0 +1,85 @@
+import os
+import tempfile
+import time
+import numpy as np
+from qdrant_client import models
+from dotenv import load_dotenv
+from src.embedders import get_embedder
+from src.vector_db import VectorDB, iter_captions
+
+# --- Configuration ---
+load_dotenv()
+CAPTIONS_FILE = "captions.txt"
+NUM_QUERIES = 200
+TOP_K = 10
+MODES = [None, "int8", "binary"]
+
+embedder = get_embedder()
+
+# --- Load Captions ---
+def load_caption_texts(filepath: str) -> list:
+    """Returns the caption column of a captions file, or synthetic captions if it is missing."""
+    if os.path.exists(filepath):
+        return [caption for _, _, caption in iter_captions(filepath)]
+    print(f"{filepath} not found; using synthetic captions.")
+    rng = np.random.default_rng(0)
+    objects = ["desk", "monitor", "keyboard", "chair", "plant", "bookshelf", "window", "door", "lamp", "sofa"]
+    return [f"a {' and a '.join(rng.choice(objects, size=3, replace=False))} in room {i}" for i in range(20_000)]
+
+# --- Benchmarking Function ---
+def benchmark_mode(quantization, vectors: np.ndarray, queries: np.ndarray, ground_truth: list, storage_dir: str):
+    """Builds a persisted NumPy collection with one quantization mode and measures memory, latency and recall@k."""
+    db = VectorDB(collection_name="slam_keyframes", embedder=embedder, backend="numpy", path=storage_dir)
+    db.create_collection(quantization=quantization)
+    for start in range(0, len(vectors), 1024):
+        db.client.upsert(
+            collection_name="slam_keyframes",
+            points=[
+                models.PointStruct(id=start + i, vector=v.tolist(), payload={})
+                for i, v in enumerate(vectors[start:start + 1024])
+            ],
+            wait=True,
+        )
+    db.close()
+
+    # Reopen so the float matrix is only memory-mapped, as on the robot.
+    db = VectorDB(collection_name="slam_keyframes", embedder=embedder, backend="numpy", path=storage_dir)
+    collection = db.client._get("slam_keyframes")
+    ram_bytes = collection.codes[:collection.count].nbytes if quantization else collection.matrix[:collection.count].nbytes
+
+    latencies, hits = [], 0
+    for query, expected in zip(queries, ground_truth):
+        start_time = time.perf_counter()
+        results = db.query(query.tolist(), top_k=TOP_K)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+        hits += len(expected & {p.id for p in results})
+    db.close()
+
+    return {
+        "quantization": quantization or "float32",
+        "bytes_per_vector_ram": ram_bytes / len(vectors),
+        "latency_ms_p50": float(np.percentile(latencies, 50)),
+        "latency_ms_p95": float(np.percentile(latencies, 95)),
+        f"recall@{TOP_K}": hits / (TOP_K * len(queries)),
+    }
+
+# --- Main ---
+if __name__ == "__main__":
+    captions = load_caption_texts(CAPTIONS_FILE)
+    vectors = embedder.embed(captions, task_type="RETRIEVAL_DOCUMENT")
+    rng = np.random.default_rng(0)
+    query_captions = [captions[i] for i in rng.integers(0, len(captions), size=NUM_QUERIES)]
+    queries = embedder.embed(query_captions, task_type="RETRIEVAL_QUERY")
+
+    # Exact float ground truth on the same captions.
+    normalized = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    scores = queries @ normalized.T
+    ground_truth = [set(np.argpartition(-row, TOP_K - 1)[:TOP_K].tolist()) for row in scores]
+
+    print(f"Benchmarking quantization on {len(vectors)} keyframes, {NUM_QUERIES} queries...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for mode in MODES:
+            result = benchmark_mode(mode, vectors, queries, ground_truth, os.path.join(tmp_dir, mode or "float32"))
+            print(f"  {result['quantization']:<8} RAM/vector: {result['bytes_per_vector_ram']:>7.1f} B | "
+                  f"p50: {result['latency_ms_p50']:.2f}ms | p95: {result['latency_ms_p95']:.2f}ms | "
+                  f"recall@{TOP_K}: {result[f'recall@{TOP_K}']:.3f}")
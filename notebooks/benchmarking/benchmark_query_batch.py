@@ -0,0 +1,90 @@
+import time
+import numpy as np
+from qdrant_client import models
+from dotenv import load_dotenv
+from src.embedders import get_embedder
+from src.vector_db import VectorDB
+
+# --- Configuration ---
+load_dotenv()
+CAPTIONS_FILE = "captions.txt"
+NUM_QUERIES = 10_000
+SYNTHETIC_MAP_SIZE = 5_000
+TOP_K = 5
+BACKENDS = ["qdrant", "numpy"]
+
+embedder = get_embedder()
+
+# --- Map Construction ---
+def synthetic_captions(n: int, seed: int = 0) -> list:
+    """Generates simple indoor-scene captions when no captions file is available."""
+    rng = np.random.default_rng(seed)
+    objects = ["desk", "monitor", "keyboard", "chair", "plant", "bookshelf", "window", "door", "lamp", "sofa"]
+    adjectives = ["wooden", "black", "white", "small", "large", "cluttered", "empty", "bright", "dark", "red"]
+    captions = []
+    for _ in range(n):
+        a, b = rng.choice(objects, size=2, replace=False)
+        captions.append(f"a {rng.choice(adjectives)} {a} next to a {rng.choice(adjectives)} {b}")
+    return captions
+
+def load_map(db: VectorDB) -> list:
+    """Indexes the captions file (or a synthetic map, if it is missing) and returns the captions."""
+    db.create_collection()
+    if db.index_captions(CAPTIONS_FILE, batch_size=256):
+        records, _ = db.client.scroll(collection_name=db.collection_name, limit=1_000_000)
+        captions = [record.payload["caption"] for record in records]
+        if captions:
+            return captions
+    captions = synthetic_captions(SYNTHETIC_MAP_SIZE)
+    embeddings = db.get_embedding(captions)
+    db.client.upsert(
+        collection_name=db.collection_name,
+        points=[
+            models.PointStruct(id=i, vector=emb, payload={"caption": caption})
+            for i, (caption, emb) in enumerate(zip(captions, embeddings))
+        ],
+        wait=True,
+    )
+    return captions
+
+# --- Benchmarking Function ---
+def benchmark_backend(backend: str, query_embeddings: list):
+    """Measures single-query and batched throughput for one VectorDB backend."""
+    db = VectorDB(collection_name="slam_keyframes", embedder=embedder, backend=backend)
+    captions = load_map(db)
+
+    start_time = time.perf_counter()
+    single_results = [db.query(embedding, top_k=TOP_K) for embedding in query_embeddings]
+    single_s = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    batch_results = db.query_batch(query_embeddings, top_k=TOP_K)
+    batch_s = time.perf_counter() - start_time
+
+    agreement = np.mean([
+        [p.id for p in single] == [p.id for p in batch]
+        for single, batch in zip(single_results, batch_results)
+    ])
+    return {
+        "backend": backend,
+        "map_size": len(captions),
+        "single_qps": len(query_embeddings) / single_s,
+        "batch_qps": len(query_embeddings) / batch_s,
+        "agreement": agreement,
+    }
+
+# --- Main ---
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    probe_db = VectorDB(collection_name="slam_keyframes", embedder=embedder, backend="numpy")
+    captions = load_map(probe_db)
+    query_captions = [captions[i] for i in rng.integers(0, len(captions), size=NUM_QUERIES)]
+    query_embeddings = embedder.embed(query_captions, task_type="RETRIEVAL_QUERY").tolist()
+    print(f"Benchmarking {NUM_QUERIES} queries against a map of {len(captions)} keyframes...")
+
+    for backend in BACKENDS:
+        result = benchmark_backend(backend, query_embeddings)
+        print(f"  {result['backend']:<7} single: {result['single_qps']:>10.1f} q/s | "
+              f"batch: {result['batch_qps']:>10.1f} q/s | "
+              f"speedup: {result['batch_qps'] / result['single_qps']:.1f}x | "
+              f"agreement: {result['agreement']:.3f}")
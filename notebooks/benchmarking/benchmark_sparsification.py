@@ -0,0 +1,62 @@
+import bisect
+import os
+import tempfile
+import time
+import gtsam
+import numpy as np
+from src.factor_graph import FactorGraphManager
+
+# --- Configuration ---
+TRAJECTORY_LENGTHS = [1_000, 5_000, 20_000]
+SPARSIFY_WINDOW = 200
+LOOP_CLOSURE_EVERY = 250
+
+# --- Simulated Session ---
+def stop_and_go_trajectory(n: int, seed: int = 0) -> list:
+    """A robot that drives for 30 keyframes and then idles for 70, around a 20 m circle."""
+    rng = np.random.default_rng(seed)
+    moving = (np.arange(n) % 100) < 30
+    arc = np.cumsum(np.where(moving, 0.1, 0.0))
+    angle = arc / 20.0
+    xyz = np.stack([20.0 * np.cos(angle), 20.0 * np.sin(angle), np.zeros(n)], axis=1)
+    xyz += rng.normal(0, 0.002, size=xyz.shape)
+    return [gtsam.Pose3(gtsam.Rot3.Rz(a), gtsam.Point3(*p)) for a, p in zip(angle, xyz)]
+
+def run_session(poses: list, sparsify: bool) -> dict:
+    """Feeds a session into a FactorGraphManager and measures graph size, checkpoint size and LM time."""
+    manager = FactorGraphManager()
+    merged = 0
+    for start in range(0, len(poses), LOOP_CLOSURE_EVERY):
+        ids = manager.add_poses(poses[start:start + LOOP_CLOSURE_EVERY])
+        # Revisit: close a loop from the newest keyframe to the keyframe kept about a lap earlier.
+        pose_ids = manager.pose_ids
+        n = bisect.bisect_right(pose_ids, ids[-1] - 1_257)
+        if n > 0:
+            target = pose_ids[n - 1]
+            manager.add_loop_closure(ids[-1], target, poses[ids[-1]].between(poses[target]), 10.0)
+        if sparsify:
+            merged += len(manager.sparsify(window=SPARSIFY_WINDOW))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager.save_state(tmp_dir)
+        checkpoint_bytes = sum(os.path.getsize(os.path.join(tmp_dir, f)) for f in os.listdir(tmp_dir))
+    start_time = time.perf_counter()
+    manager.optimize()
+    return {
+        "poses": manager.initial_estimates.size(),
+        "factors": manager.graph.size(),
+        "merged": merged,
+        "checkpoint_kb": checkpoint_bytes / 1024,
+        "optimize_ms": (time.perf_counter() - start_time) * 1000,
+        "iterations": manager.last_optimization["iterations"],
+    }
+
+# --- Main ---
+if __name__ == "__main__":
+    print(f"{'length':>7} {'mode':<10} {'poses':>7} {'factors':>8} {'ckpt KB':>9} {'LM ms':>9} {'iters':>6}")
+    for n in TRAJECTORY_LENGTHS:
+        poses = stop_and_go_trajectory(n)
+        for sparsify in (False, True):
+            r = run_session(poses, sparsify)
+            print(f"{n:>7} {'sparsified' if sparsify else 'full':<10} {r['poses']:>7} {r['factors']:>8} "
+                  f"{r['checkpoint_kb']:>9.1f} {r['optimize_ms']:>9.1f} {r['iterations']:>6}")
@@ -0,0 +1,41 @@
+import time
+import numpy as np
+from src.atropos_env import SLAMAtroposEnv, VectorSLAMAtroposEnv
+
+# --- Configuration ---
+SCALAR_STEPS = 100_000
+VECTOR_STEPS = 2_000_000
+NUM_ENVS = [64, 1024, 16_384]
+
+# --- Benchmarking Functions ---
+def benchmark_scalar(num_steps: int) -> float:
+    """Steps one SLAMAtroposEnv with random actions and returns env steps per second."""
+    env = SLAMAtroposEnv()
+    env.reset(seed=0)
+    actions = np.random.default_rng(0).integers(0, 3, size=num_steps)
+    start_time = time.perf_counter()
+    for action in actions:
+        _, _, terminated, truncated, _ = env.step(action)
+        if terminated or truncated:
+            env.reset()
+    return num_steps / (time.perf_counter() - start_time)
+
+def benchmark_vector(num_envs: int, num_steps: int) -> float:
+    """Steps a VectorSLAMAtroposEnv with random actions and returns env steps per second."""
+    venv = VectorSLAMAtroposEnv(num_envs)
+    venv.reset(seed=0)
+    rng = np.random.default_rng(0)
+    num_calls = max(1, num_steps // num_envs)
+    actions = rng.integers(0, 3, size=(num_calls, num_envs))
+    start_time = time.perf_counter()
+    for step_actions in actions:
+        venv.step(step_actions)
+    return num_calls * num_envs / (time.perf_counter() - start_time)
+
+# --- Main ---
+if __name__ == "__main__":
+    scalar_sps = benchmark_scalar(SCALAR_STEPS)
+    print(f"  SLAMAtroposEnv          : {scalar_sps:>12,.0f} steps/s")
+    for num_envs in NUM_ENVS:
+        vector_sps = benchmark_vector(num_envs, VECTOR_STEPS)
+        print(f"  VectorSLAMAtroposEnv {num_envs:>6}: {vector_sps:>12,.0f} steps/s ({vector_sps / scalar_sps:.0f}x)")
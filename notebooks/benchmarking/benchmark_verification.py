@@ -0,0 +1,79 @@
+import tempfile
+import time
+import numpy as np
+from src.loop_closure_verifier import (
+    CaptionOverlapIndex, LoopClosureVerifier, StubVerificationModel, VerdictCache, make_verification_prompt,
+)
+
+# --- Configuration ---
+MAP_SIZE = 10_000
+VOCABULARY_SIZE = 2_000
+WORDS_PER_CAPTION = 12
+TOP_K = 5
+MODEL_LATENCY_S = 0.2  # Simulated generate_content round-trip
+
+# --- Reference Implementation ---
+def legacy_call_llm_verification(prompt: str) -> tuple[str, float]:
+    """
+    The original verifier: re-parse both captions out of the prompt and
+    compare Python sets. (The original read lines -4/-3, one line too early
+    for its own prompt, and so always answered "no"; this is the intended parse.)
+    """
+    stopwords = {'a', 'an', 'the', 'of', 'in', 'is', 'on', 'photo', 'picture'}
+    lines = prompt.strip().split('\n')
+    live_words = set(lines[-3].split('"')[1].lower().split()) - stopwords
+    retrieved_words = set(lines[-2].split('"')[1].lower().split()) - stopwords
+    union_size = len(live_words | retrieved_words)
+    confidence = len(live_words & retrieved_words) / union_size if union_size > 0 else 0.0
+    return ("yes", confidence) if confidence > 0.1 else ("no", 0.0)
+
+def legacy_prompt(live_caption: str, caption: str) -> str:
+    return f'You are a verification agent...\nLive Observation: "{live_caption}"\nRetrieved Keyframe: "{caption}"\nVerification:'
+
+# --- Benchmarking Functions ---
+def mean_us(fn, repeats: int) -> float:
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start_time) / repeats * 1e6
+
+def benchmark_overlap(captions: list):
+    index = CaptionOverlapIndex(enumerate(captions))
+    live = captions[0]
+    top_k = list(range(1, TOP_K + 1))
+    for label, ids, repeats in ((f"top-{TOP_K}", top_k, 2000), (f"full map ({MAP_SIZE})", range(MAP_SIZE), 20)):
+        legacy = mean_us(lambda: [legacy_call_llm_verification(legacy_prompt(live, captions[i])) for i in ids], repeats)
+        vectorized = mean_us(lambda: index.verify(live, None if len(ids) == MAP_SIZE else ids), repeats)
+        print(f"  {label:<18} sets: {legacy:>10.1f} us | CSR: {vectorized:>8.1f} us ({legacy / vectorized:.1f}x)")
+
+def benchmark_llm_stage(captions: list):
+    live = captions[0]
+    candidates = captions[1:TOP_K + 1]
+    model = StubVerificationModel(latency_s=MODEL_LATENCY_S)
+
+    start_time = time.perf_counter()
+    for candidate in candidates:
+        if "yes" in model.generate_content(make_verification_prompt(live, candidate)).text.lower():
+            break
+    sequential = time.perf_counter() - start_time
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        verifier = LoopClosureVerifier(model, model_name="stub", cache=VerdictCache(cache_dir), max_workers=TOP_K)
+        timings = []
+        for _ in range(2):
+            start_time = time.perf_counter()
+            verifier.first_match(live, candidates)
+            timings.append(time.perf_counter() - start_time)
+        verifier.close()
+    print(f"  sequential: {sequential * 1e3:8.1f} ms | concurrent: {timings[0] * 1e3:8.1f} ms | "
+          f"cached repeat: {timings[1] * 1e3:8.3f} ms")
+
+# --- Main ---
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    words = np.array([f"word{i}" for i in range(VOCABULARY_SIZE)])
+    captions = [" ".join(rng.choice(words, WORDS_PER_CAPTION)) for _ in range(MAP_SIZE)]
+    print("Caption-overlap verification:")
+    benchmark_overlap(captions)
+    print(f"LLM verification of {TOP_K} non-matching candidates ({MODEL_LATENCY_S * 1e3:.0f} ms per call):")
+    benchmark_llm_stage(captions)
@@ -1,6 +1,8 @@
-import pickle
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
-from atropos_env import SLAMAtroposEnv
+from src.atropos_env import SLAMAtroposEnv
+from src.rollout_store import RolloutStore, write_chunk
 from tqdm import tqdm
 
 # --- Configuration ---
@@ -8,57 +10,95 @@ from tqdm import tqdm
 # For this sprint task, we'll collect 100,000 steps.
 # TOTAL_STEPS = 1_000_000 # Target for final dataset
 TOTAL_STEPS = 100_000
-OUTPUT_FILE = "rollouts.pkl"
-PROGRESS_INTERVAL = 100_000
+OUTPUT_DIR = "rollouts"
+# Shards fix the work split, so the output for a seed does not depend on the worker count.
+NUM_SHARDS = 16
+SEED = 0
 
-def collect_rollouts():
+def collect_shard(chunk_name: str, num_steps: int, seed_seq: np.random.SeedSequence, output_dir: str) -> str:
     """
-    Collects interaction roll-outs from the SLAMAtroposEnv using a random policy.
+    Collects `num_steps` roll-out steps with the heuristic policy and writes
+    them as a rollout store chunk <output_dir>/<chunk_name>/.
+
+    The env and the policy draw from generators spawned from `seed_seq`, so
+    a shard is reproducible on its own.
     """
-    print("Initializing environment...")
-    env = SLAMAtroposEnv()
-    
-    print(f"Collecting {TOTAL_STEPS} steps...")
-    rollouts = []
-    
-    observation, _ = env.reset()
-    
-    # Use tqdm for a progress bar
-    for step_num in tqdm(range(TOTAL_STEPS), desc="Collecting Rollouts"):
+    env_seed_seq, policy_seed_seq = seed_seq.spawn(2)
+    rng = np.random.default_rng(policy_seed_seq)
+    # Observations are copied into the arrays below, so reuse the env's buffer.
+    env = SLAMAtroposEnv({"reuse_obs_buffer": True})
+    observation, _ = env.reset(seed=int(env_seed_seq.generate_state(1)[0]))
+
+    obs_dim = env.observation_space.shape[0]
+    observations = np.empty((num_steps, obs_dim), dtype=np.float32)
+    next_observations = np.empty((num_steps, obs_dim), dtype=np.float32)
+    actions = np.empty(num_steps, dtype=np.int64)
+    rewards = np.empty(num_steps, dtype=np.float32)
+    dones = np.empty(num_steps, dtype=bool)
+    # Pre-draw the coin flips of the random branch of the policy.
+    random_actions = rng.integers(0, 2, size=num_steps)
+
+    for step_num in range(num_steps):
+        observations[step_num] = observation
         # 1. Select an action based on the heuristic policy
         # If odometry drift is high, add a semantic constraint.
-        odometry_drift = observation[1]
-        if odometry_drift > 2.0:
-            action = 2  # Action 2: add_semantic_constraint
-        else:
-            # Otherwise, randomly choose between the other actions (0 or 1).
-            action = np.random.choice([0, 1])
-        
+        # Otherwise, randomly choose between the other actions (0 or 1).
+        action = 2 if observation[1] > 2.0 else random_actions[step_num]
+
         # 2. Execute the action in the environment
-        next_observation, reward, terminated, truncated, info = env.step(action)
-        
-        # 3. Store the experience tuple
-        rollouts.append((observation, action, reward, next_observation, terminated))
-        
-        # 4. Update observation
-        observation = next_observation
-        
-        # 5. Reset if the episode is done
+        observation, reward, terminated, truncated, _ = env.step(action)
+
+        # 3. Store the experience
+        next_observations[step_num] = observation
+        actions[step_num] = action
+        rewards[step_num] = reward
+        dones[step_num] = terminated
+
+        # 4. Reset if the episode is done
         if terminated or truncated:
             observation, _ = env.reset()
-            
-        # 6. Print progress (tqdm handles this, but we can add milestones)
-        if (step_num + 1) % PROGRESS_INTERVAL == 0:
-            print(f"\nMilestone: Reached {step_num + 1} steps.")
 
-    print(f"\nCollection complete. Total rollouts collected: {len(rollouts)}")
-    
-    # --- Save the data ---
-    print(f"Saving rollouts to {OUTPUT_FILE}...")
-    with open(OUTPUT_FILE, 'wb') as f:
-        pickle.dump(rollouts, f)
-        
-    print("Save complete.")
+    write_chunk(output_dir, chunk_name, {
+        "obs": observations, "action": actions, "reward": rewards, "next_obs": next_observations, "done": dones,
+    })
+    return chunk_name
+
+def collect_rollouts(total_steps: int = TOTAL_STEPS, output_dir: str = OUTPUT_DIR, num_shards: int = NUM_SHARDS,
+                     num_workers: int = None, seed: int = SEED) -> RolloutStore:
+    """
+    Collects interaction roll-outs from the SLAMAtroposEnv across a process
+    pool and appends them, one chunk per shard in shard order, to the
+    rollout store at `output_dir`.
+    """
+    store = RolloutStore(output_dir)
+    if len(store):
+        print(f"Appending to the existing {len(store)} steps in {output_dir}/")
+    shard_sizes = [total_steps // num_shards + (i < total_steps % num_shards) for i in range(num_shards)]
+    seed_seqs = np.random.SeedSequence(seed).spawn(num_shards)
+
+    print(f"Collecting {total_steps} steps in {num_shards} shards (seed={seed})...")
+    chunk_names = [None] * num_shards
+    with ProcessPoolExecutor(max_workers=num_workers) as pool:
+        futures = {
+            pool.submit(collect_shard, f"chunk_{store.num_chunks + i:05d}", size, seed_seq, output_dir): i
+            for i, (size, seed_seq) in enumerate(zip(shard_sizes, seed_seqs)) if size > 0
+        }
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Collecting Rollouts"):
+            chunk_names[futures[future]] = future.result()
+
+    # Only this process writes the manifest; register the chunks in shard order.
+    for chunk_name in chunk_names:
+        if chunk_name is not None:
+            store.add_chunk(chunk_name)
+    print(f"\nCollection complete. Wrote {total_steps} steps to {output_dir}/ ({len(store)} steps in total)")
+    return store
 
 if __name__ == "__main__":
-    collect_rollouts()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Collect SLAMAtroposEnv roll-outs with a heuristic policy.")
+    parser.add_argument("--steps", type=int, default=TOTAL_STEPS, help="Total number of environment steps.")
+    parser.add_argument("--shards", type=int, default=NUM_SHARDS, help="Number of independently seeded shards.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--seed", type=int, default=SEED, help="Root seed; the same seed gives the same shards.")
+    parser.add_argument("-o", "--output-dir", default=OUTPUT_DIR, help="Rollout store directory to append to.")
+    args = parser.parse_args()
+    collect_rollouts(args.steps, args.output_dir, args.shards, args.workers, args.seed)
@@ -0,0 +1,12 @@
+import argparse
+from src.rollout_store import convert_pickle
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a pickled list of roll-out tuples into a rollout store.")
+    parser.add_argument("pkl_path", help="Pickled roll-outs, e.g. rollouts.pkl.")
+    parser.add_argument("store_path", help="Rollout store directory to create or append to.")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Transitions per chunk.")
+    args = parser.parse_args()
+
+    store = convert_pickle(args.pkl_path, args.store_path, chunk_size=args.chunk_size)
+    print(f"Converted {args.pkl_path} into {args.store_path}/ ({len(store)} steps in {store.num_chunks} chunks)")
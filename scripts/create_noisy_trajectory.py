@@ -1,5 +1,6 @@
 import numpy as np
 import os
+from src.trajectory_io import read_tum, write_tum
 
 def add_noise_to_trajectory(input_file, output_file, noise_std_dev):
     """
@@ -10,7 +11,7 @@ def add_noise_to_trajectory(input_file, output_file, noise_std_dev):
         print(f"Error: Input file not found at {input_file}")
         return
 
-    trajectory = np.loadtxt(input_file)
+    trajectory = read_tum(input_file)
     
     # Add noise only to the translation columns (tx, ty, tz)
     positional_data = trajectory[:, 1:4]
@@ -22,7 +23,7 @@ def add_noise_to_trajectory(input_file, output_file, noise_std_dev):
     noisy_trajectory[:, 1:4] = noisy_positional_data
     
     # Save the new trajectory
-    np.savetxt(output_file, noisy_trajectory, fmt='%f')
+    write_tum(output_file, noisy_trajectory[:, 0], noisy_trajectory[:, 1:4], noisy_trajectory[:, 4:8])
     print(f"Generated noisy trajectory: {output_file}")
 
 def main():
@@ -0,0 +1,55 @@
+import argparse
+import csv
+import os
+import time
+from src.trajectory_metrics import MAX_TIME_DIFF, evaluate_directory
+
+# --- Configuration ---
+OUTPUT_FILE = "results/trajectory_metrics.csv"
+
+def write_results(rows: list, output_file: str):
+    """Writes one row per trajectory to a CSV table; failed files keep only their error."""
+    fieldnames = []
+    for row in rows:
+        fieldnames.extend(key for key in row if key not in fieldnames)
+    directory = os.path.dirname(output_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output_file, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def print_summary(rows: list, estimate_dir: str):
+    print(f"\n{'trajectory':<48}{'matched':>8}{'ATE rmse':>10}{'RPE rmse':>10}{'RPE deg':>9}")
+    for row in rows:
+        name = os.path.relpath(row["trajectory"], estimate_dir)
+        if "error" in row:
+            print(f"{name:<48}  error: {row['error']}")
+        else:
+            print(f"{name:<48}{row['matched']:>8}{row['ate_rmse']:>10.4f}{row['rpe_rmse']:>10.4f}{row['rpe_rot_rmse']:>9.3f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute ATE and RPE for a directory of TUM trajectories.")
+    parser.add_argument("ground_truth", help="Ground-truth trajectory in TUM format.")
+    parser.add_argument("estimate_dir", help="Directory searched recursively for estimated trajectories.")
+    parser.add_argument("--pattern", default="*.txt", help="Glob for estimate files (default: *.txt).")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--max-diff", type=float, default=MAX_TIME_DIFF, help="Max timestamp difference in seconds.")
+    parser.add_argument("--delta", type=int, default=1, help="RPE frame distance.")
+    parser.add_argument("--correct-scale", action="store_true", help="Align with a similarity (Sim3) transform.")
+    parser.add_argument("-o", "--output", default=OUTPUT_FILE, help="CSV results table.")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    rows = evaluate_directory(
+        args.ground_truth, args.estimate_dir, pattern=args.pattern, workers=args.workers,
+        max_diff=args.max_diff, delta=args.delta, correct_scale=args.correct_scale,
+    )
+    if not rows:
+        print(f"No trajectories matching {args.pattern} found under {args.estimate_dir}")
+    else:
+        print_summary(rows, args.estimate_dir)
+        write_results(rows, args.output)
+        print(f"\nEvaluated {len(rows)} trajectories in {time.perf_counter() - start_time:.2f}s; "
+              f"results written to {args.output}")
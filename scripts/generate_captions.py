@@ -7,6 +7,7 @@ from google.genai import types
 from tqdm import tqdm
 import gcsfs
 from google.cloud import storage
+from src.replay import get_replay_store
 
 def generate_captions(dataset_dir):
     """
@@ -25,10 +26,21 @@ def generate_captions(dataset_dir):
         except (ImportError, KeyError):
             pass
 
-    if not api_key:
-        raise ValueError("Gemini API key not found. Please set the GEMINI_API_KEY environment variable or add it to a .env file.")
+    # With SLAM_REPLAY_MODE set, responses are recorded to or replayed from the
+    # local replay store; pure replay runs offline without an API key.
+    replay_store = get_replay_store()
+    client = None
+    if replay_store is None or replay_store.mode != "replay":
+        if not api_key:
+            raise ValueError("Gemini API key not found. Please set the GEMINI_API_KEY environment variable or add it to a .env file.")
+        client = genai.Client(api_key=api_key)
 
-    client = genai.Client(api_key=api_key)
+    def generate_text(model, image, prompt, config=None):
+        def call():
+            return client.models.generate_content(model=model, contents=[image, prompt], config=config).text
+        if replay_store is None:
+            return call()
+        return replay_store.generate((model, image.mode, image.size, image.tobytes(), prompt), call)
 
     # --- Model Setup ---
     caption_model = "gemini-1.5-pro-latest"
@@ -69,14 +81,12 @@ def generate_captions(dataset_dir):
             # 1. Generate 3 candidate captions
             prompt = "Generate 3 distinct, descriptive captions for this image. Output as a raw JSON list of strings."
             try:
-                response = client.models.generate_content(
-                    model=caption_model,
-                    contents=[image, prompt],
+                response_text = generate_text(
+                    caption_model, image, prompt,
                     config=types.GenerateContentConfig(
                         # No specific config needed for this model for top-k=3
                     )
                 )
-                response_text = response.text
                 if response_text.startswith("```json"):
                     response_text = response_text[7:-4]
                 candidate_captions = json.loads(response_text)
@@ -94,11 +104,8 @@ def generate_captions(dataset_dir):
                 Respond with only "YES" or "NO".
                 """
                 try:
-                    verification_response = client.models.generate_content(
-                        model=verifier_model,
-                        contents=[image, verification_prompt]
-                    )
-                    if "yes" in verification_response.text.lower():
+                    verification_text = generate_text(verifier_model, image, verification_prompt)
+                    if "yes" in verification_text.lower():
                         verified_captions.append(caption.strip())
                 except Exception as e:
                     print(f"Error verifying caption for {image_file}: {e}")
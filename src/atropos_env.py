@@ -1,7 +1,33 @@
 import gymnasium as gym
 from gymnasium import spaces
+from gymnasium.utils import seeding
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
 import numpy as np
 
+# --- Shared Dynamics ---
+# State columns: [tracking_fps, odometry_drift, keypoints_matched, loop_closure_score, semantic_similarity_mean]
+INITIAL_STATE = np.array([30.0, 1.0, 50.0, 0.1, 0.2])
+STATE_LOW = np.array([0.0, 0.0, 0.0, 0.0, 0.0])
+STATE_HIGH = np.array([120.0, np.inf, 500.0, 1.0, 1.0])
+# Per-action state deltas, one row per action.
+ACTION_EFFECTS = np.array([
+    [-5.0, -0.10, 20.0, 0.0, 0.0],   # 0: increase_keyframe_rate
+    [5.0, 0.15, -20.0, 0.0, 0.0],    # 1: decrease_keyframe_rate
+    [-2.0, -0.25, 0.0, 0.2, 0.15],   # 2: add_semantic_constraint
+])
+# Per-step multiplicative decay of each state column.
+STATE_DECAY = np.array([1.0, 1.0, 1.0, 0.98, 0.99])
+DRIFT_NOISE_STD = 0.05
+LAMBDA_CONSTANT = 0.2
+# Standard normal samples drawn per refill of the single-env noise buffer.
+NOISE_BLOCK_SIZE = 4096
+
+_ACTION_EFFECTS_F32 = ACTION_EFFECTS.astype(np.float32)
+_STATE_DECAY_F32 = STATE_DECAY.astype(np.float32)
+_STATE_LOW_F32 = STATE_LOW.astype(np.float32)
+_STATE_HIGH_F32 = STATE_HIGH.astype(np.float32)
+
 class SLAMAtroposEnv(gym.Env):
     """
     A simulated Reinforcement Learning environment for a SLAM agent
@@ -25,11 +51,16 @@ class SLAMAtroposEnv(gym.Env):
         self.action_space = spaces.Discrete(3)
 
         # --- Environment State ---
-        self.current_fps = 30.0
-        self.current_drift = 1.0
-        self.keypoints_matched = 50
-        self.loop_closure_score = 0.1
-        self.semantic_similarity_mean = 0.2
+        # One float32 buffer holds the state and step() updates it in place.
+        # Observations are copies of it unless env_config sets
+        # "reuse_obs_buffer", in which case the buffer itself is returned and
+        # callers that keep observations across steps must copy them.
+        env_config = env_config or {}
+        self.reuse_obs_buffer = bool(env_config.get("reuse_obs_buffer", False))
+        self._state = INITIAL_STATE.astype(np.float32)
+        self._noise = np.zeros(0, dtype=np.float32)
+        self._noise_pos = 0
+        self.drift_noise_std = DRIFT_NOISE_STD
         self.target_fps = 60.0
         self.step_count = 0
         self.max_steps = 100 # Terminate after a certain number of steps
@@ -39,78 +70,58 @@ class SLAMAtroposEnv(gym.Env):
         Resets the environment to its initial state.
         """
         super().reset(seed=seed)
-        
+        if seed is not None:
+            # Discard noise drawn from the previous generator.
+            self._noise_pos = len(self._noise)
+
         # Reset state variables
-        self.current_fps = 30.0
-        self.current_drift = 1.0
-        self.keypoints_matched = 50
-        self.loop_closure_score = 0.1
-        self.semantic_similarity_mean = 0.2
+        self._state[:] = INITIAL_STATE
         self.step_count = 0
 
         # Return initial observation
-        observation = np.array([
-            self.current_fps,
-            self.current_drift,
-            self.keypoints_matched,
-            self.loop_closure_score,
-            self.semantic_similarity_mean
-        ], dtype=np.float32)
         info = {}
-        return observation, info
+        return self._observation(), info
+
+    def _observation(self) -> np.ndarray:
+        return self._state if self.reuse_obs_buffer else self._state.copy()
+
+    def _next_noise(self) -> float:
+        """Returns the next standard normal sample, drawing them from np_random in blocks."""
+        if self._noise_pos >= len(self._noise):
+            self._noise = self.np_random.standard_normal(NOISE_BLOCK_SIZE, dtype=np.float32)
+            self._noise_pos = 0
+        sample = self._noise[self._noise_pos]
+        self._noise_pos += 1
+        return sample
 
     def step(self, action):
         """
         Executes one time step within the environment.
         """
         self.step_count += 1
+        state = self._state
 
         # --- Simulate Action Effect ---
-        if action == 0:  # increase_keyframe_rate
-            self.current_fps -= 5
-            self.current_drift -= 0.1
-            self.keypoints_matched += 20 # More keyframes, more matches
-        elif action == 1:  # decrease_keyframe_rate
-            self.current_fps += 5
-            self.current_drift += 0.15
-            self.keypoints_matched -= 20 # Fewer keyframes, fewer matches
-        elif action == 2:  # add_semantic_constraint
-            self.current_fps -= 2
-            self.current_drift -= 0.25
-            self.loop_closure_score += 0.2 # Semantic constraints improve loop closure
-            self.semantic_similarity_mean += 0.15 # And semantic similarity
+        np.add(state, _ACTION_EFFECTS_F32[int(action)], out=state)
 
         # --- Simulate environmental noise/drift ---
-        self.current_drift += np.random.normal(0.0, 0.05)
-        self.loop_closure_score *= 0.98 # Decay over time
-        self.semantic_similarity_mean *= 0.99 # Decay over time
-
+        state[1] += self.drift_noise_std * self._next_noise()
+        np.multiply(state, _STATE_DECAY_F32, out=state)
 
         # Ensure values stay within reasonable bounds
-        self.current_fps = np.clip(self.current_fps, 0, 120)
-        self.current_drift = max(0, self.current_drift)
-        self.keypoints_matched = np.clip(self.keypoints_matched, 0, 500)
-        self.loop_closure_score = np.clip(self.loop_closure_score, 0.0, 1.0)
-        self.semantic_similarity_mean = np.clip(self.semantic_similarity_mean, 0.0, 1.0)
+        np.maximum(state, _STATE_LOW_F32, out=state)
+        np.minimum(state, _STATE_HIGH_F32, out=state)
 
         # --- Calculate Reward ---
-        lambda_constant = 0.2
-        reward = -self.current_drift - (lambda_constant / (self.current_fps + 1e-6)) # Add epsilon to avoid division by zero
+        reward = -float(state[1]) - (LAMBDA_CONSTANT / (float(state[0]) + 1e-6)) # Add epsilon to avoid division by zero
 
         # --- Check for Termination ---
         terminated = self.step_count >= self.max_steps
 
         # --- Prepare Return Values ---
-        next_observation = np.array([
-            self.current_fps,
-            self.current_drift,
-            self.keypoints_matched,
-            self.loop_closure_score,
-            self.semantic_similarity_mean
-        ], dtype=np.float32)
         info = {}
 
-        return next_observation, reward, terminated, False, info
+        return self._observation(), reward, terminated, False, info
 
     def render(self):
         """
@@ -122,4 +133,71 @@ class SLAMAtroposEnv(gym.Env):
         """
         Clean up the environment.
         """
-        pass
\ No newline at end of file
+        pass
+
+
+class VectorSLAMAtroposEnv(VectorEnv):
+    """
+    N independent copies of SLAMAtroposEnv stepped in one vectorized call.
+
+    The state of every copy lives in a single (num_envs, 5) array, so action
+    effects, noise, clipping, reward and termination are a handful of NumPy
+    operations regardless of `num_envs`. Finished copies are reset in the
+    same step; their last observation is returned in `infos["final_obs"]`
+    (masked by `infos["_final_obs"]`).
+    """
+    metadata = {"autoreset_mode": AutoresetMode.SAME_STEP}
+
+    def __init__(self, num_envs: int, max_steps: int = 100):
+        self.num_envs = num_envs
+        self.max_steps = max_steps
+        self.drift_noise_std = DRIFT_NOISE_STD
+
+        single_env = SLAMAtroposEnv()
+        self.single_observation_space = single_env.observation_space
+        self.single_action_space = single_env.action_space
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+
+        self._state = np.tile(INITIAL_STATE, (num_envs, 1))
+        self._step_count = np.zeros(num_envs, dtype=np.int64)
+
+    def reset(self, *, seed=None, options=None):
+        """Resets every copy; a seed reseeds the shared generator."""
+        if seed is not None:
+            self._np_random, self._np_random_seed = seeding.np_random(seed)
+        self._state[:] = INITIAL_STATE
+        self._step_count[:] = 0
+        return self._state.astype(np.float32), {}
+
+    def step(self, actions):
+        """Steps all copies with an integer action array of shape (num_envs,)."""
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+        self._step_count += 1
+
+        # --- Simulate Action Effect ---
+        state = self._state
+        state += ACTION_EFFECTS[actions]
+
+        # --- Simulate environmental noise/drift ---
+        state[:, 1] += self.np_random.normal(0.0, self.drift_noise_std, size=self.num_envs)
+        state *= STATE_DECAY
+        np.clip(state, STATE_LOW, STATE_HIGH, out=state)
+
+        # --- Calculate Reward ---
+        rewards = -state[:, 1] - LAMBDA_CONSTANT / (state[:, 0] + 1e-6)
+
+        # --- Check for Termination ---
+        terminations = self._step_count >= self.max_steps
+        truncations = np.zeros(self.num_envs, dtype=bool)
+
+        observations = state.astype(np.float32)
+        infos = {}
+        if terminations.any():
+            infos["final_obs"] = observations.copy()
+            infos["_final_obs"] = terminations.copy()
+            state[terminations] = INITIAL_STATE
+            self._step_count[terminations] = 0
+            observations[terminations] = INITIAL_STATE
+        return observations, rewards, terminations, truncations, infos
+
@@ -0,0 +1,173 @@
+import os
+import re
+import zlib
+
+import numpy as np
+from dotenv import load_dotenv
+
+from src.embedding_cache import get_default_cache
+from src.replay import ReplayMissError, get_replay_store
+
+load_dotenv()
+
+GEMINI_EMBEDDING_MODEL = "models/embedding-001"
+EMBEDDING_DIM = 768
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class Embedder:
+    """
+    Base interface for text embedding backends.
+
+    Subclasses set `model_name` and `dim` and implement `embed`, which maps a
+    list of texts to a float32 array of shape (len(texts), dim).
+    """
+    model_name = None
+    dim = EMBEDDING_DIM
+
+    def embed(self, texts: list, task_type: str = "RETRIEVAL_DOCUMENT") -> np.ndarray:
+        raise NotImplementedError
+
+
+class GeminiEmbedder(Embedder):
+    """Embeds text remotely with the Gemini embedding API."""
+    def __init__(self, model_name: str = GEMINI_EMBEDDING_MODEL, api_key: str = None):
+        import google.generativeai as genai
+
+        api_key = api_key or os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY not found. Set it in the environment or use the local embedder.")
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self.model_name = model_name
+
+    def embed(self, texts: list, task_type: str = "RETRIEVAL_DOCUMENT") -> np.ndarray:
+        result = self._genai.embed_content(model=self.model_name, content=list(texts), task_type=task_type)
+        return np.asarray(result['embedding'], dtype=np.float32).reshape(len(texts), self.dim)
+
+
+class LocalEmbedder(Embedder):
+    """
+    A deterministic, offline CPU embedder.
+
+    Word unigrams and character n-grams of each word are hashed (signed
+    feature hashing) into `dim` buckets, weighted by sublinear term frequency
+    and L2-normalized, so that captions sharing words and word fragments
+    land close together under cosine distance. The task type is ignored.
+    """
+    def __init__(self, dim: int = EMBEDDING_DIM, ngram_range: tuple = (3, 5)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.model_name = f"local-hash-{dim}-{ngram_range[0]}-{ngram_range[1]}"
+        self._feature_cache = {}
+
+    def _token_features(self, token: str) -> np.ndarray:
+        """Returns the hashed feature ids (sign in the top bit) of one word."""
+        features = self._feature_cache.get(token)
+        if features is None:
+            grams = ["w:" + token]
+            padded = f"<{token}>"
+            for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+                grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+            features = np.array([zlib.crc32(g.encode("utf-8")) for g in grams], dtype=np.int64)
+            if len(self._feature_cache) < 1_000_000:
+                self._feature_cache[token] = features
+        return features
+
+    def embed(self, texts: list, task_type: str = "RETRIEVAL_DOCUMENT") -> np.ndarray:
+        rows, hashes = [], []
+        for i, text in enumerate(texts):
+            for token in _TOKEN_PATTERN.findall(text.lower()):
+                features = self._token_features(token)
+                hashes.append(features)
+                rows.append(np.full(len(features), i, dtype=np.int64))
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if not hashes:
+            return vectors
+
+        hashes = np.concatenate(hashes)
+        rows = np.concatenate(rows)
+        buckets = rows * self.dim + (hashes % self.dim)
+        signs = np.where(hashes & (1 << 31), -1.0, 1.0)
+        # Sum signed counts per bucket, then damp repeated features.
+        flat = np.bincount(buckets, weights=signs, minlength=len(texts) * self.dim)
+        vectors = flat.reshape(len(texts), self.dim).astype(np.float32)
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+class CachedEmbedder(Embedder):
+    """Wraps an embedder with the persistent embedding cache."""
+    def __init__(self, embedder: Embedder, cache=None):
+        self.embedder = embedder
+        self.cache = cache if cache is not None else get_default_cache()
+        self.model_name = embedder.model_name
+        self.dim = embedder.dim
+
+    def embed(self, texts: list, task_type: str = "RETRIEVAL_DOCUMENT") -> np.ndarray:
+        def embed_fn(misses):
+            return self.embedder.embed(misses, task_type=task_type)
+
+        vectors = self.cache.embed(list(texts), self.model_name, task_type, embed_fn)
+        return np.asarray(vectors, dtype=np.float32).reshape(len(texts), self.dim)
+
+
+class ReplayEmbedder(Embedder):
+    """
+    Records the embeddings of a remote embedder to a ReplayStore, or replays
+    them from it. In replay mode `embedder` may be None, so no API key is needed.
+    """
+    def __init__(self, store, embedder: Embedder = None, model_name: str = None, dim: int = EMBEDDING_DIM):
+        self.store = store
+        self.embedder = embedder
+        self.model_name = embedder.model_name if embedder is not None else model_name
+        self.dim = embedder.dim if embedder is not None else dim
+
+    def embed(self, texts: list, task_type: str = "RETRIEVAL_DOCUMENT") -> np.ndarray:
+        if not len(texts):
+            return np.zeros((0, self.dim), dtype=np.float32)
+
+        def embed_fn(misses):
+            if self.embedder is None:
+                raise ReplayMissError(f"{len(misses)} texts were never recorded in {self.store.path}")
+            return self.embedder.embed(misses, task_type=task_type)
+
+        vectors = self.store.embed(list(texts), self.model_name, task_type, embed_fn)
+        return vectors.reshape(len(texts), self.dim)
+
+
+def get_embedder(name: str = None) -> Embedder:
+    """
+    Returns the configured embedding backend.
+
+    `name` (or the EMBEDDER environment variable) selects "gemini" or
+    "local". By default Gemini is used when GEMINI_API_KEY is set and the
+    local embedder otherwise. With SLAM_REPLAY_MODE set, Gemini embeddings
+    are recorded to or replayed from the local replay store; in "replay" or
+    "auto" mode recorded embeddings are served without an API key, and the
+    default is Gemini whenever the store holds any.
+    """
+    name = name or os.getenv("EMBEDDER")
+    store = get_replay_store() if name in (None, "gemini") else None
+    if name is None:
+        name = "gemini" if os.getenv("GEMINI_API_KEY") else "local"
+        if name == "local" and store is not None and store.mode in ("replay", "auto"):
+            if store.has_embeddings():
+                name = "gemini"
+            elif store.mode == "replay":
+                raise ValueError(
+                    f"SLAM_REPLAY_MODE=replay but {store.path} holds no recorded embeddings; "
+                    "record them first or set EMBEDDER=local."
+                )
+    if name == "gemini":
+        if store is None:
+            return CachedEmbedder(GeminiEmbedder())
+        if store.mode == "replay" or (store.mode == "auto" and not os.getenv("GEMINI_API_KEY")):
+            return ReplayEmbedder(store, model_name=GEMINI_EMBEDDING_MODEL)
+        return ReplayEmbedder(store, CachedEmbedder(GeminiEmbedder()))
+    if name == "local":
+        return LocalEmbedder()
+    raise ValueError(f"Unsupported embedder: {name}")
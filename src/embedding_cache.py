@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# --- Configuration ---
+DEFAULT_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join(".cache", "embeddings"))
+DEFAULT_DIM = 768
+VECTORS_FILE = "vectors.f32"
+INDEX_FILE = "index.tsv"
+META_FILE = "meta.json"
+
+
+class EmbeddingCache:
+    """
+    A persistent, content-addressed cache for text embeddings.
+
+    Vectors live in a memory-mapped float32 matrix on disk; an append-only
+    index file maps sha1(model, task_type, text) to a row of that matrix.
+    Recently used vectors are also kept in an in-process LRU hot tier.
+    Lookups and appends are serialized by a lock, so one cache can be
+    shared by concurrent embed calls.
+    """
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, dim: int = DEFAULT_DIM, hot_size: int = 4096):
+        self.cache_dir = cache_dir
+        self.dim = dim
+        self.hot_size = hot_size
+        self.hits = 0
+        self.misses = 0
+        self._hot = OrderedDict()
+        self._rows = {}
+        self._matrix = None
+        self._capacity = 0
+        self._next_row = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._vectors_path = os.path.join(cache_dir, VECTORS_FILE)
+        self._index_path = os.path.join(cache_dir, INDEX_FILE)
+        self._check_meta()
+        self._load_index()
+
+    @staticmethod
+    def make_key(model: str, task_type: str, text: str) -> str:
+        """Returns the content address of a (model, task_type, text) triple."""
+        digest = hashlib.sha1()
+        digest.update(model.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(task_type.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _check_meta(self):
+        meta_path = os.path.join(self.cache_dir, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            if meta["dim"] != self.dim:
+                raise ValueError(
+                    f"Embedding cache at {self.cache_dir} holds {meta['dim']}-dim vectors, not {self.dim}"
+                )
+        else:
+            with open(meta_path, "w") as f:
+                json.dump({"dim": self.dim, "dtype": "float32"}, f)
+
+    def _load_index(self):
+        """Reads the index file and maps the vector matrix behind it."""
+        n_rows_on_disk = 0
+        if os.path.exists(self._vectors_path):
+            n_rows_on_disk = os.path.getsize(self._vectors_path) // (4 * self.dim)
+        if os.path.exists(self._index_path):
+            with open(self._index_path, "r") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) != 2:
+                        continue
+                    row = int(parts[1])
+                    if row < n_rows_on_disk:
+                        self._rows[parts[0]] = row
+                        self._next_row = max(self._next_row, row + 1)
+        self._open_matrix(max(n_rows_on_disk, 1024))
+
+    def _open_matrix(self, capacity: int):
+        """(Re)maps the vector file, growing it to hold `capacity` rows."""
+        if self._matrix is not None:
+            self._matrix.flush()
+            del self._matrix
+        with open(self._vectors_path, "ab") as f:
+            if f.tell() < capacity * self.dim * 4:
+                f.truncate(capacity * self.dim * 4)
+        self._capacity = capacity
+        self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def _touch(self, key, vector):
+        self._hot[key] = vector
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.hot_size:
+            self._hot.popitem(last=False)
+
+    def get(self, key: str):
+        """Returns the cached vector for a key, or None on a miss."""
+        with self._lock:
+            vector = self._hot.get(key)
+            if vector is not None:
+                self._hot.move_to_end(key)
+                return vector
+            row = self._rows.get(key)
+            if row is None:
+                return None
+            vector = np.array(self._matrix[row])
+            self._touch(key, vector)
+            return vector
+
+    def put_many(self, keys: list, vectors):
+        """Appends new vectors to the matrix and records them in the index."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        with self._lock:
+            new = {}
+            for key, vector in zip(keys, vectors):
+                if key not in self._rows and key not in new:
+                    new[key] = vector
+            new = list(new.items())
+            if not new:
+                return
+            start = self._next_row
+            needed = start + len(new)
+            if needed > self._capacity:
+                self._open_matrix(max(needed, 2 * self._capacity))
+            for offset, (_, vector) in enumerate(new):
+                self._matrix[start + offset] = vector
+            self._matrix.flush()
+            self._next_row = needed
+            # Index lines are written only after their rows are on disk.
+            with open(self._index_path, "a") as f:
+                for offset, (key, vector) in enumerate(new):
+                    f.write(f"{key}\t{start + offset}\n")
+                    self._rows[key] = start + offset
+                    self._touch(key, np.array(vector))
+
+    def embed(self, texts: list, model: str, task_type: str, embed_fn) -> list:
+        """
+        Returns embeddings for `texts`, calling `embed_fn` only for cache misses.
+
+        `embed_fn(list_of_texts)` must return one vector per input text.
+        """
+        keys = [self.make_key(model, task_type, text) for text in texts]
+        results = [self.get(key) for key in keys]
+        missing = {}
+        for i, (key, vector) in enumerate(zip(keys, results)):
+            if vector is None:
+                missing.setdefault(key, []).append(i)
+        with self._lock:
+            self.hits += len(texts) - sum(len(v) for v in missing.values())
+            self.misses += sum(len(v) for v in missing.values())
+
+        if missing:
+            miss_keys = list(missing)
+            miss_texts = [texts[missing[key][0]] for key in miss_keys]
+            fresh = embed_fn(miss_texts)
+            self.put_many(miss_keys, fresh)
+            for key, vector in zip(miss_keys, fresh):
+                vector = np.asarray(vector, dtype=np.float32)
+                for i in missing[key]:
+                    results[i] = vector
+        return [np.asarray(v, dtype=np.float32).tolist() for v in results]
+
+
+_default_cache = None
+
+
+def get_default_cache() -> EmbeddingCache:
+    """Returns the process-wide embedding cache shared by all embed calls."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = EmbeddingCache()
+    return _default_cache
@@ -1,26 +1,21 @@
 import time
 import numpy as np
 from qdrant_client import QdrantClient, models
-import google.generativeai as genai
 import os
 from dotenv import load_dotenv
 import sys
+from src.embedders import get_embedder
 
-# --- Gemini API Key Configuration ---
+# --- Embedding Backend Configuration ---
 load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    print("Error: GEMINI_API_KEY not found.")
-    sys.exit(1)
-genai.configure(api_key=GEMINI_API_KEY)
+embedder = get_embedder()
 
 # --- Qdrant Client ---
 client = QdrantClient(":memory:")
 
 # --- Embedding Function ---
-def gemini_embed(captions: list[str], task_type: str):
-    result = genai.embed_content(model="models/embedding-001", content=captions, task_type=task_type)
-    return result['embedding']
+def embed_captions(captions: list[str], task_type: str):
+    return embedder.embed(captions, task_type=task_type).tolist()
 
 # --- Load Captions ---
 def load_captions(filepath: str) -> list:
@@ -50,14 +45,14 @@ if __name__ == "__main__":
         client.delete_collection("slam_keyframes")
     client.create_collection(
         collection_name="slam_keyframes",
-        vectors_config=models.VectorParams(size=768, distance=models.Distance.COSINE),
+        vectors_config=models.VectorParams(size=embedder.dim, distance=models.Distance.COSINE),
         hnsw_config=models.HnswConfigDiff(m=16, ef_construct=128)
     )
 
     # Index the keyframes
     print(f"Indexing {len(keyframes)} keyframes...")
     captions_batch = [k["caption"] for k in keyframes]
-    embeddings = gemini_embed(captions_batch, task_type="RETRIEVAL_DOCUMENT")
+    embeddings = embed_captions(captions_batch, task_type="RETRIEVAL_DOCUMENT")
     client.upsert(
         collection_name="slam_keyframes",
         points=[
@@ -73,7 +68,7 @@ if __name__ == "__main__":
     print(f"\nQuerying with: '{live_caption}'")
 
     # Generate query embedding
-    query_embedding = gemini_embed([live_caption], task_type="RETRIEVAL_QUERY")
+    query_embedding = embed_captions([live_caption], task_type="RETRIEVAL_QUERY")
 
     # Search the database
     search_results = client.query_points(
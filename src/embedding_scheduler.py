@@ -0,0 +1,132 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket refilled at `rate_per_minute`.
+
+    `acquire(n)` blocks until n tokens are available. Requests larger than
+    the bucket capacity are allowed through once the bucket is full.
+    """
+    def __init__(self, rate_per_minute: float, capacity: float = None, clock=time.monotonic, sleep=time.sleep):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate_per_second)
+        self._last = now
+
+    def acquire(self, amount: float = 1):
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate_per_second
+            self._sleep(wait)
+
+
+def estimate_tokens(texts: list) -> int:
+    """Rough token count for a batch of texts (about four characters per token)."""
+    return sum(len(text) // 4 + 1 for text in texts)
+
+
+class EmbeddingScheduler:
+    """
+    Runs embedding batches concurrently against a rate-limited backend.
+
+    Up to `max_inflight` batches are in flight at once on a thread pool.
+    Each request first draws from optional requests-per-minute and
+    tokens-per-minute buckets, and failed requests are retried with
+    exponential backoff and full jitter. Results are yielded in input order,
+    so callers can assign IDs as if embedding serially.
+    """
+    def __init__(self, embedder, max_inflight: int = 4, requests_per_minute: float = None,
+                 tokens_per_minute: float = None, max_retries: int = 5, base_delay: float = 1.0,
+                 max_delay: float = 30.0, sleep=time.sleep):
+        self.embedder = embedder
+        self.max_inflight = max_inflight
+        self.request_bucket = TokenBucket(requests_per_minute, sleep=sleep) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute, sleep=sleep) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.stats = {"batches": 0, "texts": 0, "requests": 0, "retries": 0, "elapsed_s": 0.0}
+
+    def _embed_with_retry(self, texts: list, task_type: str) -> np.ndarray:
+        for attempt in range(self.max_retries + 1):
+            if self.request_bucket:
+                self.request_bucket.acquire(1)
+            if self.token_bucket:
+                self.token_bucket.acquire(estimate_tokens(texts))
+            with self._lock:
+                self.stats["requests"] += 1
+            try:
+                return self.embedder.embed(texts, task_type=task_type)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                print(f"Embedding request failed ({e}); retrying in {delay:.2f}s")
+                with self._lock:
+                    self.stats["retries"] += 1
+                self._sleep(delay)
+
+    def embed_batches(self, batches, task_type: str = "RETRIEVAL_DOCUMENT", texts_of=None):
+        """
+        Embeds an iterable of batches, yielding (batch, embeddings) in input order.
+
+        `texts_of(batch)` extracts the list of texts from a batch; by default
+        each batch is itself the list of texts.
+        """
+        texts_of = texts_of or (lambda batch: batch)
+        start = time.perf_counter()
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.max_inflight) as pool:
+            try:
+                for batch in batches:
+                    texts = list(texts_of(batch))
+                    pending.append((batch, len(texts), pool.submit(self._embed_with_retry, texts, task_type)))
+                    while len(pending) >= self.max_inflight:
+                        yield self._collect(pending.popleft())
+                while pending:
+                    yield self._collect(pending.popleft())
+            finally:
+                for _, _, future in pending:
+                    future.cancel()
+                self.stats["elapsed_s"] += time.perf_counter() - start
+
+    def _collect(self, entry):
+        batch, n_texts, future = entry
+        embeddings = future.result()
+        self.stats["batches"] += 1
+        self.stats["texts"] += n_texts
+        return batch, embeddings
+
+    @property
+    def throughput(self) -> float:
+        """Texts embedded per second of wall-clock time spent in embed_batches."""
+        if self.stats["elapsed_s"] == 0:
+            return 0.0
+        return self.stats["texts"] / self.stats["elapsed_s"]
+
+    def report(self) -> str:
+        return (f"Embedded {self.stats['texts']} texts in {self.stats['batches']} batches "
+                f"({self.stats['requests']} requests, {self.stats['retries']} retries) "
+                f"in {self.stats['elapsed_s']:.2f}s: {self.throughput:.1f} texts/s")
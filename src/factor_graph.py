@@ -0,0 +1,546 @@
+import json
+import os
+import time
+
+import gtsam
+import numpy as np
+
+# Sigmas (rotation rad x3, translation m x3) of the prior that anchors the first pose.
+PRIOR_SIGMAS = np.array([1e-3] * 3 + [1e-3] * 3)
+# Sigmas of the odometry factors chaining consecutive poses.
+ODOMETRY_SIGMAS = np.array([0.05] * 3 + [0.1] * 3)
+
+# --- Robust Loop Closures ---
+# Robust kernels selectable per loop-closure factor, with their width parameter.
+ROBUST_KERNELS = {
+    "huber": (gtsam.noiseModel.mEstimator.Huber, 1.345),
+    "cauchy": (gtsam.noiseModel.mEstimator.Cauchy, 1.0),
+    "dcs": (gtsam.noiseModel.mEstimator.DCS, 1.0),
+}
+# 95% quantile of the chi-squared distribution with 6 degrees of freedom.
+CHI2_6DOF_95 = 12.592
+
+
+def noise_model(sigmas, kernel: str = None):
+    """Returns a diagonal Gaussian noise model, optionally wrapped in a robust kernel."""
+    gaussian = gtsam.noiseModel.Diagonal.Sigmas(np.asarray(sigmas, dtype=np.float64))
+    if kernel is None:
+        return gaussian
+    if kernel not in ROBUST_KERNELS:
+        raise ValueError(f"Unknown robust kernel '{kernel}'; expected one of {sorted(ROBUST_KERNELS)}")
+    estimator, width = ROBUST_KERNELS[kernel]
+    return gtsam.noiseModel.Robust.Create(estimator.Create(width), gaussian)
+
+
+# --- Binary Checkpoints ---
+# A checkpoint directory holds a manifest.json and numbered segments. Each
+# segment stores the poses and factors added since the previous one: poses
+# as an (N, 7) float64 array [x, y, z, qx, qy, qz, qw] with their IDs, and
+# factors as FACTOR_DTYPE records.
+CHECKPOINT_VERSION = 1
+FACTOR_PRIOR = 0
+FACTOR_BETWEEN = 1
+FACTOR_ODOMETRY = 2
+KERNEL_CODES = {None: 0, "huber": 1, "cauchy": 2, "dcs": 3}
+KERNEL_NAMES = {code: name for name, code in KERNEL_CODES.items()}
+FACTOR_DTYPE = np.dtype([
+    ("kind", np.uint8),
+    ("kernel", np.uint8),
+    ("from_id", np.int64),
+    ("to_id", np.int64),
+    ("pose", np.float64, (7,)),
+    ("sigmas", np.float64, (6,)),
+])
+
+
+def pose_to_array(pose) -> tuple:
+    q = pose.rotation().toQuaternion()
+    t = pose.translation()
+    return (t[0], t[1], t[2], q.x(), q.y(), q.z(), q.w())
+
+
+def array_to_pose(values):
+    x, y, z, qx, qy, qz, qw = values
+    # Renormalize: Rot3 from a slightly unnormalized quaternion is not orthogonal,
+    # and the error compounds when a record is re-serialized (e.g. by sparsify).
+    norm = np.sqrt(qx * qx + qy * qy + qz * qz + qw * qw)
+    return gtsam.Pose3(gtsam.Rot3.Quaternion(qw / norm, qx / norm, qy / norm, qz / norm), gtsam.Point3(x, y, z))
+
+
+def make_factor(record):
+    """Builds the gtsam factor described by a FACTOR_DTYPE record (or an equivalent tuple)."""
+    kind, kernel, from_id, to_id, pose, sigmas = record
+    noise = noise_model(sigmas, KERNEL_NAMES[int(kernel)])
+    if kind == FACTOR_PRIOR:
+        return gtsam.PriorFactorPose3(int(from_id), array_to_pose(pose), noise)
+    return gtsam.BetweenFactorPose3(int(from_id), int(to_id), array_to_pose(pose), noise)
+
+
+def _atomic_write(path: str, write):
+    """Writes a file through a temporary file, fsync and rename, so readers never see a partial file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_json_atomic(path: str, data: dict):
+    _atomic_write(path, lambda f: f.write(json.dumps(data, indent=2).encode()))
+
+
+def _read_manifest(path: str):
+    manifest_path = os.path.join(path, "manifest.json")
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest["version"] != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported factor graph checkpoint version {manifest['version']} in {path}")
+    return manifest
+
+
+def checkpoint_references(checkpoint_root: str, graph_state_dir: str) -> set:
+    """
+    Returns the segments of `graph_state_dir` listed by the graph_state.json
+    of any checkpoint directory directly under `checkpoint_root`.
+    """
+    referenced = set()
+    if not os.path.isdir(checkpoint_root):
+        return referenced
+    graph_state_dir = os.path.abspath(graph_state_dir)
+    for name in os.listdir(checkpoint_root):
+        ref_path = os.path.join(checkpoint_root, name, "graph_state.json")
+        if name.endswith(".tmp") or not os.path.exists(ref_path):
+            continue
+        with open(ref_path) as f:
+            ref = json.load(f)
+        if os.path.abspath(ref["path"]) == graph_state_dir:
+            referenced.update(ref["segments"])
+    return referenced
+
+
+def prune_segments(path: str, keep=()) -> list:
+    """
+    Deletes the segment files in the checkpoint directory `path` that
+    neither its manifest nor `keep` (e.g. the segments still referenced by
+    older checkpoints) lists. Returns the deleted file names.
+    """
+    manifest = _read_manifest(path)
+    if manifest is None:
+        return []
+    live = {entry["file"] for entry in manifest["segments"]} | set(keep)
+    pruned = sorted(
+        name for name in os.listdir(path) if name.startswith("segment_") and name.endswith(".npz") and name not in live
+    )
+    for name in pruned:
+        os.remove(os.path.join(path, name))
+    return pruned
+
+
+def max_clique(adjacency: np.ndarray) -> list:
+    """Returns the indices of a maximum clique of a boolean adjacency matrix (Bron-Kerbosch with pivoting)."""
+    neighbours = [set(np.flatnonzero(row)) - {i} for i, row in enumerate(adjacency)]
+    best = []
+
+    def expand(clique, candidates, excluded):
+        nonlocal best
+        if not candidates and not excluded:
+            if len(clique) > len(best):
+                best = clique
+            return
+        if len(clique) + len(candidates) <= len(best):
+            return
+        pivot = max(candidates | excluded, key=lambda v: len(neighbours[v] & candidates))
+        for v in list(candidates - neighbours[pivot]):
+            expand(clique + [v], candidates & neighbours[v], excluded & neighbours[v])
+            candidates = candidates - {v}
+            excluded = excluded | {v}
+
+    expand([], set(range(len(adjacency))), set())
+    return sorted(best)
+
+
+class FactorGraphManager:
+    """
+    Owns the pose graph of a SLAM session.
+
+    The first pose is anchored by a prior and consecutive poses are chained
+    by odometry factors, so the graph is fully constrained before any loop
+    closure arrives. In batch mode `optimize` runs Levenberg-Marquardt over
+    the whole graph.
+
+    In incremental mode new poses and factors are buffered and `update`
+    hands only them to gtsam.ISAM2, which re-solves just the affected part of
+    the Bayes tree; call it once per keyframe to keep the estimate current at
+    a bounded per-keyframe cost.
+    """
+    def __init__(self, incremental: bool = False, relinearize_threshold: float = 0.1, relinearize_skip: int = 1,
+                 prior_sigmas=PRIOR_SIGMAS, odometry_sigmas=ODOMETRY_SIGMAS, loop_closure_kernel: str = None):
+        self.graph = gtsam.NonlinearFactorGraph()
+        self.initial_estimates = gtsam.Values()
+        self.next_pose_id = 0
+        self.incremental = incremental
+        self.relinearize_threshold = relinearize_threshold
+        self.relinearize_skip = relinearize_skip
+        self.odometry_sigmas = np.asarray(odometry_sigmas, dtype=np.float64)
+        self.loop_closure_kernel = loop_closure_kernel
+        self.update_latencies_ms = []
+        self.last_optimization = {}
+        self.loop_closure_stats = {"proposed": 0, "accepted": 0, "rejected": 0, "unchecked": 0}
+        self.prior_sigmas = np.asarray(prior_sigmas, dtype=np.float64)
+        # Serializable mirror of the graph: pose IDs/arrays and factor records, in insertion order.
+        self._pose_ids = []
+        self._pose_arrays = []
+        self._factor_records = []
+        # What the last save_state/load_state left on disk, for delta checkpoints.
+        self._saved = None
+        if incremental:
+            self._reset_isam()
+
+    @property
+    def pose_ids(self) -> list:
+        """IDs of the poses currently in the graph, in insertion order."""
+        return list(self._pose_ids)
+
+    @property
+    def pending_factor_count(self) -> int:
+        """Incremental mode: factors held back because one of their poses does not exist (yet)."""
+        return len(self._pending_factors) if self.incremental else 0
+
+    def _reset_isam(self):
+        params = gtsam.ISAM2Params()
+        params.setRelinearizeThreshold(self.relinearize_threshold)
+        params.relinearizeSkip = self.relinearize_skip
+        self.isam = gtsam.ISAM2(params)
+        self._new_factors = gtsam.NonlinearFactorGraph()
+        self._new_values = gtsam.Values()
+        # Factors whose poses do not exist yet; ISAM2 rejects unknown keys.
+        self._pending_factors = []
+
+    def _add_factor(self, factor, keys):
+        self.graph.add(factor)
+        if not self.incremental:
+            return
+        if all(self.initial_estimates.exists(key) for key in keys):
+            self._new_factors.add(factor)
+        else:
+            self._pending_factors.append((factor, keys))
+
+    def add_pose(self, pose):
+        """
+        Adds a new pose to the factor graph. The first pose is anchored by a
+        prior; every later pose is linked to its predecessor by an odometry
+        factor measured from the two estimates.
+        """
+        return self.add_poses([pose])[0]
+
+    def add_poses(self, poses) -> list:
+        """Adds consecutive poses and their prior/odometry factors in one batch and returns their IDs."""
+        pose_ids = []
+        factors = gtsam.NonlinearFactorGraph()
+        previous = self.initial_estimates.atPose3(self.next_pose_id - 1) if self.next_pose_id > 0 else None
+        for pose in poses:
+            pose_id = self.next_pose_id
+            self.initial_estimates.insert(pose_id, pose)
+            self._pose_ids.append(pose_id)
+            self._pose_arrays.append(pose_to_array(pose))
+            if self.incremental:
+                self._new_values.insert(pose_id, pose)
+            if previous is None:
+                record = (FACTOR_PRIOR, 0, pose_id, pose_id, pose_to_array(pose), tuple(self.prior_sigmas))
+            else:
+                record = (FACTOR_ODOMETRY, 0, pose_id - 1, pose_id, pose_to_array(previous.between(pose)),
+                          tuple(self.odometry_sigmas))
+            self._factor_records.append(record)
+            factors.add(make_factor(record))
+            previous = pose
+            pose_ids.append(pose_id)
+            self.next_pose_id += 1
+
+        self.graph.push_back(factors)
+        if self.incremental:
+            self._new_factors.push_back(factors)
+            self._flush_pending()
+        return pose_ids
+
+    def _flush_pending(self):
+        still_pending = []
+        for factor, keys in self._pending_factors:
+            if all(self.initial_estimates.exists(key) for key in keys):
+                self._new_factors.add(factor)
+            else:
+                still_pending.append((factor, keys))
+        self._pending_factors = still_pending
+
+    def add_loop_closure(self, from_id, to_id, relative_pose, confidence, kernel: str = None):
+        """
+        Adds a loop closure constraint between two poses. `kernel` ("huber",
+        "cauchy" or "dcs") overrides the manager's default robust kernel.
+        """
+        kernel = kernel or self.loop_closure_kernel
+        if kernel not in KERNEL_CODES:
+            raise ValueError(f"Unknown robust kernel '{kernel}'; expected one of {sorted(ROBUST_KERNELS)}")
+        record = (FACTOR_BETWEEN, KERNEL_CODES[kernel], from_id, to_id, pose_to_array(relative_pose), (1.0 / confidence,) * 6)
+        self._factor_records.append(record)
+        self._add_factor(make_factor(record), (from_id, to_id))
+
+    def add_loop_closures(self, closures, check_consistency: bool = False, chi2: float = CHI2_6DOF_95) -> list:
+        """
+        Adds many (from_id, to_id, relative_pose, confidence) loop closures at
+        once and returns the ones inserted. With `check_consistency`, only the
+        largest pairwise-consistent subset (PCM) of the batch is inserted.
+        """
+        closures = list(closures)
+        accepted = self.consistent_loop_closures(closures, chi2) if check_consistency else closures
+        for from_id, to_id, relative_pose, confidence in accepted:
+            self.add_loop_closure(from_id, to_id, relative_pose, confidence)
+        self.loop_closure_stats["proposed"] += len(closures)
+        self.loop_closure_stats["accepted"] += len(accepted)
+        self.loop_closure_stats["rejected"] += len(closures) - len(accepted)
+        return accepted
+
+    def _odometry_between(self, from_id, to_id):
+        """Relative pose and accumulated odometry variance between two pose estimates."""
+        relative = self.initial_estimates.atPose3(from_id).between(self.initial_estimates.atPose3(to_id))
+        return relative, self.odometry_sigmas ** 2 * abs(to_id - from_id)
+
+    def consistent_loop_closures(self, closures, chi2: float = CHI2_6DOF_95) -> list:
+        """
+        Pairwise consistency maximization: two closures i->j and k->l agree
+        if the cycle i -> j -> l -> k -> i through them and the odometry
+        composes to the identity within `chi2` (Mahalanobis, 6 DOF). Returns
+        the closures of the maximum clique of agreeing pairs, in input order.
+        Closures whose poses have no estimate yet cannot be checked and are
+        always kept.
+        """
+        checkable = [
+            n for n, (from_id, to_id, _, _) in enumerate(closures)
+            if self.initial_estimates.exists(from_id) and self.initial_estimates.exists(to_id)
+        ]
+        self.loop_closure_stats["unchecked"] += len(closures) - len(checkable)
+        if len(checkable) <= 1:
+            return closures
+
+        adjacency = np.eye(len(checkable), dtype=bool)
+        for a, n_a in enumerate(checkable):
+            i, j, z_a, confidence_a = closures[n_a]
+            for b in range(a + 1, len(checkable)):
+                k, l, z_b, confidence_b = closures[checkable[b]]
+                odometry_jl, variance_jl = self._odometry_between(j, l)
+                odometry_ki, variance_ki = self._odometry_between(k, i)
+                cycle = z_a.compose(odometry_jl).compose(z_b.inverse()).compose(odometry_ki)
+                residual = gtsam.Pose3.Logmap(cycle)
+                variance = variance_jl + variance_ki + 1.0 / confidence_a ** 2 + 1.0 / confidence_b ** 2
+                adjacency[a, b] = adjacency[b, a] = np.sum(residual ** 2 / variance) <= chi2
+
+        rejected = set(checkable) - {checkable[a] for a in max_clique(adjacency)}
+        return [c for n, c in enumerate(closures) if n not in rejected]
+
+    def update(self):
+        """
+        Incremental mode: passes the poses and factors added since the last
+        update to ISAM2 and returns the current estimate.
+        """
+        if not self.incremental:
+            raise ValueError("update() requires a FactorGraphManager created with incremental=True")
+        start_time = time.perf_counter()
+        self.isam.update(self._new_factors, self._new_values)
+        self.update_latencies_ms.append((time.perf_counter() - start_time) * 1000)
+        self._new_factors = gtsam.NonlinearFactorGraph()
+        self._new_values = gtsam.Values()
+        return self.isam.calculateEstimate()
+
+    def latency_stats(self) -> dict:
+        """Summarizes the per-update ISAM2 latencies in milliseconds."""
+        if not self.update_latencies_ms:
+            return {"updates": 0}
+        latencies = np.asarray(self.update_latencies_ms)
+        return {
+            "updates": len(latencies),
+            "mean_ms": float(latencies.mean()),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "max_ms": float(latencies.max()),
+            "total_ms": float(latencies.sum()),
+        }
+
+    def optimize(self):
+        """Optimizes the factor graph."""
+        if self.incremental:
+            return self.update()
+        start_time = time.perf_counter()
+        optimizer = gtsam.LevenbergMarquardtOptimizer(self.graph, self.initial_estimates)
+        result = optimizer.optimize()
+        self.last_optimization = {
+            "iterations": optimizer.iterations(),
+            "error": optimizer.error(),
+            "time_ms": (time.perf_counter() - start_time) * 1000,
+        }
+        return result
+
+    def _rebuild_graph(self):
+        """Rebuilds the gtsam graph (and the ISAM2 state) from the factor records."""
+        self.graph = gtsam.NonlinearFactorGraph()
+        if self.incremental:
+            # The Bayes tree is rebuilt from the whole graph on the next update.
+            self._reset_isam()
+            self._new_values = gtsam.Values(self.initial_estimates)
+        for record in self._factor_records:
+            self._add_factor(make_factor(record), (record[2], record[3]))
+
+    # --- Sparsification ---
+    def sparsify(self, min_translation: float = 0.05, min_rotation: float = 0.05, window: int = 100) -> dict:
+        """
+        Merges redundant keyframes to keep long sessions bounded.
+
+        Poses older than the last `window` ones that moved less than
+        `min_translation` metres and `min_rotation` radians from the last kept
+        pose are folded into it. The odometry between kept poses is recomposed
+        with the merged steps' variances summed, and loop closures of merged
+        poses are re-anchored on the pose that absorbed them, so no loop
+        closure is lost. Returns {merged_id: kept_id}. `window` must be at
+        least 1: the newest pose anchors the next odometry factor.
+        """
+        if window < 1:
+            raise ValueError(f"window must be at least 1, got {window}")
+        ids = self._pose_ids
+        if len(ids) <= window + 1:
+            return {}
+        estimate = self.initial_estimates.atPose3
+        merged = {}
+        last_kept = ids[0]
+        for pose_id in ids[1:len(ids) - window]:
+            delta = estimate(last_kept).between(estimate(pose_id))
+            if (np.linalg.norm(delta.translation()) < min_translation
+                    and np.linalg.norm(gtsam.Rot3.Logmap(delta.rotation())) < min_rotation):
+                merged[pose_id] = last_kept
+            else:
+                last_kept = pose_id
+        if not merged:
+            return {}
+
+        odometry_variance = {
+            (r[2], r[3]): np.asarray(r[5]) ** 2 for r in self._factor_records if r[0] == FACTOR_ODOMETRY
+        }
+        records = [r for r in self._factor_records if r[0] == FACTOR_PRIOR and r[2] not in merged]
+        variance = np.zeros(6)
+        previous = ids[0]
+        for a, b in zip(ids, ids[1:]):
+            variance = variance + odometry_variance.get((a, b), self.odometry_sigmas ** 2)
+            if b not in merged:
+                relative = estimate(previous).between(estimate(b))
+                records.append((FACTOR_ODOMETRY, 0, previous, b, pose_to_array(relative), tuple(np.sqrt(variance))))
+                variance = np.zeros(6)
+                previous = b
+
+        for kind, kernel, from_id, to_id, pose, sigmas in self._factor_records:
+            if kind != FACTOR_BETWEEN:
+                continue
+            relative = array_to_pose(pose)
+            if from_id in merged:
+                relative = estimate(merged[from_id]).between(estimate(from_id)).compose(relative)
+                from_id = merged[from_id]
+            if to_id in merged:
+                relative = relative.compose(estimate(merged[to_id]).between(estimate(to_id)).inverse())
+                to_id = merged[to_id]
+            if from_id != to_id:
+                records.append((kind, kernel, from_id, to_id, pose_to_array(relative), sigmas))
+
+        for pose_id in merged:
+            self.initial_estimates.erase(pose_id)
+        keep = [n for n, pose_id in enumerate(ids) if pose_id not in merged]
+        self._pose_ids = [ids[n] for n in keep]
+        self._pose_arrays = [self._pose_arrays[n] for n in keep]
+        self._factor_records = records
+        self._rebuild_graph()
+        # Removals cannot be expressed as a delta; the next checkpoint is a full one.
+        self._saved = None
+        return merged
+
+    def save_state(self, path: str, prune: bool = False) -> list:
+        """
+        Checkpoints the graph into the directory `path` and returns the
+        segment files that make up this state.
+
+        Saving again to the same directory only appends a segment with the
+        poses and factors added since the last save, so checkpoint time is
+        proportional to the new data. Segments and the manifest are written
+        through fsync + rename. Segments of older generations are kept for
+        the checkpoints that reference them; with `prune`, a save that starts
+        a new generation deletes them once the new manifest is written (see
+        prune_segments for keeping the ones still in use).
+        """
+        os.makedirs(path, exist_ok=True)
+        manifest = _read_manifest(path)
+        saved = self._saved
+        delta = (
+            saved is not None and manifest is not None and saved["path"] == os.path.abspath(path)
+            and manifest["generation"] == saved["generation"] and len(manifest["segments"]) == saved["segments"]
+        )
+        if delta:
+            pose_start, factor_start = saved["poses"], saved["factors"]
+        else:
+            # A new generation of segments never overwrites files an older checkpoint may still reference.
+            generation = manifest["generation"] + 1 if manifest is not None else 0
+            manifest = {"version": CHECKPOINT_VERSION, "generation": generation, "segments": []}
+            pose_start = factor_start = 0
+
+        pose_ids = np.asarray(self._pose_ids[pose_start:], dtype=np.int64)
+        poses = np.asarray(self._pose_arrays[pose_start:], dtype=np.float64).reshape(-1, 7)
+        factors = np.array(self._factor_records[factor_start:], dtype=FACTOR_DTYPE)
+        segment = f"segment_g{manifest['generation']:04d}_{len(manifest['segments']):05d}.npz"
+        _atomic_write(os.path.join(path, segment), lambda f: np.savez(f, pose_ids=pose_ids, poses=poses, factors=factors))
+
+        manifest["segments"].append({"file": segment, "poses": len(pose_ids), "factors": len(factors)})
+        write_json_atomic(os.path.join(path, "manifest.json"), manifest)
+        self._saved = {
+            "path": os.path.abspath(path), "generation": manifest["generation"], "segments": len(manifest["segments"]),
+            "poses": len(self._pose_ids), "factors": len(self._factor_records),
+        }
+        if prune and not delta:
+            prune_segments(path)
+        return [entry["file"] for entry in manifest["segments"]]
+
+    def load_state(self, path: str, segments: list = None):
+        """
+        Restores a checkpoint written by save_state. `segments` selects an
+        older state (as returned by save_state); by default the latest one
+        in the manifest is loaded.
+        """
+        manifest = _read_manifest(path)
+        if manifest is None:
+            raise ValueError(f"No factor graph checkpoint found in {path}")
+        latest = [entry["file"] for entry in manifest["segments"]]
+        segments = latest if segments is None else list(segments)
+
+        pose_ids, poses, factors = [], [], []
+        for segment in segments:
+            with np.load(os.path.join(path, segment)) as data:
+                pose_ids.append(data["pose_ids"])
+                poses.append(data["poses"])
+                factors.append(data["factors"])
+        pose_ids = np.concatenate(pose_ids) if pose_ids else np.zeros(0, dtype=np.int64)
+        poses = np.concatenate(poses) if poses else np.zeros((0, 7))
+        factors = np.concatenate(factors) if factors else np.zeros(0, dtype=FACTOR_DTYPE)
+
+        self.initial_estimates = gtsam.Values()
+        for pose_id, pose in zip(pose_ids.tolist(), poses):
+            self.initial_estimates.insert(pose_id, array_to_pose(pose))
+        self._pose_ids = pose_ids.tolist()
+        self._pose_arrays = [tuple(p) for p in poses.tolist()]
+        self._factor_records = [
+            (int(r["kind"]), int(r["kernel"]), int(r["from_id"]), int(r["to_id"]), tuple(r["pose"]), tuple(r["sigmas"]))
+            for r in factors
+        ]
+        self.next_pose_id = int(pose_ids.max()) + 1 if len(pose_ids) else 0
+        self._rebuild_graph()
+
+        # Further saves to the same directory are deltas only if this is its latest state.
+        self._saved = None
+        if segments == latest:
+            self._saved = {
+                "path": os.path.abspath(path), "generation": manifest["generation"], "segments": len(latest),
+                "poses": len(self._pose_ids), "factors": len(self._factor_records),
+            }
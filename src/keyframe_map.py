@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+
+from src.trajectory_io import read_tum
+
+
+def nearest_indices(stamps: np.ndarray, query_stamps: np.ndarray) -> np.ndarray:
+    """Returns, for each query stamp, the index of the nearest of the sorted `stamps`."""
+    stamps = np.asarray(stamps, dtype=np.float64)
+    query_stamps = np.asarray(query_stamps, dtype=np.float64)
+    if len(stamps) < 2:
+        return np.zeros(len(query_stamps), dtype=np.int64)
+    right = np.clip(np.searchsorted(stamps, query_stamps), 1, len(stamps) - 1)
+    left = right - 1
+    return np.where(np.abs(stamps[left] - query_stamps) <= np.abs(stamps[right] - query_stamps), left, right)
+
+
+def keyframe_groundtruth_indices(groundtruth: np.ndarray, keyframes: list) -> dict:
+    """
+    Maps each keyframe image (named by its TUM timestamp) to the row of the
+    (N, 8) ground truth nearest in time. Keyframes whose file name is not a
+    timestamp are left out.
+    """
+    filenames, timestamps = [], []
+    for keyframe in keyframes:
+        try:
+            timestamps.append(float(os.path.splitext(keyframe["filename"])[0]))
+            filenames.append(keyframe["filename"])
+        except ValueError:
+            continue
+    if not filenames or not len(groundtruth):
+        return {}
+    return dict(zip(filenames, nearest_indices(groundtruth[:, 0], timestamps).tolist()))
+
+
+def load_keyframe_poses(groundtruth_file: str, keyframes: list) -> dict:
+    """Maps each keyframe image (named by its TUM timestamp) to the nearest ground-truth position."""
+    if not os.path.exists(groundtruth_file):
+        print(f"Warning: {groundtruth_file} not found; keyframes are indexed without poses.")
+        return {}
+    groundtruth = read_tum(groundtruth_file)
+    return {
+        filename: groundtruth[row, 1:4]
+        for filename, row in keyframe_groundtruth_indices(groundtruth, keyframes).items()
+    }
+
+
+_warned_without_poses = False
+
+
+def query_near_pose(vector_db, query_embedding, position=None, radius: float = 1.0, top_k: int = 1):
+    """
+    Searches the map for keyframes near `position`, which must be in the
+    frame of the stored keyframe poses. A map without any poses cannot be
+    restricted geometrically; it is then searched as a whole, with a warning.
+    """
+    global _warned_without_poses
+    if position is not None and len(vector_db.pose_index) == 0:
+        if not _warned_without_poses:
+            print("Warning: no keyframe poses are indexed; loop-closure search is not restricted by pose.")
+            _warned_without_poses = True
+        position = None
+    if position is None:
+        return vector_db.query(query_embedding, top_k=top_k)
+    return vector_db.query(query_embedding, top_k=top_k, near_pose=position, radius=radius)
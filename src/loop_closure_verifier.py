@@ -0,0 +1,272 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+# --- Configuration ---
+DEFAULT_CACHE_DIR = os.getenv("VERDICT_CACHE_DIR", os.path.join(".cache", "verdicts"))
+VERDICTS_FILE = "verdicts.tsv"
+STOPWORDS = frozenset({'a', 'an', 'the', 'of', 'in', 'is', 'on', 'photo', 'picture'})
+OVERLAP_THRESHOLD = 0.1  # Minimum caption Jaccard overlap for a local "yes"
+
+
+def tokenize(caption: str) -> list:
+    """Lower-cases a caption, splits it on whitespace and drops stopwords."""
+    return [word for word in caption.lower().split() if word not in STOPWORDS]
+
+
+# --- Local caption-overlap verification ---
+class CaptionOverlapIndex:
+    """
+    Pre-tokenized map captions for vectorized word-overlap verification.
+
+    Every caption is stored once, at index time, as the sorted set of its
+    token IDs in CSR form (`indptr`, `indices`). Scoring a live caption marks
+    its tokens in a vocabulary-sized mask and counts the hits per row with
+    one bincount, so the Jaccard overlap with any number of candidates costs
+    a handful of array operations instead of a Python set per pair.
+    """
+    def __init__(self, captions=None):
+        self.vocabulary = {}
+        self.ids = np.empty(0, dtype=np.int64)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.empty(0, dtype=np.int64)
+        self._sizes = np.empty(0, dtype=np.int64)
+        self._rows = {}
+        self._row_of_index = None
+        if captions:
+            self.add(captions)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, captions):
+        """Indexes (keyframe_id, caption) pairs; IDs that are already indexed are skipped."""
+        new_ids, rows = [], []
+        for keyframe_id, caption in captions:
+            if keyframe_id in self._rows:
+                continue
+            self._rows[keyframe_id] = len(self.ids) + len(new_ids)
+            new_ids.append(keyframe_id)
+            tokens = {self.vocabulary.setdefault(word, len(self.vocabulary)) for word in tokenize(caption)}
+            rows.append(np.array(sorted(tokens), dtype=np.int64))
+        if not new_ids:
+            return
+        sizes = np.array([len(row) for row in rows], dtype=np.int64)
+        self.ids = np.concatenate([self.ids, np.array(new_ids, dtype=np.int64)])
+        self.indices = np.concatenate([self.indices] + rows)
+        self.indptr = np.concatenate([self.indptr, self.indptr[-1] + np.cumsum(sizes)])
+        self._sizes = np.concatenate([self._sizes, sizes])
+        self._row_of_index = None
+
+    def _query_mask(self, caption: str):
+        words = set(tokenize(caption))
+        mask = np.zeros(len(self.vocabulary), dtype=bool)
+        # Words missing from the map vocabulary can only grow the union.
+        mask[[self.vocabulary[word] for word in words if word in self.vocabulary]] = True
+        return mask, len(words)
+
+    def scores(self, caption: str, keyframe_ids=None) -> np.ndarray:
+        """
+        Returns the Jaccard overlap of `caption` with the given keyframes (in
+        that order), or with every indexed keyframe when `keyframe_ids` is None.
+        Keyframes that are not indexed score zero.
+        """
+        mask, num_tokens = self._query_mask(caption)
+        if keyframe_ids is None:
+            rows = np.arange(len(self.ids))
+            hits = mask[self.indices]
+            if self._row_of_index is None:
+                self._row_of_index = np.repeat(rows, self._sizes)
+            row_of_hit = self._row_of_index
+        else:
+            rows = np.array([self._rows.get(keyframe_id, -1) for keyframe_id in keyframe_ids], dtype=np.int64)
+            if (rows < 0).any():
+                scores = np.zeros(len(rows))
+                known = rows >= 0
+                if known.any():
+                    scores[known] = self.scores(caption, np.asarray(keyframe_ids)[known])
+                return scores
+            lengths = self._sizes[rows]
+            offsets = np.concatenate([[0], np.cumsum(lengths)])
+            # Gathers the CSR slices of the selected rows into one flat array.
+            positions = np.arange(offsets[-1]) + np.repeat(self.indptr[rows] - offsets[:-1], lengths)
+            hits = mask[self.indices[positions]]
+            row_of_hit = np.repeat(np.arange(len(rows)), lengths)
+        intersection = np.bincount(row_of_hit, weights=hits, minlength=len(rows))
+        union = self._sizes[rows] + num_tokens - intersection
+        return np.divide(intersection, union, out=np.zeros(len(rows)), where=union > 0)
+
+    def verify(self, caption: str, keyframe_ids=None, threshold: float = OVERLAP_THRESHOLD):
+        """Returns (is_match, confidence) arrays; non-matches get zero confidence as before."""
+        scores = self.scores(caption, keyframe_ids)
+        is_match = scores > threshold
+        return is_match, np.where(is_match, scores, 0.0)
+
+
+# --- LLM verification stage ---
+def make_verification_prompt(caption_a: str, caption_b: str) -> str:
+    return f"""
+    You are a visual verification agent for a SLAM system.
+    Your task is to determine if two image captions describe the same physical location,
+    even if viewed from a different angle or at a different time.
+
+    Caption A: "{caption_a}"
+    Caption B: "{caption_b}"
+
+    Do these two captions describe the same location?
+    Answer with only "Yes" or "No".
+    """
+
+
+class _StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubVerificationModel:
+    """
+    A local stand-in for the Gemini model with the same generate_content API.
+
+    It answers from caption word overlap after `latency_s`, so the
+    verification stage can be exercised and benchmarked without an API key.
+    """
+    def __init__(self, latency_s: float = 0.0, threshold: float = OVERLAP_THRESHOLD):
+        self.latency_s = latency_s
+        self.threshold = threshold
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency_s)
+        caption_a, caption_b = re.findall(r'Caption [AB]: "(.*)"', prompt)
+        index = CaptionOverlapIndex([(0, caption_b)])
+        is_match = index.scores(caption_a)[0] > self.threshold
+        return _StubResponse("Yes" if is_match else "No")
+
+
+class VerdictCache:
+    """
+    A persistent verdict cache keyed by sha1(model, caption_a, caption_b).
+
+    Verdicts are appended to a TSV file as they arrive and read back on
+    start-up, so a pair is only ever sent to the model once.
+    """
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._verdicts = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._path = os.path.join(cache_dir, VERDICTS_FILE)
+        if os.path.exists(self._path):
+            with open(self._path, "r") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) == 2 and parts[1] in ("0", "1"):
+                        self._verdicts[parts[0]] = parts[1] == "1"
+
+    def __len__(self):
+        return len(self._verdicts)
+
+    @staticmethod
+    def make_key(model: str, caption_a: str, caption_b: str) -> str:
+        digest = hashlib.sha1()
+        for part in (model, caption_a, caption_b):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        """Returns the cached verdict for a key, or None on a miss."""
+        with self._lock:
+            verdict = self._verdicts.get(key)
+            if verdict is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return verdict
+
+    def put(self, key: str, verdict: bool):
+        with self._lock:
+            if key in self._verdicts:
+                return
+            self._verdicts[key] = verdict
+            with open(self._path, "a") as f:
+                f.write(f"{key}\t{int(verdict)}\n")
+
+
+class LoopClosureVerifier:
+    """
+    Verifies loop-closure candidates against a generative model concurrently.
+
+    All uncached candidates are dispatched at once on a thread pool and the
+    first confirmed match is returned while the rest are cancelled, so a
+    verification round costs about one model round-trip instead of one per
+    candidate. Every verdict that arrives, including from requests still in
+    flight after the return, is stored in the VerdictCache. A candidate
+    whose model call fails counts as a non-match and is not cached.
+    """
+    def __init__(self, model, model_name: str = "gemini-1.5-flash", cache: VerdictCache = None, max_workers: int = 5):
+        self.model = model
+        self.model_name = model_name
+        self.cache = cache
+        self.failures = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+
+    def close(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def _ask(self, caption_a: str, caption_b: str, key: str) -> bool:
+        response = self.model.generate_content(make_verification_prompt(caption_a, caption_b))
+        verdict = "yes" in response.text.lower()
+        if self.cache is not None:
+            self.cache.put(key, verdict)
+        return verdict
+
+    def verify(self, caption_a: str, caption_b: str) -> bool:
+        """Verifies a single caption pair, through the cache."""
+        return self.first_match(caption_a, [caption_b]) == 0
+
+    def first_match(self, caption: str, candidate_captions: list):
+        """
+        Returns the index of the first candidate confirmed to show the same
+        place as `caption`, or None. Cached matches win over model calls and
+        are taken in candidate order.
+        """
+        keys = [VerdictCache.make_key(self.model_name, caption, candidate) for candidate in candidate_captions]
+        uncached = []
+        for i, key in enumerate(keys):
+            verdict = self.cache.get(key) if self.cache is not None else None
+            if verdict:
+                return i
+            if verdict is None:
+                uncached.append(i)
+
+        futures = {self._pool.submit(self._ask, caption, candidate_captions[i], keys[i]): i for i in uncached}
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                matches = [futures[future] for future in done if self._verdict(future, candidate_captions[futures[future]])]
+                if matches:
+                    return min(matches)
+            return None
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _verdict(self, future, candidate_caption: str) -> bool:
+        try:
+            return future.result()
+        except Exception as e:
+            self.failures += 1
+            print(f"  - WARNING: Verification of candidate '{candidate_caption}' failed: {e}")
+            return False
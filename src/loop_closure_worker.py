@@ -0,0 +1,98 @@
+import queue
+import threading
+import time
+from collections import deque
+
+# --- Configuration ---
+DEFAULT_MAX_QUEUE = 8  # Keyframes waiting for retrieval + verification
+
+
+class LoopClosureWorker:
+    """
+    Runs loop-closure retrieval and verification on a background thread.
+
+    The tracking loop hands keyframes to `submit`, which never blocks: when
+    the bounded queue is full the oldest waiting keyframe is dropped, since a
+    fresh keyframe is the better loop-closure query. Each keyframe is passed
+    to `process_fn`, which returns a constraint or None. Constraints are
+    collected for the caller to `drain` on its own thread, so the pose graph
+    (which is not thread-safe) is only ever touched by the tracking loop.
+    """
+    def __init__(self, process_fn, max_queue: int = DEFAULT_MAX_QUEUE):
+        self.process_fn = process_fn
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._results = deque()
+        self._lock = threading.Lock()
+        self.stats = {"submitted": 0, "processed": 0, "dropped": 0, "failed": 0, "constraints": 0, "busy_s": 0.0}
+        self._thread = threading.Thread(target=self._run, name="loop-closure-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, *args) -> bool:
+        """Queues a keyframe; returns False if an older one had to be dropped to make room."""
+        with self._lock:
+            self.stats["submitted"] += 1
+            dropped = False
+            while True:
+                try:
+                    self._queue.put_nowait(args)
+                    return not dropped
+                except queue.Full:
+                    try:
+                        self._queue.get_nowait()
+                        self._queue.task_done()
+                        self.stats["dropped"] += 1
+                        dropped = True
+                    except queue.Empty:
+                        pass
+
+    def _run(self):
+        while True:
+            args = self._queue.get()
+            if args is None:
+                self._queue.task_done()
+                return
+            start = time.perf_counter()
+            try:
+                constraint = self.process_fn(*args)
+            except Exception as e:
+                print(f"  - WARNING: Loop closure search failed: {e}")
+                constraint = None
+                with self._lock:
+                    self.stats["failed"] += 1
+            with self._lock:
+                self.stats["processed"] += 1
+                self.stats["busy_s"] += time.perf_counter() - start
+                if constraint is not None:
+                    self._results.append(constraint)
+                    self.stats["constraints"] += 1
+            self._queue.task_done()
+
+    @property
+    def backlog(self) -> int:
+        return self._queue.qsize()
+
+    def drain(self) -> list:
+        """Returns the constraints verified since the last call."""
+        with self._lock:
+            results = list(self._results)
+            self._results.clear()
+        return results
+
+    def close(self, wait: bool = True) -> list:
+        """
+        Stops the worker and returns the remaining constraints. With `wait`,
+        keyframes already queued are processed first; otherwise they are dropped.
+        """
+        if not wait:
+            with self._lock:
+                while True:
+                    try:
+                        self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    self._queue.task_done()
+                    self.stats["dropped"] += 1
+        # The sentinel may wait for room, but the worker is still consuming.
+        self._queue.put(None)
+        self._thread.join()
+        return self.drain()
@@ -0,0 +1,483 @@
+import json
+import os
+import shutil
+import numpy as np
+from qdrant_client.http import models
+
+META_FILE = "meta.json"
+VECTORS_FILE = "vectors.bin"
+IDS_FILE = "ids.bin"
+PAYLOADS_FILE = "payloads.jsonl"
+
+# Bits set in each byte value, for Hamming distances between packed binary codes.
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+
+
+def quantization_mode(quantization_config) -> str:
+    """Maps a Qdrant quantization config to "int8", "binary" or None."""
+    if quantization_config is None:
+        return None
+    if isinstance(quantization_config, models.ScalarQuantization):
+        return "int8"
+    if isinstance(quantization_config, models.BinaryQuantization):
+        return "binary"
+    raise NotImplementedError(f"Unsupported quantization config: {quantization_config!r}")
+
+
+class _Collection:
+    """
+    Contiguous storage for one collection: an (n, dim) matrix, point IDs and payloads.
+
+    With a `directory`, the matrix and IDs are memory-mapped files and every
+    upsert is appended to disk, so reopening the collection is a warm start.
+
+    With a `quantization` of "int8" (scalar) or "binary" (sign bits), compact
+    codes are kept in RAM alongside the full-precision matrix; searches scan
+    the codes and rescore the best candidates against the matrix, which stays
+    on disk when the collection is persisted.
+    """
+    def __init__(self, size: int, distance, dtype, directory: str = None, quantization: str = None,
+                 metadata: dict = None):
+        self.size = size
+        self.distance = models.Distance(distance)
+        self.dtype = np.dtype(dtype)
+        self.directory = directory
+        self.quantization = quantization
+        self.metadata = metadata
+        self.scale = None
+        self.matrix = np.zeros((0, size), dtype=self.dtype)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.codes = np.zeros((0, self.code_size), dtype=self.code_dtype)
+        self.payloads = []
+        self.rows = {}
+        self.count = 0
+        if quantization and self.distance == models.Distance.EUCLID:
+            raise ValueError("Quantized collections support COSINE and DOT distances only")
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._write_meta()
+
+    @classmethod
+    def open(cls, directory: str):
+        """Loads a collection previously persisted to `directory`."""
+        with open(os.path.join(directory, META_FILE), "r") as f:
+            meta = json.load(f)
+        collection = cls.__new__(cls)
+        collection.size = meta["size"]
+        collection.distance = models.Distance(meta["distance"])
+        collection.dtype = np.dtype(meta["dtype"])
+        collection.directory = directory
+        collection.quantization = meta.get("quantization")
+        collection.metadata = meta.get("metadata")
+        collection.scale = meta.get("scale")
+        collection.count = meta["count"]
+        collection.matrix = np.zeros((0, collection.size), dtype=collection.dtype)
+        collection.ids = np.zeros(0, dtype=np.int64)
+        collection._map_files(max(meta["count"], 1))
+        collection.codes = np.zeros((len(collection.matrix), collection.code_size), dtype=collection.code_dtype)
+        collection.codes[:collection.count] = collection.encode(collection.matrix[:collection.count])
+        collection.rows = {int(point_id): row for row, point_id in enumerate(collection.ids[:collection.count])}
+        collection.payloads = [{} for _ in range(collection.count)]
+        payloads_path = os.path.join(directory, PAYLOADS_FILE)
+        if os.path.exists(payloads_path):
+            with open(payloads_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    row, payload = json.loads(line)
+                    if row < collection.count:
+                        collection.payloads[row] = payload
+        return collection
+
+    def _write_meta(self):
+        meta = {
+            "size": self.size, "distance": self.distance.value, "dtype": self.dtype.name, "count": self.count,
+            "quantization": self.quantization, "scale": self.scale, "metadata": self.metadata,
+        }
+        tmp_path = os.path.join(self.directory, META_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(self.directory, META_FILE))
+
+    def _map_files(self, capacity: int):
+        """(Re)maps the on-disk matrix and ID files, growing them to `capacity` rows."""
+        mapped = []
+        for name, dtype, shape in ((VECTORS_FILE, self.dtype, (capacity, self.size)), (IDS_FILE, np.int64, (capacity,))):
+            path = os.path.join(self.directory, name)
+            n_bytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            with open(path, "ab") as f:
+                if f.tell() < n_bytes:
+                    f.truncate(n_bytes)
+            mapped.append(np.memmap(path, dtype=dtype, mode="r+", shape=shape))
+        self.matrix, self.ids = mapped
+
+    @property
+    def code_size(self) -> int:
+        if self.quantization == "binary":
+            return (self.size + 7) // 8
+        return self.size if self.quantization == "int8" else 0
+
+    @property
+    def code_dtype(self):
+        return np.uint8 if self.quantization == "binary" else np.int8
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Quantizes vectors to int8 (symmetric, clipped at the 99th percentile) or packed sign bits."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.quantization == "binary":
+            return np.packbits(vectors > 0, axis=1)
+        if self.quantization == "int8":
+            if self.scale is None and len(vectors):
+                # The scale is fixed by the first batch so later codes stay comparable.
+                self.scale = float(127.0 / max(np.quantile(np.abs(vectors), 0.99), 1e-12))
+            return np.clip(np.rint(vectors * (self.scale or 1.0)), -127, 127).astype(np.int8)
+        return np.zeros((len(vectors), 0), dtype=np.int8)
+
+    def _reserve(self, n: int):
+        if n <= len(self.matrix):
+            return
+        capacity = max(n, 2 * len(self.matrix), 1024)
+        codes = np.zeros((capacity, self.code_size), dtype=self.code_dtype)
+        codes[:self.count] = self.codes[:self.count]
+        self.codes = codes
+        if self.directory:
+            self.flush()
+            self._map_files(capacity)
+            return
+        matrix = np.zeros((capacity, self.size), dtype=self.dtype)
+        matrix[:self.count] = self.matrix[:self.count]
+        ids = np.zeros(capacity, dtype=np.int64)
+        ids[:self.count] = self.ids[:self.count]
+        self.matrix, self.ids = matrix, ids
+
+    def set_payload(self, point_ids: list, payload: dict):
+        """Merges `payload` into the payloads of existing points."""
+        written = []
+        for point_id in point_ids:
+            row = self.rows.get(point_id)
+            if row is not None:
+                self.payloads[row] = {**self.payloads[row], **payload}
+                written.append((row, self.payloads[row]))
+        self._append_payloads(written)
+
+    def _append_payloads(self, written: list):
+        if self.directory and written:
+            with open(os.path.join(self.directory, PAYLOADS_FILE), "a", encoding="utf-8") as f:
+                for row, payload in written:
+                    f.write(json.dumps([row, payload]) + "\n")
+
+    def flush(self):
+        if isinstance(self.matrix, np.memmap):
+            self.matrix.flush()
+            self.ids.flush()
+
+    def prepare(self, vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.size)
+        if self.distance == models.Distance.COSINE:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+        return vectors
+
+    def upsert(self, ids: list, vectors: np.ndarray, payloads: list):
+        vectors = self.prepare(vectors)
+        codes = self.encode(vectors)
+        self._reserve(self.count + len(ids))
+        written = []
+        for point_id, vector, code, payload in zip(ids, vectors, codes, payloads):
+            row = self.rows.get(point_id)
+            if row is None:
+                row = self.count
+                self.rows[point_id] = row
+                self.ids[row] = point_id
+                self.payloads.append(payload)
+                self.count += 1
+            else:
+                self.payloads[row] = payload
+            self.matrix[row] = vector
+            self.codes[row] = code
+            written.append((row, payload))
+        if self.directory:
+            # Rows and payloads are on disk before the count that exposes them.
+            self.flush()
+            self._append_payloads(written)
+            self._write_meta()
+
+    def delete(self, ids: list):
+        """Removes points by moving the last row into each freed row, keeping rows contiguous."""
+        written = []
+        for point_id in ids:
+            row = self.rows.pop(point_id, None)
+            if row is None:
+                continue
+            last = self.count - 1
+            if row != last:
+                moved_id = int(self.ids[last])
+                self.matrix[row] = self.matrix[last]
+                self.codes[row] = self.codes[last]
+                self.ids[row] = moved_id
+                self.payloads[row] = self.payloads[last]
+                self.rows[moved_id] = row
+                written.append((row, self.payloads[row]))
+            self.payloads.pop()
+            self.count -= 1
+        if self.directory:
+            self.flush()
+            self._append_payloads([(row, payload) for row, payload in written if row < self.count])
+            self._write_meta()
+
+
+class NumpyVectorStore:
+    """
+    An exact (brute-force) vector store with a Qdrant-client-compatible API.
+
+    Vectors of each collection are kept normalized in one contiguous float32
+    (or float16) matrix, and a query is a single matrix-vector product
+    followed by `argpartition` for the top-k. For maps up to ~100k keyframes
+    this is faster than HNSW and exact. Only the subset of the client API
+    used by `VectorDB` is implemented.
+    """
+    CHUNK_ROWS = 16384
+    QUERY_BLOCK = 1024
+
+    def __init__(self, dtype=np.float32, path: str = None):
+        """With a `path`, collections are persisted under path/<collection_name>/ and reopened on demand."""
+        self.dtype = dtype
+        self.path = path
+        self._collections = {}
+
+    def close(self, **kwargs):
+        for collection in self._collections.values():
+            collection.flush()
+        self._collections = {}
+
+    def _directory(self, collection_name: str):
+        return os.path.join(self.path, collection_name) if self.path else None
+
+    # --- Collection management ---
+    def collection_exists(self, collection_name: str) -> bool:
+        if collection_name in self._collections:
+            return True
+        directory = self._directory(collection_name)
+        return directory is not None and os.path.exists(os.path.join(directory, META_FILE))
+
+    def create_collection(self, collection_name: str, vectors_config: models.VectorParams, **kwargs):
+        directory = self._directory(collection_name)
+        if directory and os.path.exists(directory):
+            shutil.rmtree(directory)
+        self._collections[collection_name] = _Collection(
+            vectors_config.size, vectors_config.distance, self.dtype, self._directory(collection_name),
+            quantization=quantization_mode(kwargs.get("quantization_config")), metadata=kwargs.get("metadata"),
+        )
+        return True
+
+    def collection_metadata(self, collection_name: str):
+        """Returns the metadata the collection was created with, or None."""
+        return self._get(collection_name).metadata
+
+    def delete_collection(self, collection_name: str, **kwargs):
+        existed = self.collection_exists(collection_name)
+        self._collections.pop(collection_name, None)
+        directory = self._directory(collection_name)
+        if directory and os.path.exists(directory):
+            shutil.rmtree(directory)
+        return existed
+
+    def _get(self, collection_name: str) -> _Collection:
+        if collection_name not in self._collections:
+            if not self.collection_exists(collection_name):
+                raise ValueError(f"Collection {collection_name} not found")
+            self._collections[collection_name] = _Collection.open(self._directory(collection_name))
+        return self._collections[collection_name]
+
+    def count(self, collection_name: str, **kwargs) -> models.CountResult:
+        return models.CountResult(count=self._get(collection_name).count)
+
+    # --- Points ---
+    def upsert(self, collection_name: str, points: list, wait: bool = True, **kwargs):
+        collection = self._get(collection_name)
+        collection.upsert(
+            [point.id for point in points],
+            [point.vector for point in points],
+            [point.payload or {} for point in points],
+        )
+        return models.UpdateResult(operation_id=0, status=models.UpdateStatus.COMPLETED)
+
+    def delete(self, collection_name: str, points_selector, wait: bool = True, **kwargs):
+        ids = points_selector.points if isinstance(points_selector, models.PointIdsList) else points_selector
+        self._get(collection_name).delete(list(ids))
+        return models.UpdateResult(operation_id=0, status=models.UpdateStatus.COMPLETED)
+
+    def set_payload(self, collection_name: str, payload: dict, points: list, **kwargs):
+        self._get(collection_name).set_payload(points, payload)
+        return models.UpdateResult(operation_id=0, status=models.UpdateStatus.COMPLETED)
+
+    def retrieve(self, collection_name: str, ids: list, with_payload=True, with_vectors=False, **kwargs) -> list:
+        collection = self._get(collection_name)
+        records = []
+        for point_id in ids:
+            row = collection.rows.get(point_id)
+            if row is None:
+                continue
+            records.append(models.Record(
+                id=point_id,
+                payload=collection.payloads[row] if with_payload else None,
+                vector=collection.matrix[row].astype(np.float32).tolist() if with_vectors else None,
+            ))
+        return records
+
+    def scroll(self, collection_name: str, limit: int = 10, offset=None, with_payload=True,
+               with_vectors=False, scroll_filter: models.Filter = None, **kwargs):
+        collection = self._get(collection_name)
+        rows = np.flatnonzero(self._filter_mask(collection, scroll_filter))
+        rows = rows[np.argsort(collection.ids[rows], kind="stable")]
+        if offset is not None:
+            rows = rows[collection.ids[rows] >= offset]
+        page, rest = rows[:limit], rows[limit:]
+        records = [
+            models.Record(
+                id=int(collection.ids[row]),
+                payload=collection.payloads[row] if with_payload else None,
+                vector=collection.matrix[row].astype(np.float32).tolist() if with_vectors else None,
+            )
+            for row in page
+        ]
+        next_offset = int(collection.ids[rest[0]]) if len(rest) else None
+        return records, next_offset
+
+    # --- Filtering ---
+    def _condition_mask(self, collection: _Collection, condition) -> np.ndarray:
+        n = collection.count
+        if isinstance(condition, models.HasIdCondition):
+            wanted = set(condition.has_id)
+            return np.fromiter((point_id in wanted for point_id in collection.ids[:n]), dtype=bool, count=n)
+        if isinstance(condition, models.Filter):
+            return self._filter_mask(collection, condition)
+        if isinstance(condition, models.FieldCondition) and isinstance(condition.match, models.MatchValue):
+            value = condition.match.value
+            return np.fromiter((p.get(condition.key) == value for p in collection.payloads), dtype=bool, count=n)
+        if isinstance(condition, models.FieldCondition) and isinstance(condition.match, models.MatchAny):
+            wanted = set(condition.match.any)
+            return np.fromiter((p.get(condition.key) in wanted for p in collection.payloads), dtype=bool, count=n)
+        raise NotImplementedError(f"Unsupported filter condition: {condition!r}")
+
+    def _filter_mask(self, collection: _Collection, query_filter: models.Filter) -> np.ndarray:
+        mask = np.ones(collection.count, dtype=bool)
+        if query_filter is None:
+            return mask
+        for condition in query_filter.must or []:
+            mask &= self._condition_mask(collection, condition)
+        for condition in query_filter.must_not or []:
+            mask &= ~self._condition_mask(collection, condition)
+        if query_filter.should:
+            any_mask = np.zeros(collection.count, dtype=bool)
+            for condition in query_filter.should:
+                any_mask |= self._condition_mask(collection, condition)
+            mask &= any_mask
+        return mask
+
+    # --- Search ---
+    def _scores(self, collection: _Collection, queries: np.ndarray, rows: np.ndarray = None) -> np.ndarray:
+        """Returns an (n_queries, n_points) exact score matrix (restricted to `rows` if given), higher is better."""
+        matrix = collection.matrix[:collection.count] if rows is None else collection.matrix[rows]
+        if collection.dtype == np.float32:
+            scores = queries @ matrix.T
+        else:
+            # Upcast in chunks so float16 storage still uses float32 BLAS.
+            scores = np.empty((len(queries), len(matrix)), dtype=np.float32)
+            for start in range(0, len(matrix), self.CHUNK_ROWS):
+                chunk = matrix[start:start + self.CHUNK_ROWS].astype(np.float32)
+                scores[:, start:start + len(chunk)] = queries @ chunk.T
+        if collection.distance == models.Distance.EUCLID:
+            sq_norms = np.einsum("ij,ij->i", matrix, matrix, dtype=np.float32)
+            q_norms = np.einsum("ij,ij->i", queries, queries)
+            scores = -np.sqrt(np.maximum(q_norms[:, None] - 2 * scores + sq_norms[None, :], 0))
+        return scores
+
+    def _approx_scores(self, collection: _Collection, queries: np.ndarray) -> np.ndarray:
+        """Scores queries against the quantized codes; ordering approximates the exact scores."""
+        codes = collection.codes[:collection.count]
+        if collection.quantization == "int8":
+            scores = np.empty((len(queries), collection.count), dtype=np.float32)
+            for start in range(0, collection.count, self.CHUNK_ROWS):
+                chunk = codes[start:start + self.CHUNK_ROWS].astype(np.float32)
+                scores[:, start:start + len(chunk)] = queries @ chunk.T
+            return scores / collection.scale
+        query_codes = np.packbits(queries > 0, axis=1)
+        scores = np.empty((len(queries), collection.count), dtype=np.float32)
+        for i, query_code in enumerate(query_codes):
+            hamming = _POPCOUNT[np.bitwise_xor(codes, query_code)].sum(axis=1)
+            scores[i] = collection.size - 2.0 * hamming
+        return scores
+
+    def _top_k(self, collection: _Collection, scores: np.ndarray, limit: int, mask: np.ndarray,
+               with_payload: bool = True, query: np.ndarray = None, oversampling: float = None) -> list:
+        """
+        Selects the best `limit` rows. For quantized collections `scores` are
+        approximate: the best limit * oversampling rows are rescored exactly
+        against `query` unless `oversampling` is None.
+        """
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+            n_valid = int(mask.sum())
+        else:
+            n_valid = len(scores)
+        k = min(limit, n_valid)
+        if k == 0:
+            return []
+        rescore = collection.quantization is not None and oversampling is not None
+        n_candidates = min(n_valid, int(np.ceil(k * oversampling))) if rescore else k
+        top = np.argpartition(-scores, n_candidates - 1)[:n_candidates]
+        if rescore:
+            scores = np.full(len(scores), -np.inf, dtype=np.float32)
+            scores[top] = self._scores(collection, query[None, :], rows=top)[0]
+        top = top[np.argsort(-scores[top], kind="stable")][:k]
+        sign = -1.0 if collection.distance == models.Distance.EUCLID else 1.0
+        return [
+            models.ScoredPoint(
+                id=int(collection.ids[row]),
+                version=0,
+                score=sign * float(scores[row]),
+                payload=collection.payloads[row] if with_payload else None,
+            )
+            for row in top
+        ]
+
+    def _search(self, collection: _Collection, queries: np.ndarray, search_params: models.SearchParams = None):
+        """Returns (scores, oversampling) for a block of queries, honouring quantization search params."""
+        quantization = search_params.quantization if search_params is not None else None
+        if collection.quantization is None or (quantization is not None and quantization.ignore):
+            return self._scores(collection, queries), None
+        if quantization is not None and quantization.rescore is False:
+            return self._approx_scores(collection, queries), None
+        oversampling = quantization.oversampling if quantization is not None and quantization.oversampling else 1.0
+        return self._approx_scores(collection, queries), max(oversampling, 1.0)
+
+    def query_points(self, collection_name: str, query, query_filter: models.Filter = None, limit: int = 10,
+                     with_payload=True, search_params: models.SearchParams = None, **kwargs) -> models.QueryResponse:
+        collection = self._get(collection_name)
+        if collection.count == 0:
+            return models.QueryResponse(points=[])
+        queries = collection.prepare(query)
+        scores, oversampling = self._search(collection, queries, search_params)
+        mask = self._filter_mask(collection, query_filter) if query_filter is not None else None
+        return models.QueryResponse(
+            points=self._top_k(collection, scores[0], limit, mask, with_payload, queries[0], oversampling)
+        )
+
+    def query_batch_points(self, collection_name: str, requests: list, **kwargs) -> list:
+        """Answers many QueryRequests with one matrix product per block of queries."""
+        collection = self._get(collection_name)
+        if collection.count == 0:
+            return [models.QueryResponse(points=[]) for _ in requests]
+        queries = collection.prepare([request.query for request in requests])
+        responses = []
+        for start in range(0, len(requests), self.QUERY_BLOCK):
+            block = requests[start:start + self.QUERY_BLOCK]
+            block_queries = queries[start:start + len(block)]
+            scores, oversampling = self._search(collection, block_queries, block[0].params)
+            for request, query, row_scores in zip(block, block_queries, scores):
+                mask = self._filter_mask(collection, request.filter) if request.filter is not None else None
+                with_payload = request.with_payload if request.with_payload is not None else True
+                points = self._top_k(
+                    collection, row_scores, request.limit or 10, mask, with_payload, query, oversampling
+                )
+                responses.append(models.QueryResponse(points=points))
+        return responses
@@ -0,0 +1,95 @@
+import math
+from collections import defaultdict
+
+import numpy as np
+
+# 95% quantile of the chi-squared distribution with 3 degrees of freedom.
+CHI2_3DOF_95 = 7.815
+
+
+class VoxelPoseIndex:
+    """
+    A uniform voxel hash over keyframe positions.
+
+    Positions are bucketed into cubes of side `voxel_size`; a radius query
+    only visits the voxels overlapping the query sphere and then checks the
+    exact distances of the keyframes found there in one vectorized step.
+    """
+    def __init__(self, voxel_size: float = 1.0):
+        self.voxel_size = voxel_size
+        self._voxels = defaultdict(list)
+        self._positions = {}
+
+    def __len__(self):
+        return len(self._positions)
+
+    def _voxel(self, position) -> tuple:
+        return tuple(int(math.floor(c / self.voxel_size)) for c in position[:3])
+
+    def add(self, point_id: int, position):
+        """Adds (or moves) a keyframe position."""
+        position = np.asarray(position, dtype=np.float64)[:3]
+        if point_id in self._positions:
+            self.remove(point_id)
+        self._positions[point_id] = position
+        self._voxels[self._voxel(position)].append(point_id)
+
+    def add_many(self, point_ids, positions):
+        for point_id, position in zip(point_ids, positions):
+            self.add(int(point_id), position)
+
+    def remove(self, point_id: int):
+        position = self._positions.pop(point_id, None)
+        if position is None:
+            return
+        voxel = self._voxel(position)
+        self._voxels[voxel].remove(point_id)
+        if not self._voxels[voxel]:
+            del self._voxels[voxel]
+
+    def position(self, point_id: int):
+        return self._positions.get(point_id)
+
+    def _candidates(self, center: np.ndarray, radius: float):
+        """Returns the IDs and positions of keyframes in voxels overlapping the sphere."""
+        low = self._voxel(center - radius)
+        high = self._voxel(center + radius)
+        n_voxels = (high[0] - low[0] + 1) * (high[1] - low[1] + 1) * (high[2] - low[2] + 1)
+        if n_voxels > len(self._voxels):
+            # A huge radius: scanning the occupied voxels is cheaper than enumerating the box.
+            ids = [i for voxel, members in self._voxels.items()
+                   if all(lo <= v <= hi for v, lo, hi in zip(voxel, low, high)) for i in members]
+        else:
+            ids = []
+            for x in range(low[0], high[0] + 1):
+                for y in range(low[1], high[1] + 1):
+                    for z in range(low[2], high[2] + 1):
+                        ids.extend(self._voxels.get((x, y, z), ()))
+        if not ids:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, 3))
+        return np.asarray(ids, dtype=np.int64), np.stack([self._positions[i] for i in ids])
+
+    def query_radius(self, center, radius: float) -> np.ndarray:
+        """Returns the IDs of keyframes within `radius` of `center`."""
+        center = np.asarray(center, dtype=np.float64)[:3]
+        ids, positions = self._candidates(center, radius)
+        if len(ids) == 0:
+            return ids
+        sq_dist = np.sum((positions - center) ** 2, axis=1)
+        return ids[sq_dist <= radius * radius]
+
+    def query_ellipsoid(self, center, covariance, chi2: float = CHI2_3DOF_95) -> np.ndarray:
+        """
+        Returns the IDs of keyframes inside the confidence ellipsoid of a
+        position estimate, i.e. with Mahalanobis distance^2 <= `chi2` under
+        the 3x3 position `covariance`.
+        """
+        center = np.asarray(center, dtype=np.float64)[:3]
+        covariance = np.asarray(covariance, dtype=np.float64)[:3, :3]
+        radius = math.sqrt(chi2 * np.linalg.eigvalsh(covariance).max())
+        ids, positions = self._candidates(center, radius)
+        if len(ids) == 0:
+            return ids
+        delta = positions - center
+        mahalanobis_sq = np.einsum("ij,ij->i", delta @ np.linalg.inv(covariance), delta)
+        return ids[mahalanobis_sq <= chi2]
@@ -1,208 +1,194 @@
 import gymnasium as gym
 import ray
 from ray.rllib.algorithms.ppo import PPOConfig
-from atropos_env import SLAMAtroposEnv
+from src.atropos_env import SLAMAtroposEnv
 import time
 import numpy as np
-from qdrant_client import QdrantClient, models
-from google import generativeai as genai
 import os
 from dotenv import load_dotenv
 import sys
-import io
+import shutil
 import gtsam
-import pickle
 from google.cloud import storage
-
-# --- Factor Graph Manager ---
-class FactorGraphManager:
-    def __init__(self):
-        self.graph = gtsam.NonlinearFactorGraph()
-        self.initial_estimates = gtsam.Values()
-        self.next_pose_id = 0
-
-    def add_pose(self, pose):
-        """Adds a new pose to the factor graph."""
-        self.initial_estimates.insert(self.next_pose_id, pose)
-        self.next_pose_id += 1
-        return self.next_pose_id - 1
-
-    def add_loop_closure(self, from_id, to_id, relative_pose, confidence):
-        """Adds a loop closure constraint between two poses."""
-        noise_model = gtsam.noiseModel.Diagonal.Sigmas(
-            np.array([1.0 / confidence] * 6)
-        )
-        self.graph.add(
-            gtsam.BetweenFactorPose3(from_id, to_id, relative_pose, noise_model)
-        )
-
-    def optimize(self):
-        """Optimizes the factor graph."""
-        optimizer = gtsam.LevenbergMarquardtOptimizer(self.graph, self.initial_estimates)
-        result = optimizer.optimize()
-        return result
-    
-    def save_state(self, filepath):
-        """Saves the factor graph and initial estimates to a file."""
-        with open(filepath, "wb") as f:
-            pickle.dump((self.graph, self.initial_estimates), f)
-
-    def load_state(self, filepath):
-        """Loads the factor graph and initial estimates from a file."""
-        with open(filepath, "rb") as f:
-            self.graph, self.initial_estimates = pickle.load(f)
-
-# --- Gemini API Key Configuration ---
+from src.embedders import get_embedder
+from src.factor_graph import FactorGraphManager, checkpoint_references, prune_segments, write_json_atomic
+from src.keyframe_map import keyframe_groundtruth_indices, load_keyframe_poses, query_near_pose
+from src.loop_closure_verifier import CaptionOverlapIndex
+from src.loop_closure_worker import LoopClosureWorker
+from src.tracing import get_tracer, span
+from src.trajectory_io import format_tum, read_tum, write_tum
+from src.vector_db import VectorDB, iter_captions
+
+# --- Embedding Backend Configuration ---
 load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    print("Error: GEMINI_API_KEY not found.")
-    sys.exit(1)
-genai.configure(api_key=GEMINI_API_KEY)
+embedder = get_embedder()
 
 # --- RAG Components ---
 
 # 1. Vector Database Setup
-client = QdrantClient(":memory:")
-client.recreate_collection(
-    collection_name="slam_keyframes",
-    vectors_config=models.VectorParams(size=768, distance=models.Distance.COSINE),
-)
+# The map is persisted under VECTOR_DB_PATH, so later launches warm-start from
+# disk and only embed captions that were added since the last run.
+VECTOR_DB_PATH = "vector_db"
+vector_db = VectorDB(collection_name="slam_keyframes", embedder=embedder, path=VECTOR_DB_PATH)
+if not vector_db.create_collection(recreate=False):
+    print(f"Warm start: loaded {vector_db.count()} keyframes from {VECTOR_DB_PATH}")
 
 # 2. Embedding Function
-def gemini_embed(captions: list[str], task_type: str):
-    result = genai.embed_content(model="models/embedding-001", content=captions, task_type=task_type)
-    return result['embedding']
+def embed_captions(captions: list[str], task_type: str):
+    return embedder.embed(captions, task_type=task_type).tolist()
 
 # 3. Load and Index Real Keyframes
+GROUND_TRUTH_FILE = "datasets/rgbd_dataset_freiburg1_xyz/groundtruth.txt"
+# Metres around the current pose searched for loop closures. Keyframe poses
+# are ground-truth positions, so the query pose must be in the same frame.
+LOOP_CLOSURE_RADIUS = 1.0
+
 def load_captions(filepath: str) -> list:
-    """Loads captions from the specified file."""
+    """Loads captions from the specified file, with the same line IDs as the VectorDB."""
     if not os.path.exists(filepath):
         print(f"Error: Captions file not found at {filepath}")
         sys.exit(1)
-    
-    keyframes = []
-    with open(filepath, "r") as f:
-        for i, line in enumerate(f):
-            parts = line.strip().split('\t')
-            if len(parts) == 2:
-                filename, caption = parts
-                keyframes.append({"id": i, "filename": filename, "caption": caption})
-    return keyframes
+    return [
+        {"id": i, "filename": filename, "caption": caption}
+        for i, filename, caption in iter_captions(filepath)
+    ]
 
 print("Loading and indexing real keyframes from dataset...")
 map_keyframes = load_captions("captions.txt")
 if not map_keyframes:
     print("Error: No keyframes were loaded. Exiting.")
     sys.exit(1)
-captions_batch = [k["caption"] for k in map_keyframes]
-embeddings = gemini_embed(captions_batch, task_type="RETRIEVAL_DOCUMENT")
-client.upsert(
-    collection_name="slam_keyframes",
-    points=[
-        models.PointStruct(id=k["id"], vector=emb, payload={"caption": k["caption"], "filename": k["filename"]})
-        for k, emb in zip(map_keyframes, embeddings)
-    ],
-    wait=True,
+keyframe_poses = load_keyframe_poses(GROUND_TRUTH_FILE, map_keyframes)
+# Evaluation step i adds pose i at ground-truth timestamp i, so the pose of a
+# keyframe is the step of its nearest ground-truth timestamp.
+keyframe_pose_ids = (
+    keyframe_groundtruth_indices(read_tum(GROUND_TRUTH_FILE), map_keyframes) if os.path.exists(GROUND_TRUTH_FILE) else {}
 )
-print(f"Successfully indexed {len(map_keyframes)} keyframes.")
+vector_db.index_captions("captions.txt", batch_size=256, skip_existing=True, poses=keyframe_poses)
+print(f"Successfully indexed {vector_db.count()} keyframes.")
 
 # 4. LLM Verification Logic
-def call_llm_verification(prompt: str) -> tuple[str, float]:
-    stopwords = {'a', 'an', 'the', 'of', 'in', 'is', 'on', 'photo', 'picture'}
-    lines = prompt.strip().split('\n')
-    try:
-        live_caption = lines[-4].split('"')[1]
-        retrieved_caption = lines[-3].split('"')[1]
-        live_words = set(live_caption.lower().split()) - stopwords
-        retrieved_words = set(retrieved_caption.lower().split()) - stopwords
-        
-        # Calculate a simple confidence score based on word overlap
-        intersection_size = len(live_words.intersection(retrieved_words))
-        union_size = len(live_words.union(retrieved_words))
-        confidence = intersection_size / union_size if union_size > 0 else 0.0
-        
-        return ("yes", confidence) if confidence > 0.1 else ("no", 0.0)
-    except IndexError:
-        return "no", 0.0
+# Map captions are tokenized once here; verifying a live caption against any
+# number of keyframes is then a single vectorized word-overlap computation.
+caption_index = CaptionOverlapIndex((keyframe["id"], keyframe["caption"]) for keyframe in map_keyframes)
+
+def call_llm_verification(live_caption: str, keyframe_ids: list) -> tuple[np.ndarray, np.ndarray]:
+    """Returns per-keyframe (is_match, confidence) arrays from caption word overlap."""
+    return caption_index.verify(live_caption, keyframe_ids)
 
-def llama_chain_of_thought(live_obs: str, context_caption: str) -> tuple[bool, float]:
-    prompt = f'You are a verification agent... (prompt omitted for brevity)\nLive Observation: "{live_obs}"\nRetrieved Keyframe: "{context_caption}"\nVerification:'
-    response, confidence = call_llm_verification(prompt)
-    print(f"  - LLM Verification: Is '{live_obs}' the same as '{context_caption}'? -> {response.upper()} (Confidence: {confidence:.2f})")
-    return response.strip().lower() == "yes", confidence
+def llama_chain_of_thought(live_obs: str, context_caption: str, keyframe_id: int) -> tuple[bool, float]:
+    is_match, confidence = call_llm_verification(live_obs, [keyframe_id])
+    is_match, confidence = bool(is_match[0]), float(confidence[0])
+    print(f"  - LLM Verification: Is '{live_obs}' the same as '{context_caption}'? -> {'YES' if is_match else 'NO'} (Confidence: {confidence:.2f})")
+    return is_match, confidence
 
 def add_edge_to_pose_graph(from_id, to_id, confidence):
-    print(f"  - INFO: Adding loop closure constraint between keyframe {from_id} and {to_id} with confidence {confidence:.2f}.")
+    # Either pose may have been merged by a sparsification since the search.
+    from_id, to_id = kept_pose_id(from_id), kept_pose_id(to_id)
+    if from_id == to_id:
+        return
+    print(f"  - INFO: Queueing loop closure constraint between keyframe {from_id} and {to_id} with confidence {confidence:.2f}.")
     # In a real system, we would calculate the relative pose between the two keyframes.
     # For this simulation, we'll use an identity pose.
     relative_pose = gtsam.Pose3()
-    factor_graph_manager.add_loop_closure(from_id, to_id, relative_pose, confidence)
+    pending_loop_closures.append((from_id, to_id, relative_pose, confidence))
+    if len(pending_loop_closures) >= LOOP_CLOSURE_BATCH_SIZE:
+        flush_loop_closures()
 
-# 5. RAG Loop Closure Function
-factor_graph_manager = FactorGraphManager()
+def flush_loop_closures():
+    """Inserts the queued loop closures that pass the pairwise-consistency check."""
+    if not pending_loop_closures:
+        return
+    with span("factor_insert", loop_closures=len(pending_loop_closures)):
+        accepted = factor_graph_manager.add_loop_closures(pending_loop_closures, check_consistency=True)
+    print(f"  - INFO: Inserted {len(accepted)}/{len(pending_loop_closures)} loop closures after the consistency check.")
+    pending_loop_closures.clear()
 
-def trigger_rag_loop_closure(current_keyframe_id: int, mode: str):
-    """Triggers RAG loop closure based on the experimental mode."""
+# 5. RAG Loop Closure Function
+# With ISAM2 the pose graph is re-solved incrementally after every keyframe
+# instead of once over the whole trajectory at the end.
+FACTOR_GRAPH_INCREMENTAL = True
+# A false positive from the verifier must not wreck the trajectory: loop
+# closures use a robust kernel and are checked for pairwise consistency in
+# batches before insertion.
+LOOP_CLOSURE_KERNEL = "dcs"
+LOOP_CLOSURE_BATCH_SIZE = 8
+factor_graph_manager = FactorGraphManager(incremental=FACTOR_GRAPH_INCREMENTAL, loop_closure_kernel=LOOP_CLOSURE_KERNEL)
+pending_loop_closures = []
+# Retrieval and verification run on a background worker so tracking never
+# waits for them; when it falls behind, the oldest queued keyframes are dropped.
+LOOP_CLOSURE_QUEUE_SIZE = 8
+# Long sessions merge near-stationary keyframes every SPARSIFY_INTERVAL poses,
+# leaving the last SPARSIFY_WINDOW poses untouched. Pose ids here are step
+# counts, not the caption ids of the VectorDB, so merged poses are not deleted
+# from the map.
+SPARSIFY_INTERVAL = 500
+SPARSIFY_WINDOW = 200
+merged_keyframes = {}
+
+def sparsify_pose_graph():
+    # Pending loop closures may reference poses that are about to be merged.
+    flush_loop_closures()
+    merged = factor_graph_manager.sparsify(window=SPARSIFY_WINDOW)
+    merged_keyframes.update(merged)
+    if merged:
+        print(f"  - INFO: Sparsified the pose graph, merged {len(merged)} keyframes "
+              f"({len(factor_graph_manager.pose_ids)} remain).")
+
+def kept_pose_id(pose_id: int) -> int:
+    """Follows merges to the pose that absorbed `pose_id`."""
+    while pose_id in merged_keyframes:
+        pose_id = merged_keyframes[pose_id]
+    return pose_id
+
+def trigger_rag_loop_closure(pose_id: int, mode: str, current_pose=None):
+    """
+    Searches for a loop closure for the frame at pose `pose_id` based on the
+    experimental mode and returns a verified (pose_id, keyframe_pose_id,
+    confidence) constraint, or None. Runs on the loop-closure worker thread.
+    """
     # Simulate a new frame by picking a random keyframe from our dataset
-    live_keyframe = np.random.choice(map_keyframes)
-    live_caption = live_keyframe["caption"]
+    with span("caption"):
+        live_keyframe = np.random.choice(map_keyframes)
+        live_caption = live_keyframe["caption"]
     print(f"  -> Triggering RAG for live frame: '{live_caption}'")
 
-    live_embedding = gemini_embed([live_caption], task_type="RETRIEVAL_QUERY")[0]
+    with span("embed"):
+        live_embedding = embed_captions([live_caption], task_type="RETRIEVAL_QUERY")[0]
 
-    search_results = client.search(collection_name="slam_keyframes", query_vector=live_embedding, limit=1)
+    if mode == "rag-slam":
+        # Geometric check: only keyframes stored near the current pose are
+        # searched, so distant look-alikes never reach LLM verification.
+        search_results = query_near_pose(vector_db, live_embedding, current_pose, radius=LOOP_CLOSURE_RADIUS)
+    else:
+        search_results = vector_db.query(live_embedding, top_k=1)
 
     if not search_results:
         print("  - No similar keyframes found.")
-        return
+        return None
 
     top_candidate = search_results[0]
     context_caption = top_candidate.payload['caption']
-
-    geometric_check_passed = True
-    if mode == "rag-slam":
-        # Simulate a geometric check. In a real system, this would involve
-        # checking if the current pose is geometrically close to the candidate pose.
-        # Here, we simulate it with a 50% success rate.
-        if np.random.rand() > 0.5:
-            print("  - Simulated geometric check: PASSED")
-        else:
-            print("  - Simulated geometric check: FAILED")
-            geometric_check_passed = False
-
-    if geometric_check_passed:
-        is_loop_closure, confidence = llama_chain_of_thought(live_caption, context_caption)
-        if is_loop_closure:
-            add_edge_to_pose_graph(current_keyframe_id, top_candidate.id, confidence)
+    # A warm-started map may hold keyframes of an older captions file.
+    caption_index.add([(top_candidate.id, context_caption)])
+    # Only keyframes already passed on this trajectory have a pose in the graph.
+    candidate_pose_id = keyframe_pose_ids.get(top_candidate.payload['filename'])
+    if candidate_pose_id is None or candidate_pose_id >= pose_id:
+        print(f"  - Keyframe {top_candidate.id} has no pose in the graph yet.")
+        return None
+
+    with span("verify"):
+        is_loop_closure, confidence = llama_chain_of_thought(live_caption, context_caption, top_candidate.id)
+    return (pose_id, candidate_pose_id, confidence) if is_loop_closure else None
 
 # --- Main PPO Control Loop ---
-def load_ground_truth_timestamps(filepath: str) -> list:
-    """Loads timestamps from a TUM ground truth file."""
-    timestamps = []
-    with open(filepath, "r") as f:
-        for line in f:
-            if not line.startswith('#'):
-                parts = line.strip().split()
-                if len(parts) >= 1:
-                    timestamps.append(parts[0])
-    return timestamps
-
-def save_trajectory(trajectory: list, timestamps: list, filepath: str, gcs_bucket: str = None):
+def save_trajectory(trajectory: list, timestamps, filepath: str, gcs_bucket: str = None):
     """Saves the trajectory to a file in TUM format and optionally uploads to GCS."""
-    output_buffer = io.StringIO()
-    for i, pose in enumerate(trajectory):
-        # TUM format: timestamp tx ty tz qx qy qz qw
-        line = f"{timestamps[i]} {pose[0]} {pose[1]} {pose[2]} 0 0 0 1"
-        output_buffer.write(line)
-        if i < len(trajectory) - 1:
-            output_buffer.write("\n")
-    
+    timestamps = np.asarray(timestamps)[:len(trajectory)]
     if gcs_bucket:
-        upload_to_gcs(gcs_bucket, filepath, output_buffer.getvalue())
+        upload_to_gcs(gcs_bucket, filepath, format_tum(timestamps, trajectory, header=True))
     else:
-        with open(filepath, "w") as f:
-            f.write(output_buffer.getvalue())
+        write_tum(filepath, timestamps, trajectory)
         print(f"\nTrajectory saved to {filepath}")
 
 def upload_to_gcs(bucket_name, destination_blob_name, contents):
@@ -218,17 +204,35 @@ def upload_to_gcs(bucket_name, destination_blob_name, contents):
     )
 
 def save_atomic_checkpoint(trainer, graph_manager, checkpoint_dir):
-    """Saves the trainer state and graph manager state in a single checkpoint."""
-    os.makedirs(checkpoint_dir, exist_ok=True)
-    
+    """
+    Saves the trainer state and graph manager state in a single checkpoint.
+
+    Everything is written into a temporary directory that is renamed into
+    place at the end, so a crash never leaves a half-written checkpoint. The
+    factor graph is appended as a delta segment to a graph_state directory
+    shared by all checkpoints; each checkpoint records which segments make
+    up its state.
+    """
+    tmp_dir = f"{checkpoint_dir}.tmp"
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+
     # Save RLlib trainer state
-    trainer_checkpoint_path = os.path.join(checkpoint_dir, "rllib_checkpoint")
+    trainer_checkpoint_path = os.path.join(tmp_dir, "rllib_checkpoint")
     trainer.save(trainer_checkpoint_path)
-    
+
     # Save factor graph state
-    graph_checkpoint_path = os.path.join(checkpoint_dir, "graph_state.pkl")
-    graph_manager.save_state(graph_checkpoint_path)
-    
+    checkpoint_root = os.path.dirname(os.path.abspath(checkpoint_dir))
+    graph_state_dir = os.path.join(checkpoint_root, "graph_state")
+    segments = graph_manager.save_state(graph_state_dir)
+    write_json_atomic(os.path.join(tmp_dir, "graph_state.json"), {"path": graph_state_dir, "segments": segments})
+
+    if os.path.exists(checkpoint_dir):
+        shutil.rmtree(checkpoint_dir)
+    os.replace(tmp_dir, checkpoint_dir)
+    # Segments of older generations are deleted once no checkpoint lists them.
+    prune_segments(graph_state_dir, keep=checkpoint_references(checkpoint_root, graph_state_dir))
     print(f"Atomic checkpoint saved to {checkpoint_dir}")
 
 def main(args):
@@ -261,19 +265,25 @@ def main(args):
     print(f"\n--- Evaluating Trained Agent (Mode: {args.mode}) ---")
     env = SLAMAtroposEnv()
     obs, _ = env.reset()
-    current_keyframe_id = len(map_keyframes) + 1
     estimated_trajectory = []
     
-    ground_truth_timestamps = load_ground_truth_timestamps("datasets/rgbd_dataset_freiburg1_xyz/groundtruth.txt")
+    ground_truth = read_tum(GROUND_TRUTH_FILE)
+    ground_truth_timestamps = ground_truth[:, 0]
+    loop_closure_worker = None
+    if args.mode in ["text-only", "rag-slam"]:
+        loop_closure_worker = LoopClosureWorker(trigger_rag_loop_closure, max_queue=LOOP_CLOSURE_QUEUE_SIZE)
+    tracer = get_tracer()
     
     for i in range(len(ground_truth_timestamps)): # Evaluate for the length of the ground truth
+        step_start_ns = time.perf_counter_ns()
         # Simulate pose estimation
         noise = np.random.normal(0, 0.1) if args.mode != "vision-only" else 0.0
         pose_xyz = [i * 0.1 + noise, np.sin(i * 0.1) + noise, 0.0]
         
         # Add the new pose to the factor graph
         pose3 = gtsam.Pose3(gtsam.Rot3(), gtsam.Point3(*pose_xyz))
-        factor_graph_manager.add_pose(pose3)
+        with span("factor_insert"):
+            factor_graph_manager.add_pose(pose3)
         
         estimated_trajectory.append(pose_xyz)
 
@@ -283,24 +293,64 @@ def main(args):
         action_map = {0: 'increase_kf', 1: 'decrease_kf', 2: 'add_constraint'}
         print(f"Step {i+1}: Action: {action_map[action.item()]:<15} | Reward: {reward:<8.2f}")
 
-        if args.mode in ["text-only", "rag-slam"] and action == 2: # 'add_semantic_constraint'
-            trigger_rag_loop_closure(current_keyframe_id, args.mode)
-            current_keyframe_id += 1
+        if loop_closure_worker is not None:
+            if action == 2: # 'add_semantic_constraint'
+                # The simulated estimate is not in the frame of the indexed keyframe
+                # poses; the ground-truth position at this timestamp is.
+                loop_closure_worker.submit(i, args.mode, ground_truth[i, 1:4])
+            for constraint in loop_closure_worker.drain():
+                add_edge_to_pose_graph(*constraint)
+
+        if SPARSIFY_INTERVAL and (i + 1) % SPARSIFY_INTERVAL == 0:
+            sparsify_pose_graph()
+
+        if factor_graph_manager.incremental:
+            with span("optimize"):
+                factor_graph_manager.update()
+        tracer.record("tracking_step", step_start_ns, time.perf_counter_ns() - step_start_ns)
 
         if terminated:
             break
             
     print("--- Evaluation Finished ---")
+    step_stats = tracer.stats().get("tracking_step")
+    if step_stats is not None:
+        print(f"Tracking step latency: mean: {step_stats['mean_ms']:.2f}ms | "
+              f"p95: {step_stats['p95_ms']:.2f}ms | max: {step_stats['max_ms']:.2f}ms")
+    if loop_closure_worker is not None:
+        # Keyframes still queued are searched before the final optimization.
+        for constraint in loop_closure_worker.close(wait=True):
+            add_edge_to_pose_graph(*constraint)
+        worker_stats = loop_closure_worker.stats
+        print(f"Loop closure worker: {worker_stats['submitted']} submitted | {worker_stats['processed']} processed | "
+              f"{worker_stats['dropped']} dropped | {worker_stats['failed']} failed | "
+              f"{worker_stats['constraints']} verified")
 
     if args.mode in ["text-only", "rag-slam"]:
         print("\n--- Optimizing Factor Graph ---")
-        optimized_values = factor_graph_manager.optimize()
+        flush_loop_closures()
+        with span("optimize", final=True):
+            optimized_values = factor_graph_manager.optimize()
         print("--- Optimization Finished ---")
+        closure_stats = factor_graph_manager.loop_closure_stats
+        print(f"Loop closures: {closure_stats['proposed']} proposed | {closure_stats['accepted']} accepted | "
+              f"{closure_stats['rejected']} rejected | {closure_stats['unchecked']} unchecked")
+        if factor_graph_manager.pending_factor_count:
+            print(f"Warning: {factor_graph_manager.pending_factor_count} loop closures reference poses that are "
+                  "not in the graph and were never optimized.")
+        if factor_graph_manager.incremental:
+            stats = factor_graph_manager.latency_stats()
+            print(f"ISAM2 updates: {stats['updates']} | mean: {stats['mean_ms']:.2f}ms | "
+                  f"p95: {stats['p95_ms']:.2f}ms | max: {stats['max_ms']:.2f}ms")
+        else:
+            stats = factor_graph_manager.last_optimization
+            print(f"LM iterations: {stats['iterations']} | error: {stats['error']:.4f} | time: {stats['time_ms']:.2f}ms")
         
         # Extract optimized trajectory
+        # Merged keyframes take the estimate of the pose that absorbed them.
         optimized_trajectory = []
-        for i in range(optimized_values.size()):
-            pose = optimized_values.atPose3(i)
+        for i in range(len(estimated_trajectory)):
+            pose = optimized_values.atPose3(kept_pose_id(i))
             optimized_trajectory.append([pose.x(), pose.y(), pose.z()])
         
         if args.output:
@@ -310,6 +360,11 @@ def main(args):
             save_trajectory(optimized_trajectory, ground_truth_timestamps, args.output, args.gcs_bucket)
     elif args.output:
         save_trajectory(estimated_trajectory, ground_truth_timestamps, args.output, args.gcs_bucket)
+
+    print(f"\n--- Stage Latencies ---\n{tracer.report()}")
+    if args.trace:
+        tracer.export_chrome_trace(args.trace)
+        print(f"Trace written to {args.trace}")
     
     ray.shutdown()
 
@@ -318,6 +373,7 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run PPO-RAG-SLAM Experiment")
     parser.add_argument("--mode", type=str, default="rag-slam", choices=["vision-only", "text-only", "rag-slam"], help="Experimental condition to run.")
     parser.add_argument("-o", "--output", type=str, help="Path to save the estimated trajectory file.")
+    parser.add_argument("--trace", type=str, help="Path to write a Chrome trace of the per-stage spans.")
     parser.add_argument("--gcs-bucket", type=str, default="atropos_bucket", help="GCS bucket to upload the trajectory to.")
     args = parser.parse_args()
     main(args)
\ No newline at end of file
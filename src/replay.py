@@ -0,0 +1,151 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+# --- Configuration ---
+# "off": call the remote APIs directly; "record": call them and store (or
+# overwrite) every response; "replay": answer only from the store (a miss is
+# an error); "auto": replay what is stored and record the rest. Set with the
+# SLAM_REPLAY_MODE and SLAM_REPLAY_PATH environment variables.
+DEFAULT_REPLAY_MODE = "off"
+DEFAULT_REPLAY_PATH = os.path.join(".cache", "replay.sqlite")
+REPLAY_MODES = ("off", "record", "replay", "auto")
+
+
+class ReplayMissError(KeyError):
+    """Raised in replay mode for a request that was never recorded."""
+
+
+def request_key(kind: str, *parts) -> str:
+    """Returns the content address of a request; parts may be str, bytes or numbers."""
+    digest = hashlib.sha1(kind.encode("utf-8"))
+    for part in parts:
+        digest.update(b"\0")
+        digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ReplayStore:
+    """
+    A local store of recorded request -> response pairs.
+
+    Responses live in one SQLite file: embeddings as raw float32 blobs and
+    generations as text, keyed by a hash of the request. The whole store is
+    loaded into memory when opened, so replayed calls cost a dict lookup.
+    """
+    def __init__(self, path: str = DEFAULT_REPLAY_PATH, mode: str = "auto"):
+        if mode not in REPLAY_MODES or mode == "off":
+            raise ValueError(f"Unsupported replay mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.stats = {"replayed": 0, "recorded": 0}
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS generations (key TEXT PRIMARY KEY, text TEXT NOT NULL)")
+        self._db.commit()
+        self._embeddings = {key: np.frombuffer(blob, dtype=np.float32) for key, blob in self._db.execute(
+            "SELECT key, vector FROM embeddings")}
+        self._generations = dict(self._db.execute("SELECT key, text FROM generations"))
+
+    def __len__(self):
+        return len(self._embeddings) + len(self._generations)
+
+    def has_embeddings(self) -> bool:
+        return bool(self._embeddings)
+
+    def close(self):
+        self._db.close()
+
+    def _lookup(self, responses: dict, key: str):
+        return None if self.mode == "record" else responses.get(key)
+
+    def _check_miss(self, key: str):
+        if self.mode == "replay":
+            raise ReplayMissError(f"No recorded response for request {key} in {self.path}")
+
+    # --- Embeddings ---
+    def embed(self, texts: list, model: str, task_type: str, embed_fn) -> np.ndarray:
+        """
+        Returns one embedding per text, calling `embed_fn(missing_texts)` only
+        for texts that were not recorded (and recording its results).
+        """
+        keys = [request_key("embed", model, task_type, text) for text in texts]
+        with self._lock:
+            vectors = [self._lookup(self._embeddings, key) for key in keys]
+            missing = {}
+            for i, (key, vector) in enumerate(zip(keys, vectors)):
+                if vector is None:
+                    missing.setdefault(key, []).append(i)
+            self.stats["replayed"] += len(texts) - sum(len(v) for v in missing.values())
+        if missing:
+            self._check_miss(next(iter(missing)))
+            fresh = np.asarray(embed_fn([texts[indices[0]] for indices in missing.values()]), dtype=np.float32)
+            with self._lock:
+                for (key, indices), vector in zip(missing.items(), fresh):
+                    self._embeddings[key] = vector.copy()
+                    self._db.execute("INSERT OR REPLACE INTO embeddings VALUES (?, ?)", (key, vector.tobytes()))
+                    for i in indices:
+                        vectors[i] = vector
+                self._db.commit()
+                self.stats["recorded"] += len(missing)
+        return np.stack(vectors)
+
+    # --- Generations ---
+    def generate(self, key_parts: tuple, generate_fn) -> str:
+        """Returns the recorded text for a request, calling `generate_fn()` on a miss."""
+        key = request_key("generate", *key_parts)
+        with self._lock:
+            text = self._lookup(self._generations, key)
+            if text is not None:
+                self.stats["replayed"] += 1
+        if text is not None:
+            return text
+        self._check_miss(key)
+        text = generate_fn()
+        with self._lock:
+            self._generations[key] = text
+            self._db.execute("INSERT OR REPLACE INTO generations VALUES (?, ?)", (key, text))
+            self._db.commit()
+            self.stats["recorded"] += 1
+        return text
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class ReplayGenerativeModel:
+    """
+    Wraps a model with a generate_content(prompt) -> response.text API so
+    its responses are recorded to, or replayed from, a ReplayStore. In
+    replay mode `model` may be None.
+    """
+    def __init__(self, store: ReplayStore, model, model_name: str):
+        self.store = store
+        self.model = model
+        self.model_name = model_name
+
+    def generate_content(self, prompt: str):
+        return _Response(self.store.generate((self.model_name, prompt), lambda: self.model.generate_content(prompt).text))
+
+
+_default_store = None
+
+
+def get_replay_store():
+    """Returns the process-wide replay store, or None when SLAM_REPLAY_MODE is "off"."""
+    global _default_store
+    mode = os.getenv("SLAM_REPLAY_MODE", DEFAULT_REPLAY_MODE)
+    if mode == "off":
+        return None
+    if _default_store is None:
+        _default_store = ReplayStore(os.getenv("SLAM_REPLAY_PATH", DEFAULT_REPLAY_PATH), mode)
+    return _default_store
@@ -0,0 +1,180 @@
+import json
+import os
+import pickle
+import shutil
+
+import numpy as np
+
+MANIFEST_FILE = "manifest.json"
+FORMAT_VERSION = 1
+# Column name -> dtype of the roll-out transition columns.
+COLUMN_DTYPES = {
+    "obs": np.float32,
+    "action": np.int64,
+    "reward": np.float32,
+    "next_obs": np.float32,
+    "done": np.bool_,
+}
+
+
+def _atomic_write_json(path: str, data: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def write_chunk(root: str, chunk_name: str, columns: dict) -> int:
+    """
+    Writes one chunk of transitions as <root>/<chunk_name>/<column>.npy and
+    returns its row count. The chunk is not part of a store until it is
+    registered with RolloutStore.add_chunk, so worker processes can write
+    chunks in parallel while one process owns the manifest.
+    """
+    arrays = {name: np.ascontiguousarray(columns[name], dtype=dtype) for name, dtype in COLUMN_DTYPES.items()}
+    rows = {len(a) for a in arrays.values()}
+    if len(rows) != 1:
+        raise ValueError(f"All columns of a chunk must have the same length, got {sorted(rows)}")
+
+    chunk_dir = os.path.join(root, chunk_name)
+    tmp_dir = f"{chunk_dir}.tmp"
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+    if os.path.exists(chunk_dir):
+        shutil.rmtree(chunk_dir)
+    os.replace(tmp_dir, chunk_dir)
+    return rows.pop()
+
+
+class RolloutStore:
+    """
+    An append-only roll-out dataset of fixed-dtype columns.
+
+    Transitions are stored in immutable chunks, one .npy file per column, and
+    a manifest.json lists the chunks in order. Readers memory-map the chunk
+    files, so mini-batches can be sampled without loading the dataset.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._manifest_path = os.path.join(path, MANIFEST_FILE)
+        if os.path.exists(self._manifest_path):
+            with open(self._manifest_path) as f:
+                self.manifest = json.load(f)
+            if self.manifest["version"] != FORMAT_VERSION:
+                raise ValueError(f"Unsupported rollout store version {self.manifest['version']} in {path}")
+        else:
+            self.manifest = {"version": FORMAT_VERSION, "columns": None, "chunks": []}
+        self._mmaps = {}
+        self._offsets = None
+
+    def __len__(self):
+        return sum(chunk["rows"] for chunk in self.manifest["chunks"])
+
+    @property
+    def num_chunks(self) -> int:
+        return len(self.manifest["chunks"])
+
+    # --- Writing ---
+    def append(self, columns: dict) -> int:
+        """Writes `columns` as the next chunk and returns its row count."""
+        chunk_name = f"chunk_{self.num_chunks:05d}"
+        write_chunk(self.path, chunk_name, columns)
+        return self.add_chunk(chunk_name)
+
+    def add_chunk(self, chunk_name: str) -> int:
+        """Registers a chunk written with write_chunk at the end of the store."""
+        columns = {}
+        rows = None
+        for name in COLUMN_DTYPES:
+            array = np.load(os.path.join(self.path, chunk_name, f"{name}.npy"), mmap_mode="r")
+            columns[name] = {"dtype": array.dtype.str, "shape": list(array.shape[1:])}
+            rows = len(array)
+        if self.manifest["columns"] is None:
+            self.manifest["columns"] = columns
+        elif columns != self.manifest["columns"]:
+            raise ValueError(f"Chunk {chunk_name} does not match the store schema {self.manifest['columns']}")
+
+        self.manifest["chunks"].append({"name": chunk_name, "rows": rows})
+        _atomic_write_json(self._manifest_path, self.manifest)
+        self._offsets = None
+        return rows
+
+    # --- Reading ---
+    def _chunk_column(self, chunk_index: int, name: str) -> np.ndarray:
+        key = (chunk_index, name)
+        if key not in self._mmaps:
+            chunk_name = self.manifest["chunks"][chunk_index]["name"]
+            self._mmaps[key] = np.load(os.path.join(self.path, chunk_name, f"{name}.npy"), mmap_mode="r")
+        return self._mmaps[key]
+
+    def _chunk_offsets(self) -> np.ndarray:
+        if self._offsets is None:
+            self._offsets = np.cumsum([0] + [chunk["rows"] for chunk in self.manifest["chunks"]])
+        return self._offsets
+
+    def iter_chunks(self):
+        """Yields every chunk as a dict of memory-mapped columns."""
+        for i in range(self.num_chunks):
+            yield {name: self._chunk_column(i, name) for name in COLUMN_DTYPES}
+
+    def column(self, name: str) -> np.ndarray:
+        """Returns a whole column in memory; prefer get/sample for large stores."""
+        return np.concatenate([self._chunk_column(i, name) for i in range(self.num_chunks)])
+
+    def get(self, indices) -> dict:
+        """Returns the transitions at the given global row indices, in that order."""
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError(f"Row index out of range for a store of {len(self)} rows")
+        offsets = self._chunk_offsets()
+        chunk_ids = np.searchsorted(offsets, indices, side="right") - 1
+
+        batch = {}
+        for name in COLUMN_DTYPES:
+            first = self._chunk_column(0, name)
+            batch[name] = np.empty((len(indices),) + first.shape[1:], dtype=first.dtype)
+        for chunk_index in np.unique(chunk_ids):
+            mask = chunk_ids == chunk_index
+            local = indices[mask] - offsets[chunk_index]
+            for name in COLUMN_DTYPES:
+                batch[name][mask] = self._chunk_column(chunk_index, name)[local]
+        return batch
+
+    def sample(self, batch_size: int, rng: np.random.Generator = None) -> dict:
+        """Samples a mini-batch of transitions uniformly with replacement."""
+        rng = rng if rng is not None else np.random.default_rng()
+        return self.get(rng.integers(0, len(self), size=batch_size))
+
+    def iter_minibatches(self, batch_size: int, rng: np.random.Generator = None):
+        """Yields one shuffled pass over the store in mini-batches."""
+        rng = rng if rng is not None else np.random.default_rng()
+        order = rng.permutation(len(self))
+        for start in range(0, len(order), batch_size):
+            # Sorted indices read each memory-mapped chunk sequentially.
+            yield self.get(np.sort(order[start:start + batch_size]))
+
+
+# --- Conversion ---
+def convert_pickle(pkl_path: str, store_path: str, chunk_size: int = 100_000) -> RolloutStore:
+    """
+    Converts a pickled list of (obs, action, reward, next_obs, terminated)
+    tuples, as written by the old collect_rollouts.py, into a RolloutStore.
+    """
+    with open(pkl_path, "rb") as f:
+        rollouts = pickle.load(f)
+
+    store = RolloutStore(store_path)
+    for start in range(0, len(rollouts), chunk_size):
+        observations, actions, rewards, next_observations, dones = zip(*rollouts[start:start + chunk_size])
+        store.append({
+            "obs": np.stack(observations),
+            "action": np.asarray(actions),
+            "reward": np.asarray(rewards),
+            "next_obs": np.stack(next_observations),
+            "done": np.asarray(dones),
+        })
+    return store
@@ -0,0 +1,62 @@
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+
+from src.atropos_env import VectorSLAMAtroposEnv
+
+
+class SB3VectorSLAMAtroposEnv(VecEnv):
+    """
+    Exposes VectorSLAMAtroposEnv through the stable-baselines3 VecEnv API,
+    so a single process can feed PPO from thousands of environment copies.
+    """
+    def __init__(self, num_envs: int, max_steps: int = 100):
+        self.venv = VectorSLAMAtroposEnv(num_envs, max_steps=max_steps)
+        super().__init__(num_envs, self.venv.single_observation_space, self.venv.single_action_space)
+        self._actions = None
+
+    def reset(self):
+        seed = self._seeds[0] if self._seeds else None
+        observations, _ = self.venv.reset(seed=seed)
+        self._reset_seeds()
+        return observations
+
+    def step_async(self, actions):
+        self._actions = actions
+
+    def step_wait(self):
+        observations, rewards, terminations, truncations, infos = self.venv.step(self._actions)
+        dones = terminations | truncations
+        env_infos = [{} for _ in range(self.num_envs)]
+        for i in np.flatnonzero(dones):
+            env_infos[i]["terminal_observation"] = infos["final_obs"][i]
+            env_infos[i]["TimeLimit.truncated"] = bool(truncations[i] and not terminations[i])
+        return observations, rewards.astype(np.float32), dones, env_infos
+
+    def close(self):
+        self.venv.close()
+
+    # --- Attribute and method access ---
+    # The copies share one VectorSLAMAtroposEnv, so an attribute has a single
+    # value for all of them and a method acts on all of them at once.
+    def _check_all_indices(self, indices, action: str):
+        if sorted(set(self._get_indices(indices))) != list(range(self.num_envs)):
+            raise ValueError(
+                f"Cannot {action} for a subset of the {self.num_envs} copies; they share one vectorized state"
+            )
+
+    def get_attr(self, attr_name, indices=None):
+        value = getattr(self.venv, attr_name)
+        return [value for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        self._check_all_indices(indices, f"set {attr_name}")
+        setattr(self.venv, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        """Calls the method once on the shared vector env; its result is returned for every index."""
+        self._check_all_indices(indices, f"call {method_name}")
+        result = getattr(self.venv, method_name)(*method_args, **method_kwargs)
+        return [result for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
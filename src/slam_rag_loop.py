@@ -1,5 +1,4 @@
 import os
-import time
 import numpy as np
 from qdrant_client import QdrantClient, models
 import google.generativeai as genai
@@ -7,18 +6,29 @@ from google.cloud import aiplatform
 from dotenv import load_dotenv
 from tqdm import tqdm
 from src.vector_db import VectorDB
+from src.embedders import get_embedder
+from src.embedding_scheduler import EmbeddingScheduler
+from src.loop_closure_verifier import LoopClosureVerifier, StubVerificationModel, VerdictCache
+from src.replay import ReplayGenerativeModel, get_replay_store
+from src.tracing import get_tracer, span
 
 # --- Configuration ---
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY not found in .env file")
-genai.configure(api_key=GEMINI_API_KEY)
 
 # --- Vector Store Configuration ---
 VECTOR_STORE_TYPE = "qdrant"  # "qdrant" or "vertexai"
 COLLECTION_NAME = "slam_keyframes"
+VECTOR_DB_BACKEND = "qdrant"  # "qdrant" (HNSW) or "numpy" (exact brute-force, for maps under ~100k keyframes)
 CAPTIONS_FILE = "datasets/captions.txt"
+VECTOR_DB_PATH = "datasets/vector_db"  # On-disk map storage; None keeps the map in memory only
+EMBEDDING_MAX_INFLIGHT = 4  # Concurrent embedding requests while indexing
+EMBEDDING_RPM = 1500  # Embedding API requests-per-minute budget
+GENERATION_MODEL = "gemini-1.5-flash"
+VERIFICATION_MODEL = "gemini"  # "gemini" or "stub" (local word-overlap model, no API key needed)
+VERIFICATION_MAX_INFLIGHT = 5  # Candidates verified concurrently
+VERDICT_CACHE_DIR = os.path.join(".cache", "verdicts")  # Persistent (caption, caption) -> verdict cache
+TRACE_FILE = "results/traces/slam_rag_loop.json"  # Chrome trace of the per-stage spans; None disables export
 
 # --- Google Cloud / Vertex AI Configuration (placeholders) ---
 GCP_PROJECT_ID = "your-gcp-project-id"
@@ -53,47 +63,80 @@ elif VECTOR_STORE_TYPE == "vertexai":
 else:
     raise ValueError(f"Unsupported VECTOR_STORE_TYPE: {VECTOR_STORE_TYPE}")
 
-generation_model = genai.GenerativeModel('gemini-1.5-flash')
+embedder = get_embedder()
+generation_model = None
+vector_db = None
+verifier = None
+
+def get_vector_db():
+    """Returns the shared keyframe database, opening the persisted map on first use."""
+    global vector_db
+    if vector_db is None:
+        vector_db = VectorDB(
+            collection_name=COLLECTION_NAME, embedder=embedder, backend=VECTOR_DB_BACKEND, path=VECTOR_DB_PATH
+        )
+    return vector_db
+
+def get_generation_model():
+    """
+    Returns the Gemini model used for verification, configuring it on first
+    use. With SLAM_REPLAY_MODE set, its responses are recorded to or replayed
+    from the local replay store; pure replay needs no API key.
+    """
+    global generation_model
+    if generation_model is None:
+        store = get_replay_store()
+        model = None
+        if store is None or store.mode != "replay":
+            if not GEMINI_API_KEY:
+                raise ValueError("GEMINI_API_KEY not found in .env file")
+            genai.configure(api_key=GEMINI_API_KEY)
+            model = genai.GenerativeModel(GENERATION_MODEL)
+        generation_model = model if store is None else ReplayGenerativeModel(store, model, GENERATION_MODEL)
+    return generation_model
+
+def get_verifier():
+    """Returns the shared loop-closure verifier, backed by the configured model."""
+    global verifier
+    if verifier is None:
+        if VERIFICATION_MODEL == "stub":
+            model, model_name = StubVerificationModel(), "stub"
+        else:
+            model, model_name = get_generation_model(), GENERATION_MODEL
+        verifier = LoopClosureVerifier(
+            model, model_name=model_name, cache=VerdictCache(VERDICT_CACHE_DIR), max_workers=VERIFICATION_MAX_INFLIGHT
+        )
+    return verifier
 
 def get_embedding(text, task_type="RETRIEVAL_DOCUMENT"):
     """Generates an embedding for a given text."""
-    result = genai.embed_content(
-        model="models/embedding-001",
-        content=text,
-        task_type=task_type,
-    )
-    return result['embedding']
+    return embedder.embed([text], task_type=task_type)[0].tolist()
 
 def populate_database():
     """
-    Populates the Qdrant database with embeddings from the captions file.
+    Populates the vector database with embeddings from the captions file.
+
+    An existing on-disk map is reused and only captions that are not yet
+    indexed are embedded and appended.
     """
-    db = VectorDB(collection_name=COLLECTION_NAME)
-    db.create_collection()
-    return db.index_captions(CAPTIONS_FILE)
+    db = get_vector_db()
+    if not db.create_collection(recreate=False):
+        print(f"Warm start: loaded {db.count()} keyframes from {VECTOR_DB_PATH}")
+    scheduler = EmbeddingScheduler(embedder, max_inflight=EMBEDDING_MAX_INFLIGHT, requests_per_minute=EMBEDDING_RPM)
+    indexed = db.index_captions(CAPTIONS_FILE, scheduler=scheduler, skip_existing=True)
+    print(scheduler.report())
+    return indexed
 
 def find_loop_closure_candidates(query_embedding, top_k=5, geo_filter=None):
-    """Finds potential loop closure candidates from the Qdrant database."""
-    db = VectorDB(collection_name=COLLECTION_NAME)
+    """Finds potential loop closure candidates from the vector database."""
+    db = get_vector_db()
     # In a real implementation, we would need to get the 3D pose
     # and use the pruning model to predict the most promising regions.
     return db.query(query_embedding, top_k=top_k, geo_filter=geo_filter)
 
 def verify_loop_closure(current_caption, candidate_caption):
-    """Uses the Gemini model to verify if two captions describe the same location."""
-    prompt = f"""
-    You are a visual verification agent for a SLAM system.
-    Your task is to determine if two image captions describe the same physical location,
-    even if viewed from a different angle or at a different time.
-
-    Caption A: "{current_caption}"
-    Caption B: "{candidate_caption}"
-
-    Do these two captions describe the same location?
-    Answer with only "Yes" or "No".
-    """
-    response = generation_model.generate_content(prompt)
-    return "yes" in response.text.lower()
+    """Uses the verification model to check if two captions describe the same location."""
+    return get_verifier().verify(current_caption, candidate_caption)
 
 def main_loop():
     """
@@ -105,38 +148,39 @@ def main_loop():
     new_keyframe_caption = "a desk with a computer monitor and a keyboard"
     print(f"\nNew Keyframe Caption: {new_keyframe_caption}")
 
-    # 1. Generate embedding for the new keyframe
-    start_time = time.time()
-    query_embedding = get_embedding(new_keyframe_caption, task_type="RETRIEVAL_QUERY")
-    print(f"Generated query embedding in {time.time() - start_time:.2f}s")
-
-    # 2. Find potential loop closure candidates
-    start_time = time.time()
-    candidates = find_loop_closure_candidates(query_embedding, geo_filter="geo_1")
-    print(f"Found {len(candidates)} candidates in {time.time() - start_time:.2f}s")
+    with span("keyframe"):
+        # 1. Generate embedding for the new keyframe
+        with span("embed"):
+            query_embedding = get_embedding(new_keyframe_caption, task_type="RETRIEVAL_QUERY")
 
-    if not candidates:
-        print("No potential loop closures found.")
-        return
+        # 2. Find potential loop closure candidates
+        candidates = find_loop_closure_candidates(query_embedding, geo_filter="geo_1")
+        print(f"Found {len(candidates) if candidates else 0} candidates")
 
-    # 3. Verify candidates with the LLM
-    for candidate in candidates:
-        print(f"\n--- Verifying Candidate {candidate.id} (Score: {candidate.score:.4f}) ---")
-        print(f"  Candidate Caption: {candidate.payload['caption']}")
+        if candidates:
+            # 3. Verify all candidates with the LLM at once; the first confirmed match wins
+            for candidate in candidates:
+                print(f"  Candidate {candidate.id} (Score: {candidate.score:.4f}): {candidate.payload['caption']}")
 
-        start_time = time.time()
-        is_match = verify_loop_closure(new_keyframe_caption, candidate.payload['caption'])
-        print(f"  Verification took {time.time() - start_time:.2f}s")
+            with span("verify", candidates=len(candidates)):
+                match = get_verifier().first_match(
+                    new_keyframe_caption, [candidate.payload['caption'] for candidate in candidates]
+                )
 
-        if is_match:
-            print("  ✅ VERIFIED: This is a loop closure.")
-            # In a real system, you would now add a constraint to the pose graph.
-            break
-        else:
-            print("  ❌ REJECTED: Not a loop closure.")
+    if not candidates:
+        print("No potential loop closures found.")
+    elif match is not None:
+        print(f"  ✅ VERIFIED: Candidate {candidates[match].id} is a loop closure.")
+        # In a real system, you would now add a constraint to the pose graph.
     else:
         print("\nNo verified loop closures found among the top candidates.")
 
+    tracer = get_tracer()
+    print(f"\n{tracer.report()}")
+    if TRACE_FILE:
+        tracer.export_chrome_trace(TRACE_FILE)
+        print(f"Trace written to {TRACE_FILE}")
+
 
 if __name__ == "__main__":
     if populate_database():
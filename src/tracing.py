@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# --- Configuration ---
+MAX_TRACE_EVENTS = 100_000  # Spans kept for trace export
+MAX_DURATION_SAMPLES = 10_000  # Most recent durations per stage kept for percentiles and histograms
+
+
+class Tracer:
+    """
+    Records named, nested timing spans for the RAG-SLAM pipeline.
+
+    Every span adds its duration to a per-stage histogram (for p50/p95/p99
+    summaries) and an event to a bounded buffer that can be exported as a
+    Chrome trace (chrome://tracing or https://ui.perfetto.dev). Spans may be
+    opened from any thread. Count, mean and max cover the whole session;
+    percentiles and histograms cover the most recent `max_samples` spans of
+    each stage, so memory stays bounded in long runs.
+    """
+    def __init__(self, enabled: bool = True, max_events: int = MAX_TRACE_EVENTS,
+                 max_samples: int = MAX_DURATION_SAMPLES):
+        self.enabled = enabled
+        self._events = deque(maxlen=max_events)
+        self._durations_ms = defaultdict(lambda: deque(maxlen=max_samples))
+        self._totals = defaultdict(lambda: [0, 0.0, 0.0])  # count, sum_ms, max_ms
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+
+    @contextmanager
+    def span(self, name: str, **args):
+        """Times the enclosed block as stage `name`; `args` are attached to the trace event."""
+        if not self.enabled:
+            yield
+            return
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, start_ns, time.perf_counter_ns() - start_ns, **args)
+
+    def record(self, name: str, start_ns: int, duration_ns: int, **args):
+        """Adds a span measured elsewhere (with time.perf_counter_ns)."""
+        if not self.enabled:
+            return
+        duration_ms = duration_ns / 1e6
+        event = {
+            "name": name, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+            "ts": (start_ns - self._origin_ns) / 1e3, "dur": duration_ns / 1e3,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self._events.append(event)
+            self._durations_ms[name].append(duration_ms)
+            totals = self._totals[name]
+            totals[0] += 1
+            totals[1] += duration_ms
+            totals[2] = max(totals[2], duration_ms)
+
+    def reset(self):
+        with self._lock:
+            self._events.clear()
+            self._durations_ms.clear()
+            self._totals.clear()
+
+    # --- Aggregation ---
+    def stats(self) -> dict:
+        """Returns {stage: {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}."""
+        with self._lock:
+            durations = {name: np.array(values) for name, values in self._durations_ms.items()}
+            totals = {name: list(values) for name, values in self._totals.items()}
+        stats = {}
+        for name, values in durations.items():
+            count, total_ms, max_ms = totals[name]
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            stats[name] = {
+                "count": count, "mean_ms": total_ms / count, "p50_ms": float(p50),
+                "p95_ms": float(p95), "p99_ms": float(p99), "max_ms": max_ms,
+            }
+        return stats
+
+    def histogram(self, name: str, bins: int = 20):
+        """Returns (counts, bin_edges_ms) of the durations of stage `name`."""
+        with self._lock:
+            values = np.array(self._durations_ms.get(name, []))
+        return np.histogram(values, bins=bins)
+
+    def report(self) -> str:
+        """Formats the per-stage latency summary as a table."""
+        lines = [f"{'stage':<18}{'count':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for name, s in self.stats().items():
+            lines.append(f"{name:<18}{s['count']:>8}{s['mean_ms']:>10.2f}{s['p50_ms']:>10.2f}"
+                         f"{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}{s['max_ms']:>10.2f}")
+        return "\n".join(lines)
+
+    # --- Export ---
+    def export_chrome_trace(self, path: str):
+        """Writes the recorded spans in the Chrome trace event format, plus the stage summary."""
+        with self._lock:
+            events = list(self._events)
+        trace = {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"stages": self.stats()}}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(trace, f)
+        os.replace(tmp_path, path)
+
+
+_tracer = Tracer(enabled=os.getenv("SLAM_TRACING", "1") != "0")
+
+
+def get_tracer() -> Tracer:
+    """Returns the process-wide tracer shared by the pipeline stages."""
+    return _tracer
+
+
+def span(name: str, **args):
+    """Opens a span on the process-wide tracer."""
+    return _tracer.span(name, **args)
@@ -6,11 +6,16 @@ import gymnasium as gym
 from stable_baselines3 import PPO
 from stable_baselines3.common.env_checker import check_env
 
-from atropos_env import SLAMAtroposEnv
+from src.atropos_env import SLAMAtroposEnv
+from src.sb3_vec_env import SB3VectorSLAMAtroposEnv
+
+# Number of environment copies stepped together in one vectorized call.
+NUM_ENVS = 64
 
 # --- 1. Instantiate the Environment ---
 print("Initializing environment...")
 env = SLAMAtroposEnv()
+vec_env = SB3VectorSLAMAtroposEnv(NUM_ENVS)
 
 # It's good practice to check the environment to ensure it's compatible with stable-baselines3
 try:
@@ -26,7 +31,7 @@ except Exception as e:
 print("Creating PPO agent...")
 model = PPO(
     "MlpPolicy", 
-    env, 
+    vec_env, 
     verbose=1,
     tensorboard_log="./ppo_slam_tensorboard/"
 )
@@ -64,5 +69,6 @@ print(f"Predicted action name: {action_map[action.item()]}")
 
 # Clean up the environment
 env.close()
+vec_env.close()
 
 print("\nScript finished successfully.")
\ No newline at end of file
@@ -0,0 +1,92 @@
+import os
+
+import numpy as np
+
+# --- Configuration ---
+CACHE_SUFFIX = ".npz"  # Sidecar binary cache: <trajectory file>.npz
+TUM_HEADER = "# timestamp tx ty tz qx qy qz qw\n"
+TUM_ROW_FORMAT = "%.6f %.9f %.9f %.9f %.9f %.9f %.9f %.9f\n"
+
+
+def _source_stamp(path: str) -> np.ndarray:
+    stat = os.stat(path)
+    return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+
+def _read_cache(path: str, stamp: np.ndarray):
+    cache_path = path + CACHE_SUFFIX
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with np.load(cache_path) as cache:
+            if np.array_equal(cache["source"], stamp):
+                return cache["poses"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def _write_cache(path: str, poses: np.ndarray):
+    cache_path = path + CACHE_SUFFIX
+    tmp_path = f"{cache_path}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            np.savez(f, poses=poses, source=_source_stamp(path))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # A read-only dataset directory just means no cache.
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read_tum(path: str, use_cache: bool = True) -> np.ndarray:
+    """
+    Reads a TUM trajectory (timestamp tx ty tz qx qy qz qw per line, '#'
+    comments allowed) as an (N, 8) float64 array.
+
+    The parsed array is kept in a sidecar <path>.npz together with the
+    size and mtime of the text file, and later reads of an unchanged file
+    load the binary copy instead of parsing the text again.
+    """
+    stamp = _source_stamp(path)
+    if use_cache:
+        poses = _read_cache(path, stamp)
+        if poses is not None:
+            return poses
+    poses = np.loadtxt(path, dtype=np.float64, comments="#", ndmin=2)
+    if poses.size == 0:
+        poses = poses.reshape(0, 8)
+    if poses.shape[1] != 8:
+        raise ValueError(f"{path} is not a TUM trajectory: expected 8 columns, got {poses.shape[1]}")
+    if use_cache:
+        _write_cache(path, poses)
+    return poses
+
+
+def format_tum(timestamps, positions, quaternions=None, header: bool = False) -> str:
+    """
+    Formats poses as TUM text in one vectorized pass. Without `quaternions`
+    every pose gets the identity orientation.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64).reshape(-1, 1)
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    if quaternions is None:
+        quaternions = np.tile([0.0, 0.0, 0.0, 1.0], (len(positions), 1))
+    poses = np.hstack([timestamps, positions, np.asarray(quaternions, dtype=np.float64).reshape(-1, 4)])
+    text = (TUM_ROW_FORMAT * len(poses)) % tuple(poses.ravel())
+    return TUM_HEADER + text if header else text
+
+
+def write_tum(path: str, timestamps, positions, quaternions=None):
+    """
+    Writes poses as a TUM trajectory file, atomically. A stale sidecar
+    cache is ignored by read_tum because the file's size and mtime changed.
+    """
+    text = format_tum(timestamps, positions, quaternions, header=True)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
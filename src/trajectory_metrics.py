@@ -0,0 +1,179 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.trajectory_io import read_tum
+
+# --- Configuration ---
+MAX_TIME_DIFF = 0.01  # Seconds; the default of evo's associate_trajectories
+
+
+def load_tum_trajectory(path: str):
+    """
+    Reads a TUM trajectory file into (timestamps (N,), positions (N, 3),
+    quaternions (N, 4) as x y z w), through the binary cache of read_tum.
+    """
+    data = read_tum(path)
+    return data[:, 0], data[:, 1:4], data[:, 4:8]
+
+
+def quaternions_to_matrices(quaternions: np.ndarray) -> np.ndarray:
+    """Converts (N, 4) x y z w quaternions to (N, 3, 3) rotation matrices."""
+    q = quaternions / np.linalg.norm(quaternions, axis=1, keepdims=True)
+    x, y, z, w = q.T
+    return np.stack([
+        1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w),
+        2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w),
+        2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y),
+    ], axis=1).reshape(-1, 3, 3)
+
+
+# --- Association and alignment ---
+def associate(stamps_ref: np.ndarray, stamps_est: np.ndarray, max_diff: float = MAX_TIME_DIFF):
+    """
+    Matches timestamps like evo's associate_trajectories: every stamp of the
+    shorter trajectory is paired with the nearest stamp of the longer one if
+    they are at most `max_diff` apart. Returns (ref_indices, est_indices).
+    """
+    swap = len(stamps_est) > len(stamps_ref)
+    short, long = (stamps_ref, stamps_est) if swap else (stamps_est, stamps_ref)
+    order = np.argsort(long, kind="stable")
+    sorted_long = long[order]
+    if len(long) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    right = np.minimum(np.searchsorted(sorted_long, short), len(long) - 1)
+    left = np.maximum(right - 1, 0)
+    # On a tie the earlier stamp wins, as with argmin.
+    use_left = np.abs(short - sorted_long[left]) <= np.abs(sorted_long[right] - short)
+    nearest = np.where(use_left, left, right)
+    matched = np.abs(sorted_long[nearest] - short) <= max_diff
+    short_indices = np.flatnonzero(matched)
+    long_indices = order[nearest[matched]]
+    return (short_indices, long_indices) if swap else (long_indices, short_indices)
+
+
+def umeyama_alignment(source: np.ndarray, target: np.ndarray, with_scale: bool = False):
+    """
+    Least-squares similarity transform (Umeyama, 1991) mapping the (N, 3)
+    points `source` onto `target`. Returns (rotation, translation, scale).
+    """
+    mean_source = source.mean(axis=0)
+    mean_target = target.mean(axis=0)
+    centered_source = source - mean_source
+    centered_target = target - mean_target
+    covariance = centered_target.T @ centered_source / len(source)
+    u, d, vt = np.linalg.svd(covariance)
+    s = np.eye(3)
+    if np.linalg.det(u) * np.linalg.det(vt) < 0:
+        s[2, 2] = -1
+    rotation = u @ s @ vt
+    scale = np.trace(np.diag(d) @ s) / (np.sum(centered_source ** 2) / len(source)) if with_scale else 1.0
+    translation = mean_target - scale * rotation @ mean_source
+    return rotation, translation, scale
+
+
+# --- Metrics ---
+def error_statistics(errors: np.ndarray) -> dict:
+    """The statistics evo reports for a metric: rmse, mean, median, std, min, max."""
+    return {
+        "rmse": float(np.sqrt(np.mean(errors ** 2))), "mean": float(np.mean(errors)),
+        "median": float(np.median(errors)), "std": float(np.std(errors)),
+        "min": float(np.min(errors)), "max": float(np.max(errors)),
+    }
+
+
+def absolute_trajectory_error(ref_positions, est_positions, align: bool = True, correct_scale: bool = False) -> dict:
+    """ATE (translation part) of associated positions, after Umeyama alignment of the estimate."""
+    if align:
+        rotation, translation, scale = umeyama_alignment(est_positions, ref_positions, with_scale=correct_scale)
+        est_positions = scale * est_positions @ rotation.T + translation
+    return error_statistics(np.linalg.norm(ref_positions - est_positions, axis=1))
+
+
+def relative_pose_error(ref_positions, ref_rotations, est_positions, est_rotations, delta: int = 1) -> dict:
+    """
+    RPE between poses `delta` frames apart (evo's default: consecutive
+    pairs, no overlap). Returns the translation statistics in metres and the
+    rotation statistics in degrees under the "rot_" prefix.
+    """
+    i = np.arange(0, len(ref_positions), delta)
+    i, j = i[:-1], i[1:]
+
+    def relative(positions, rotations):
+        rotations_i_t = np.transpose(rotations[i], (0, 2, 1))
+        return rotations_i_t @ rotations[j], np.einsum("nab,nb->na", rotations_i_t, positions[j] - positions[i])
+
+    ref_rel_rotation, ref_rel_translation = relative(ref_positions, ref_rotations)
+    est_rel_rotation, est_rel_translation = relative(est_positions, est_rotations)
+    # Error pose E = (ref_i^-1 ref_j)^-1 (est_i^-1 est_j).
+    ref_rel_rotation_t = np.transpose(ref_rel_rotation, (0, 2, 1))
+    translation_errors = np.linalg.norm(
+        np.einsum("nab,nb->na", ref_rel_rotation_t, est_rel_translation - ref_rel_translation), axis=1
+    )
+    error_rotations = ref_rel_rotation_t @ est_rel_rotation
+    cos_angle = np.clip((np.trace(error_rotations, axis1=1, axis2=2) - 1) / 2, -1.0, 1.0)
+    rotation_errors = np.degrees(np.arccos(cos_angle))
+    stats = error_statistics(translation_errors)
+    stats.update({f"rot_{name}": value for name, value in error_statistics(rotation_errors).items()})
+    return stats
+
+
+def evaluate_trajectory(ground_truth, estimate, max_diff: float = MAX_TIME_DIFF, delta: int = 1,
+                        correct_scale: bool = False) -> dict:
+    """
+    Evaluates one estimate against the ground truth; both are
+    (timestamps, positions, quaternions) tuples as from load_tum_trajectory.
+    """
+    ref_indices, est_indices = associate(ground_truth[0], estimate[0], max_diff)
+    if len(ref_indices) < 3:
+        raise ValueError(f"Only {len(ref_indices)} timestamps could be associated with the ground truth")
+    ref_positions, est_positions = ground_truth[1][ref_indices], estimate[1][est_indices]
+    ate = absolute_trajectory_error(ref_positions, est_positions, correct_scale=correct_scale)
+    rpe = relative_pose_error(
+        ref_positions, quaternions_to_matrices(ground_truth[2][ref_indices]),
+        est_positions, quaternions_to_matrices(estimate[2][est_indices]), delta=delta,
+    )
+    row = {"matched": len(ref_indices)}
+    row.update({f"ate_{name}": value for name, value in ate.items()})
+    row.update({f"rpe_{name}": value for name, value in rpe.items()})
+    return row
+
+
+# --- Batch evaluation ---
+_worker_ground_truth = None
+
+
+def _init_worker(ground_truth):
+    global _worker_ground_truth
+    _worker_ground_truth = ground_truth
+
+
+def _evaluate_file(path: str, options: dict) -> dict:
+    row = {"trajectory": path}
+    try:
+        row.update(evaluate_trajectory(_worker_ground_truth, load_tum_trajectory(path), **options))
+    except (OSError, ValueError) as e:
+        row["error"] = str(e)
+    return row
+
+
+def evaluate_directory(ground_truth_file: str, estimate_dir: str, pattern: str = "*.txt", workers: int = None,
+                       **options) -> list:
+    """
+    Evaluates every trajectory matching `pattern` under `estimate_dir`
+    (recursively) against one ground truth, in parallel. The ground truth is
+    loaded once and handed to each worker process. Returns one result row
+    per file, in path order; files that fail carry an "error" entry.
+    """
+    ground_truth = load_tum_trajectory(ground_truth_file)
+    ground_truth_path = os.path.abspath(ground_truth_file)
+    paths = sorted(
+        path for path in glob.glob(os.path.join(estimate_dir, "**", pattern), recursive=True)
+        if os.path.abspath(path) != ground_truth_path
+    )
+    if not paths:
+        return []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(ground_truth,)) as pool:
+        return list(pool.map(_evaluate_file, paths, [options] * len(paths)))
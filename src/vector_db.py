@@ -1,99 +1,402 @@
 import time
 import numpy as np
 from qdrant_client import QdrantClient, models
-import google.generativeai as genai
 import os
-from dotenv import load_dotenv
-import sys
+import json
+import shutil
+from datetime import datetime
 from tqdm import tqdm
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from src.embedders import get_embedder
+from src.embedding_scheduler import EmbeddingScheduler
+from src.numpy_store import NumpyVectorStore
+from src.pose_index import VoxelPoseIndex
+from src.tracing import span
 
-# --- Gemini API Key Configuration ---
-load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    print("Error: GEMINI_API_KEY not found.")
-    sys.exit(1)
-genai.configure(api_key=GEMINI_API_KEY)
+def iter_captions(captions_file: str):
+    """Lazily yields (line_number, filename, caption) for each captioned line of a file."""
+    with open(captions_file, "r", encoding="utf-8") as f:
+        for i, line in enumerate(f):
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) >= 2:
+                yield i, parts[0], parts[1]
+
+def batched(iterable, batch_size: int):
+    """Yields lists of up to `batch_size` consecutive items from an iterable."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def list_snapshot_versions(snapshot_root: str) -> list:
+    """Returns the version numbers of the complete snapshots under a directory."""
+    if not os.path.isdir(snapshot_root):
+        return []
+    return sorted(
+        int(name[1:]) for name in os.listdir(snapshot_root)
+        if name.startswith("v") and name[1:].isdigit()
+    )
+
+# Candidates fetched per requested result from quantized codes before float rescoring.
+QUANTIZATION_OVERSAMPLING = 3.0
+
+def quantization_config(quantization):
+    """Returns the Qdrant quantization config for "int8", "binary" or None."""
+    if quantization is None:
+        return None
+    if quantization == "int8":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    if quantization == "binary":
+        return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+    raise ValueError(f"Unsupported quantization: {quantization}")
+
+def default_search_params():
+    """Search parameters shared by all queries; quantization settings only apply to quantized collections."""
+    return models.SearchParams(
+        hnsw_ef=128,
+        quantization=models.QuantizationSearchParams(rescore=True, oversampling=QUANTIZATION_OVERSAMPLING),
+    )
 
 class VectorDB:
-    def __init__(self, collection_name="slam_keyframes"):
-        self.client = QdrantClient(":memory:")
+    def __init__(self, collection_name="slam_keyframes", embedder=None, backend="qdrant", dtype=np.float32, path=None,
+                 voxel_size=1.0):
+        """
+        `backend` selects the search engine: "qdrant" (Qdrant with HNSW) or
+        "numpy" (exact brute-force search over a contiguous matrix of `dtype`
+        vectors, preferable for maps under ~100k keyframes).
+
+        With a `path`, the collection is persisted on disk (local Qdrant
+        storage or memory-mapped NumPy files) and survives restarts;
+        otherwise it lives in memory only.
+
+        Keyframe positions (payload field "pose") are additionally kept in a
+        voxel hash with cells of `voxel_size` metres for geometric pre-filtering.
+        """
+        if backend == "qdrant":
+            self.client = QdrantClient(path=path) if path else QdrantClient(":memory:")
+        elif backend == "numpy":
+            self.client = NumpyVectorStore(dtype=dtype, path=path)
+        else:
+            raise ValueError(f"Unsupported VectorDB backend: {backend}")
+        self.backend = backend
+        self.path = path
         self.collection_name = collection_name
+        self.embedder = embedder if embedder is not None else get_embedder()
+        self.voxel_size = voxel_size
+        self._pose_index = None
 
     def get_embedding(self, text, task_type="RETRIEVAL_DOCUMENT"):
-        """Generates an embedding for a given text."""
-        result = genai.embed_content(
-            model="models/embedding-001",
-            content=text,
-            task_type=task_type,
-        )
-        return result['embedding']
+        """Generates an embedding for a given text (or list of texts)."""
+        texts = [text] if isinstance(text, str) else list(text)
+        embeddings = self.embedder.embed(texts, task_type=task_type).tolist()
+        return embeddings[0] if isinstance(text, str) else embeddings
+
+    def create_collection(self, vector_size=None, distance=models.Distance.COSINE, recreate=True, quantization=None):
+        """
+        Creates the collection, deleting any existing one when `recreate` is
+        set. With `recreate=False` an existing (e.g. persisted) collection is
+        kept as is, which is how a warm start reuses a previously built map.
+        The embedder that builds a collection is recorded in its metadata, and
+        a warm start with a different embedder raises ValueError.
 
-    def create_collection(self, vector_size=768, distance=models.Distance.COSINE):
+        `quantization` ("int8" or "binary") keeps compact codes in RAM for the
+        search; the best candidates are rescored with the float vectors.
+        """
+        vector_size = vector_size or self.embedder.dim
         if self.client.collection_exists(collection_name=self.collection_name):
+            if not recreate:
+                self.check_embedder()
+                return False
             self.client.delete_collection(collection_name=self.collection_name)
+        self._pose_index = None
         self.client.create_collection(
             collection_name=self.collection_name,
             vectors_config=models.VectorParams(size=vector_size, distance=distance),
+            quantization_config=quantization_config(quantization),
+            metadata={"embedder": self.embedder.model_name, "dim": vector_size},
         )
+        return True
 
-    def index_captions(self, captions_file: str, batch_size: int = 32):
-        """Indexes captions from a file in batches."""
-        if not os.path.exists(captions_file):
-            print(f"Error: Captions file not found at {captions_file}")
-            return False
+    def collection_metadata(self) -> dict:
+        """Returns the metadata recorded when the collection was created (empty for older maps)."""
+        if self.backend == "numpy":
+            metadata = self.client.collection_metadata(self.collection_name)
+        else:
+            metadata = self.client.get_collection(collection_name=self.collection_name).config.metadata
+        return metadata or {}
 
-        with open(captions_file, "r") as f:
-            lines = f.readlines()
-
-        points_to_upsert = []
-        for i in range(0, len(lines), batch_size):
-            batch_lines = lines[i:i+batch_size]
-            captions_data = [line.strip().split("\t") for line in batch_lines if "\t" in line]
-            
-            text_captions = [data for data in captions_data]
-            
-            if not text_captions:
-                continue
-
-            embeddings = self.get_embedding(text_captions, task_type="RETRIEVAL_DOCUMENT")
-            
-            points_to_upsert.extend([
-                models.PointStruct(
-                    id=i + j,
-                    vector=embedding,
-                    payload={"filename": captions_data[j], "caption": captions_data[j]}
-                )
-                for j, embedding in enumerate(embeddings)
-            ])
+    def check_embedder(self):
+        """Raises ValueError if the existing collection was built by a different embedder."""
+        metadata = self.collection_metadata()
+        if "embedder" not in metadata:
+            print(f"Warning: {self.collection_name} does not record its embedder; assuming {self.embedder.model_name}")
+            return
+        if metadata["embedder"] != self.embedder.model_name or metadata["dim"] != self.embedder.dim:
+            raise ValueError(
+                f"Collection {self.collection_name} was embedded with {metadata['embedder']} ({metadata['dim']}-dim), "
+                f"not {self.embedder.model_name} ({self.embedder.dim}-dim); rebuild it with recreate=True "
+                "or select the matching embedder."
+            )
 
-        if points_to_upsert:
-            self.client.upsert(
+    def close(self):
+        """Flushes and releases the underlying storage (required before reopening a persisted map)."""
+        self.client.close()
+
+    def count(self) -> int:
+        return self.client.count(collection_name=self.collection_name).count
+
+    def iter_points(self, with_payload=True, with_vectors=False, page_size: int = 1024):
+        """Yields every point of the collection, one scroll page at a time."""
+        offset = None
+        while True:
+            records, offset = self.client.scroll(
                 collection_name=self.collection_name,
-                points=points_to_upsert,
-                wait=True,
+                limit=page_size,
+                offset=offset,
+                with_payload=with_payload,
+                with_vectors=with_vectors,
             )
-        return True
+            yield from records
+            if offset is None:
+                return
+
+    def index_captions(self, captions_file: str, batch_size: int = 32, max_inflight: int = 2, scheduler=None,
+                       skip_existing: bool = False, poses: dict = None):
+        """
+        Indexes captions from a file in batches, streaming from disk.
+
+        Captions are read lazily and embedded `batch_size` at a time through
+        `scheduler` (an EmbeddingScheduler; by default one that embeds a
+        single batch at a time). Each embedded batch is handed to a background
+        upsert worker as soon as it is ready, with at most `max_inflight`
+        batches waiting to be written, so peak memory is
+        O(batch_size * max_inflight) regardless of file size.
+
+        With `skip_existing`, lines whose IDs are already in the collection
+        are not re-embedded, so re-running on a grown captions file only
+        appends the new keyframes.
+
+        `poses` optionally maps image filenames to keyframe positions, which
+        are stored with each keyframe for pose-restricted queries.
+        """
+        if not os.path.exists(captions_file):
+            print(f"Error: Captions file not found at {captions_file}")
+            return False
 
-    def query(self, query_embedding, top_k=5, geo_filter=None):
-        """Queries the vector database with an optional geometric filter."""
-        query_filter = None
-        if geo_filter:
-            query_filter = models.Filter(
-                must=[
-                    models.FieldCondition(
-                        key="geometric_descriptor",
-                        match=models.MatchValue(value=geo_filter),
+        scheduler = scheduler or EmbeddingScheduler(self.embedder, max_inflight=1)
+        captions = iter_captions(captions_file)
+        if skip_existing:
+            existing = {point.id for point in self.iter_points(with_payload=False)}
+            captions = (caption for caption in captions if caption[0] not in existing)
+        batches = batched(captions, batch_size)
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=1) as upsert_worker:
+            for batch, embeddings in scheduler.embed_batches(
+                batches, task_type="RETRIEVAL_DOCUMENT", texts_of=lambda batch: [c for _, _, c in batch]
+            ):
+                points = [
+                    models.PointStruct(
+                        id=point_id,
+                        vector=embedding,
+                        payload={"filename": filename, "caption": caption}
                     )
+                    for (point_id, filename, caption), embedding in zip(batch, embeddings.tolist())
                 ]
-            )
-        search_result = self.client.query_points(
+                if poses:
+                    for point in points:
+                        position = poses.get(point.payload["filename"])
+                        if position is not None:
+                            point.payload["pose"] = [float(c) for c in position[:3]]
+                            if self._pose_index is not None:
+                                self._pose_index.add(point.id, position)
+
+                while len(pending) >= max_inflight:
+                    pending.popleft().result()
+                pending.append(upsert_worker.submit(
+                    self.client.upsert,
+                    collection_name=self.collection_name,
+                    points=points,
+                    wait=True,
+                ))
+
+            while pending:
+                pending.popleft().result()
+        return True
+
+    @property
+    def pose_index(self) -> VoxelPoseIndex:
+        """The spatial index over keyframe positions, rebuilt from payloads on first use."""
+        if self._pose_index is None:
+            self._pose_index = VoxelPoseIndex(self.voxel_size)
+            if self.client.collection_exists(collection_name=self.collection_name):
+                for point in self.iter_points(with_payload=True):
+                    if point.payload and "pose" in point.payload:
+                        self._pose_index.add(point.id, point.payload["pose"])
+        return self._pose_index
+
+    def set_keyframe_pose(self, point_id: int, position):
+        """Stores (or updates) the 3D position of an indexed keyframe."""
+        position = [float(c) for c in position[:3]]
+        self.client.set_payload(collection_name=self.collection_name, payload={"pose": position}, points=[point_id])
+        self.pose_index.add(point_id, position)
+
+    def delete_points(self, point_ids):
+        """Removes keyframes from the collection and the pose index."""
+        point_ids = [int(point_id) for point_id in point_ids]
+        if not point_ids:
+            return
+        self.client.delete(
             collection_name=self.collection_name,
-            query=query_embedding,
-            query_filter=query_filter,
-            limit=top_k,
-            search_params=models.SearchParams(hnsw_ef=128),
+            points_selector=models.PointIdsList(points=point_ids),
+            wait=True,
         )
+        if self._pose_index is not None:
+            for point_id in point_ids:
+                self._pose_index.remove(point_id)
+
+    def keyframes_near(self, position, radius=None, covariance=None) -> list:
+        """
+        Returns the IDs of keyframes within `radius` of a position, or inside
+        the 95% confidence ellipsoid of a position estimate with `covariance`.
+        """
+        if covariance is not None:
+            return self.pose_index.query_ellipsoid(position, covariance).tolist()
+        return self.pose_index.query_radius(position, radius).tolist()
+
+    def save_snapshot(self, snapshot_root: str) -> str:
+        """
+        Writes a versioned snapshot of the collection to snapshot_root/vNNNN.
+
+        A snapshot holds the vectors and IDs as .npy arrays, the payloads as
+        JSON lines and a manifest. It is written to a temporary directory and
+        renamed into place, so a crash never leaves a partial version behind.
+        """
+        os.makedirs(snapshot_root, exist_ok=True)
+        version = max(list_snapshot_versions(snapshot_root), default=0) + 1
+        final_dir = os.path.join(snapshot_root, f"v{version:04d}")
+        tmp_dir = final_dir + ".tmp"
+        if os.path.exists(tmp_dir):
+            shutil.rmtree(tmp_dir)
+        os.makedirs(tmp_dir)
+
+        ids, vectors = [], []
+        with open(os.path.join(tmp_dir, "payloads.jsonl"), "w", encoding="utf-8") as f:
+            for point in self.iter_points(with_payload=True, with_vectors=True):
+                ids.append(point.id)
+                vectors.append(point.vector)
+                f.write(json.dumps(point.payload) + "\n")
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1)
+        np.save(os.path.join(tmp_dir, "ids.npy"), np.asarray(ids, dtype=np.int64))
+        np.save(os.path.join(tmp_dir, "vectors.npy"), vectors)
+        manifest = {
+            "version": version,
+            "collection_name": self.collection_name,
+            "count": len(ids),
+            "vector_size": int(vectors.shape[1]) if len(ids) else self.embedder.dim,
+            "embedder": self.embedder.model_name,
+            "created_at": datetime.now().isoformat(),
+        }
+        with open(os.path.join(tmp_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_dir, final_dir)
+        return final_dir
+
+    def restore_snapshot(self, snapshot_root: str, version: int = None, batch_size: int = 1024) -> int:
+        """Replaces the collection with a snapshot (the latest one by default). Returns the restored version."""
+        versions = list_snapshot_versions(snapshot_root)
+        if not versions:
+            raise FileNotFoundError(f"No snapshots found in {snapshot_root}")
+        version = version or max(versions)
+        snapshot_dir = os.path.join(snapshot_root, f"v{version:04d}")
+        with open(os.path.join(snapshot_dir, "manifest.json"), "r") as f:
+            manifest = json.load(f)
+        if manifest["embedder"] != self.embedder.model_name:
+            raise ValueError(f"Snapshot was embedded with {manifest['embedder']}, not {self.embedder.model_name}")
+
+        ids = np.load(os.path.join(snapshot_dir, "ids.npy"), mmap_mode="r")
+        vectors = np.load(os.path.join(snapshot_dir, "vectors.npy"), mmap_mode="r")
+        self.create_collection(vector_size=manifest["vector_size"])
+        with open(os.path.join(snapshot_dir, "payloads.jsonl"), "r", encoding="utf-8") as f:
+            payloads = (json.loads(line) for line in f)
+            for start in range(0, len(ids), batch_size):
+                self.client.upsert(
+                    collection_name=self.collection_name,
+                    points=[
+                        models.PointStruct(id=int(point_id), vector=vector.tolist(), payload=next(payloads))
+                        for point_id, vector in zip(ids[start:start + batch_size], vectors[start:start + batch_size])
+                    ],
+                    wait=True,
+                )
+        return version
+
+    @staticmethod
+    def _geo_filter(geo_filter):
+        """Builds the payload filter matching a geometric descriptor, or None."""
+        if not geo_filter:
+            return None
+        return models.Filter(
+            must=[
+                models.FieldCondition(
+                    key="geometric_descriptor",
+                    match=models.MatchValue(value=geo_filter),
+                )
+            ]
+        )
+
+    def query(self, query_embedding, top_k=5, geo_filter=None, near_pose=None, radius=1.0, pose_covariance=None):
+        """
+        Queries the vector database with an optional geometric filter.
+
+        With `near_pose`, the semantic search is restricted to keyframes
+        within `radius` of that position (or inside its confidence ellipsoid
+        when `pose_covariance` is given), found through the spatial pose index.
+        """
+        query_filter = self._geo_filter(geo_filter)
+        if near_pose is not None:
+            with span("geometric_check"):
+                nearby_ids = self.keyframes_near(near_pose, radius=radius, covariance=pose_covariance)
+            if not nearby_ids:
+                return None
+            query_filter = query_filter or models.Filter(must=[])
+            query_filter.must.append(models.HasIdCondition(has_id=nearby_ids))
+        with span("search", top_k=top_k):
+            search_result = self.client.query_points(
+                collection_name=self.collection_name,
+                query=query_embedding,
+                query_filter=query_filter,
+                limit=top_k,
+                search_params=default_search_params(),
+            )
         if search_result and search_result.points:
             return search_result.points
-        return None
\ No newline at end of file
+        return None
+
+    def query_batch(self, query_embeddings, top_k=5, geo_filters=None):
+        """
+        Queries the vector database with many embeddings in one call.
+
+        `geo_filters` is either None, a single descriptor applied to every
+        query, or a list with one descriptor (or None) per query. Returns one
+        list of points per input embedding, in input order.
+        """
+        query_embeddings = [np.asarray(e, dtype=np.float32).tolist() for e in query_embeddings]
+        if geo_filters is None or isinstance(geo_filters, str):
+            geo_filters = [geo_filters] * len(query_embeddings)
+        requests = [
+            models.QueryRequest(
+                query=embedding,
+                filter=self._geo_filter(geo_filter),
+                limit=top_k,
+                params=default_search_params(),
+                with_payload=True,
+            )
+            for embedding, geo_filter in zip(query_embeddings, geo_filters)
+        ]
+        responses = self.client.query_batch_points(collection_name=self.collection_name, requests=requests)
+        return [response.points for response in responses]
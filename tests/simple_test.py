@@ -26,7 +26,7 @@ class SimpleTest(unittest.TestCase):
         query_embedding = self.db.get_embedding("a geometric caption", task_type="RETRIEVAL_QUERY")
         results = self.db.query(query_embedding, geo_filter="geo_1")
         self.assertEqual(len(results), 1)
-        self.assertEqual(results.id, 100)
+        self.assertEqual(results[0].id, 100)
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,74 @@
+import unittest
+import numpy as np
+from src.atropos_env import SLAMAtroposEnv, VectorSLAMAtroposEnv
+
+class TestSLAMAtroposEnv(unittest.TestCase):
+    def test_observations_are_independent_by_default(self):
+        env = SLAMAtroposEnv()
+        first, _ = env.reset(seed=0)
+        second, _, _, _, _ = env.step(0)
+        self.assertIsNot(first, second)
+        np.testing.assert_array_equal(first, np.array([30.0, 1.0, 50.0, 0.1, 0.2], dtype=np.float32))
+        self.assertEqual(second.dtype, np.float32)
+        self.assertTrue(env.observation_space.contains(second))
+
+    def test_step_can_reuse_observation_buffer(self):
+        env = SLAMAtroposEnv({"reuse_obs_buffer": True})
+        first, _ = env.reset(seed=0)
+        second, _, _, _, _ = env.step(0)
+        self.assertIs(first, second)
+
+    def test_seeded_noise_is_reproducible(self):
+        def rollout(seed):
+            env = SLAMAtroposEnv()
+            env.reset(seed=seed)
+            return np.stack([env.step(1)[0].copy() for _ in range(50)])
+
+        np.testing.assert_array_equal(rollout(7), rollout(7))
+        self.assertFalse(np.array_equal(rollout(7), rollout(8)))
+
+class TestVectorSLAMAtroposEnv(unittest.TestCase):
+    def test_matches_scalar_env_without_noise(self):
+        rng = np.random.default_rng(0)
+        actions = rng.integers(0, 3, size=(60, 4))
+        venv = VectorSLAMAtroposEnv(num_envs=4)
+        venv.drift_noise_std = 0.0
+        venv.reset(seed=0)
+        envs = [SLAMAtroposEnv() for _ in range(4)]
+        for env in envs:
+            env.drift_noise_std = 0.0
+            env.reset()
+
+        for step_actions in actions:
+            observations, rewards, terminations, _, _ = venv.step(step_actions)
+            for i, env in enumerate(envs):
+                observation, reward, terminated, _, _ = env.step(int(step_actions[i]))
+                np.testing.assert_allclose(observations[i], observation, rtol=1e-5, atol=1e-5)
+                self.assertAlmostEqual(rewards[i], reward, places=4)
+                self.assertEqual(terminations[i], terminated)
+
+    def test_seeded_rollouts_are_reproducible(self):
+        def rollout():
+            venv = VectorSLAMAtroposEnv(num_envs=8)
+            venv.reset(seed=42)
+            return np.stack([venv.step(np.full(8, 1))[0] for _ in range(10)])
+
+        np.testing.assert_array_equal(rollout(), rollout())
+
+    def test_same_step_autoreset(self):
+        venv = VectorSLAMAtroposEnv(num_envs=3, max_steps=5)
+        observations, _ = venv.reset(seed=0)
+        self.assertEqual(observations.shape, (3, 5))
+        self.assertTrue(venv.observation_space.contains(observations))
+        for _ in range(4):
+            _, _, terminations, _, infos = venv.step(np.zeros(3, dtype=np.int64))
+            self.assertFalse(terminations.any())
+            self.assertNotIn("final_obs", infos)
+
+        observations, _, terminations, _, infos = venv.step(np.zeros(3, dtype=np.int64))
+        self.assertTrue(terminations.all())
+        self.assertEqual(infos["final_obs"][0, 0], 5.0)  # 30 fps - 5 * 5
+        np.testing.assert_array_equal(observations, np.tile([30.0, 1.0, 50.0, 0.1, 0.2], (3, 1)).astype(np.float32))
+
+if __name__ == '__main__':
+    unittest.main()
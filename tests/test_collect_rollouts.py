@@ -0,0 +1,37 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from scripts.collect_rollouts import collect_rollouts
+
+def tree_digests(root: str) -> dict:
+    """Maps every file under `root`, by relative path, to the sha1 of its bytes."""
+    digests = {}
+    for directory, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(directory, name)
+            with open(path, "rb") as f:
+                digests[os.path.relpath(path, root)] = hashlib.sha1(f.read()).hexdigest()
+    return digests
+
+class TestCollectRollouts(unittest.TestCase):
+    def test_shards_do_not_depend_on_worker_count(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            outputs = {}
+            for num_workers in (1, 2):
+                output_dir = os.path.join(tmp_dir, f"workers_{num_workers}")
+                store = collect_rollouts(total_steps=250, output_dir=output_dir, num_shards=4,
+                                         num_workers=num_workers, seed=3)
+                self.assertEqual(len(store), 250)
+                outputs[num_workers] = tree_digests(output_dir)
+
+            other_seed = os.path.join(tmp_dir, "other_seed")
+            collect_rollouts(total_steps=250, output_dir=other_seed, num_shards=4, num_workers=2, seed=4)
+            other_seed_digests = tree_digests(other_seed)
+
+        self.assertEqual(outputs[1], outputs[2])
+        self.assertIn("manifest.json", outputs[1])
+        self.assertNotEqual(outputs[1], other_seed_digests)
+
+if __name__ == '__main__':
+    unittest.main()
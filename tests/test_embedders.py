@@ -0,0 +1,34 @@
+import unittest
+import numpy as np
+from src.embedders import LocalEmbedder, get_embedder
+
+class TestLocalEmbedder(unittest.TestCase):
+    def setUp(self):
+        self.embedder = LocalEmbedder()
+
+    def test_shape_and_normalization(self):
+        vectors = self.embedder.embed(["a desk with a monitor", "a kitchen sink", ""])
+        self.assertEqual(vectors.shape, (3, 768))
+        self.assertEqual(vectors.dtype, np.float32)
+        np.testing.assert_allclose(np.linalg.norm(vectors[:2], axis=1), 1.0, rtol=1e-5)
+        self.assertFalse(vectors[2].any())
+
+    def test_deterministic_across_instances(self):
+        texts = ["a desk with a computer monitor and a keyboard"]
+        np.testing.assert_array_equal(self.embedder.embed(texts), LocalEmbedder().embed(texts))
+
+    def test_similar_captions_score_higher(self):
+        query, near, far = self.embedder.embed([
+            "a desk with a computer monitor",
+            "a computer monitor on a wooden desk",
+            "a red car parked outside",
+        ])
+        self.assertGreater(query @ near, query @ far)
+
+    def test_get_embedder_rejects_unknown_backend(self):
+        self.assertIsInstance(get_embedder("local"), LocalEmbedder)
+        with self.assertRaises(ValueError):
+            get_embedder("word2vec")
+
+if __name__ == "__main__":
+    unittest.main()
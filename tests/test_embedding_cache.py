@@ -0,0 +1,70 @@
+import unittest
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.embedding_cache import EmbeddingCache
+
+class TestEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.calls = []
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def fake_embed(self, texts):
+        self.calls.append(list(texts))
+        return [np.full(8, len(text), dtype=np.float32) for text in texts]
+
+    def test_misses_only_hit_remote(self):
+        cache = EmbeddingCache(self.tmp_dir.name, dim=8)
+        first = cache.embed(["a", "bb", "a"], "model", "RETRIEVAL_DOCUMENT", self.fake_embed)
+        second = cache.embed(["bb", "ccc"], "model", "RETRIEVAL_DOCUMENT", self.fake_embed)
+        self.assertEqual(self.calls, [["a", "bb"], ["ccc"]])
+        self.assertEqual(first[0], first[2])
+        self.assertEqual(second[0], first[1])
+
+    def test_key_includes_task_type(self):
+        cache = EmbeddingCache(self.tmp_dir.name, dim=8)
+        cache.embed(["a"], "model", "RETRIEVAL_DOCUMENT", self.fake_embed)
+        cache.embed(["a"], "model", "RETRIEVAL_QUERY", self.fake_embed)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_persists_across_instances(self):
+        cache = EmbeddingCache(self.tmp_dir.name, dim=8, hot_size=1)
+        texts = [f"caption {i}" for i in range(2000)]
+        expected = cache.embed(texts, "model", "RETRIEVAL_DOCUMENT", self.fake_embed)
+        del cache
+
+        reopened = EmbeddingCache(self.tmp_dir.name, dim=8)
+        result = reopened.embed(texts, "model", "RETRIEVAL_DOCUMENT", self.fake_embed)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(result, expected)
+        self.assertEqual(len(reopened), 2000)
+
+    def test_rejects_dimension_mismatch(self):
+        EmbeddingCache(self.tmp_dir.name, dim=8)
+        with self.assertRaises(ValueError):
+            EmbeddingCache(self.tmp_dir.name, dim=16)
+
+    def test_concurrent_put_many(self):
+        cache = EmbeddingCache(self.tmp_dir.name, dim=8, hot_size=16)
+        # Each batch overlaps the next, and together they outgrow the initial 1024 rows.
+        batches = [[f"text {i}" for i in range(start, start + 300)] for start in range(0, 4000, 250)]
+
+        def put(batch):
+            keys = [cache.make_key("model", "RETRIEVAL_DOCUMENT", text) for text in batch]
+            cache.put_many(keys, [np.full(8, int(text.split()[1]), dtype=np.float32) for text in batch])
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(put, batches))
+
+        texts = {text for batch in batches for text in batch}
+        self.assertEqual(len(cache), len(texts))
+        reopened = EmbeddingCache(self.tmp_dir.name, dim=8, hot_size=1)
+        for text in texts:
+            vector = reopened.get(reopened.make_key("model", "RETRIEVAL_DOCUMENT", text))
+            np.testing.assert_array_equal(vector, np.full(8, int(text.split()[1])))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import time
+import numpy as np
+from src.embedding_scheduler import EmbeddingScheduler, TokenBucket
+
+class FakeEmbedder:
+    """Embeds each text as its length, after a fixed latency, optionally failing the first calls."""
+    dim = 4
+
+    def __init__(self, latency=0.0, failures=0):
+        self.latency = latency
+        self.failures = failures
+        self.calls = 0
+
+    def embed(self, texts, task_type="RETRIEVAL_DOCUMENT"):
+        self.calls += 1
+        time.sleep(self.latency)
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("429 Resource exhausted")
+        return np.array([[len(t)] * self.dim for t in texts], dtype=np.float32)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+class TestEmbeddingScheduler(unittest.TestCase):
+    def test_preserves_order_with_concurrency(self):
+        batches = [["x" * (i + 1)] * 3 for i in range(16)]
+        scheduler = EmbeddingScheduler(FakeEmbedder(latency=0.02), max_inflight=8)
+        start = time.perf_counter()
+        results = list(scheduler.embed_batches(batches))
+        elapsed = time.perf_counter() - start
+        self.assertEqual([batch for batch, _ in results], batches)
+        self.assertEqual([int(emb[0, 0]) for _, emb in results], list(range(1, 17)))
+        self.assertLess(elapsed, 16 * 0.02)
+        self.assertEqual(scheduler.stats["texts"], 48)
+        self.assertGreater(scheduler.throughput, 0)
+
+    def test_retries_failed_requests(self):
+        embedder = FakeEmbedder(failures=2)
+        scheduler = EmbeddingScheduler(embedder, max_inflight=1, base_delay=0.0)
+        results = list(scheduler.embed_batches([["a", "bb"]]))
+        self.assertEqual(results[0][1][:, 0].tolist(), [1.0, 2.0])
+        self.assertEqual(scheduler.stats["retries"], 2)
+        self.assertEqual(embedder.calls, 3)
+
+    def test_gives_up_after_max_retries(self):
+        scheduler = EmbeddingScheduler(FakeEmbedder(failures=10), max_inflight=1, max_retries=1, base_delay=0.0)
+        with self.assertRaises(RuntimeError):
+            list(scheduler.embed_batches([["a"]]))
+
+    def test_token_bucket_limits_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate_per_minute=60, capacity=2, clock=clock, sleep=clock.sleep)
+        for _ in range(5):
+            bucket.acquire()
+        # Two requests are served from the full bucket, the other three wait a second each.
+        self.assertAlmostEqual(clock.now, 3.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,313 @@
+import os
+import tempfile
+import unittest
+import gtsam
+import numpy as np
+from src.factor_graph import FactorGraphManager, checkpoint_references, prune_segments, write_json_atomic
+
+def noisy_square(n: int, seed: int = 0) -> list:
+    """Poses walking around a 10 m square, with drifting noise on the position."""
+    rng = np.random.default_rng(seed)
+    poses = []
+    for i in range(n):
+        t = 4.0 * i / n
+        side, frac = int(t), t - int(t)
+        corners = [(0, 0), (10, 0), (10, 10), (0, 10), (0, 0)]
+        x = corners[side][0] + frac * (corners[side + 1][0] - corners[side][0])
+        y = corners[side][1] + frac * (corners[side + 1][1] - corners[side][1])
+        poses.append(gtsam.Pose3(gtsam.Rot3(), gtsam.Point3(x, y, 0.0) + rng.normal(0, 0.05, 3) * i / n))
+    return poses
+
+class TestFactorGraph(unittest.TestCase):
+    def test_prior_and_odometry_constrain_the_graph(self):
+        poses = noisy_square(40)
+        manager = FactorGraphManager()
+        self.assertEqual(manager.add_poses(poses[:30]), list(range(30)))
+        for pose in poses[30:]:
+            manager.add_pose(pose)
+        # One prior plus one odometry factor per consecutive pair.
+        self.assertEqual(manager.graph.size(), len(poses))
+        self.assertIsInstance(manager.graph.at(0), gtsam.PriorFactorPose3)
+
+        # Without loop closures the odometry already agrees with the estimates.
+        result = manager.optimize()
+        self.assertLessEqual(manager.last_optimization["iterations"], 1)
+        np.testing.assert_allclose(result.atPose3(39).translation(), poses[39].translation(), atol=1e-6)
+
+    def test_batch_loop_closure_converges(self):
+        poses = noisy_square(40)
+        manager = FactorGraphManager()
+        manager.add_poses(poses)
+        manager.add_loop_closures([(39, 0, gtsam.Pose3(), 10.0)])
+        result = manager.optimize()
+        self.assertLess(manager.last_optimization["iterations"], 10)
+        self.assertLess(np.linalg.norm(result.atPose3(39).translation()), 0.5)
+        np.testing.assert_allclose(result.atPose3(0).translation(), poses[0].translation(), atol=1e-2)
+
+class TestRobustLoopClosures(unittest.TestCase):
+    def setUp(self):
+        self.poses = noisy_square(60)
+        # Two genuine revisits and one false positive claiming pose 30 is pose 0.
+        self.inliers = [
+            (59, 0, self.poses[59].between(self.poses[0]), 10.0),
+            (58, 1, self.poses[58].between(self.poses[1]), 10.0),
+        ]
+        self.outlier = (30, 0, gtsam.Pose3(), 10.0)
+
+    def max_error(self, manager) -> float:
+        result = manager.optimize()
+        return max(np.linalg.norm(result.atPose3(i).translation() - p.translation()) for i, p in enumerate(self.poses))
+
+    def test_pcm_rejects_inconsistent_closure(self):
+        manager = FactorGraphManager()
+        manager.add_poses(self.poses)
+        accepted = manager.add_loop_closures(self.inliers + [self.outlier], check_consistency=True)
+        self.assertEqual([c[:2] for c in accepted], [(59, 0), (58, 1)])
+        self.assertEqual(manager.loop_closure_stats, {"proposed": 3, "accepted": 2, "rejected": 1, "unchecked": 0})
+        self.assertLess(self.max_error(manager), 0.05)
+
+    def test_unknown_poses_are_not_checked(self):
+        manager = FactorGraphManager(incremental=True)
+        manager.add_poses(self.poses[:10])
+        accepted = manager.add_loop_closures([(9, 0, gtsam.Pose3(), 5.0), (100, 3, gtsam.Pose3(), 5.0)], check_consistency=True)
+        self.assertEqual(len(accepted), 2)
+        self.assertEqual(manager.loop_closure_stats["unchecked"], 1)
+
+    def test_robust_kernel_limits_outlier_damage(self):
+        errors = {}
+        for kernel in (None, "huber", "cauchy", "dcs"):
+            manager = FactorGraphManager(loop_closure_kernel=kernel)
+            manager.add_poses(self.poses)
+            manager.add_loop_closures(self.inliers + [self.outlier])
+            errors[kernel] = self.max_error(manager)
+        self.assertGreater(errors[None], 1.0)
+        self.assertLess(errors["dcs"], errors[None] / 5)
+        self.assertLess(errors["cauchy"], errors[None])
+
+    def test_unknown_kernel(self):
+        manager = FactorGraphManager()
+        manager.add_poses(self.poses[:2])
+        with self.assertRaises(ValueError):
+            manager.add_loop_closure(1, 0, gtsam.Pose3(), 1.0, kernel="tukey-ish")
+
+class TestIncrementalFactorGraph(unittest.TestCase):
+    def test_incremental_updates_track_batch_solution(self):
+        poses = noisy_square(60)
+        incremental = FactorGraphManager(incremental=True)
+        for i, pose in enumerate(poses):
+            incremental.add_pose(pose)
+            if i == len(poses) - 1:
+                incremental.add_loop_closure(i, 0, gtsam.Pose3(), confidence=10.0)
+            incremental.update()
+        self.assertEqual(incremental.latency_stats()["updates"], len(poses))
+
+        # A batch solve of the same graph must land on the same estimate.
+        batch = FactorGraphManager()
+        batch.graph = gtsam.NonlinearFactorGraph(incremental.graph)
+        batch.initial_estimates = gtsam.Values(incremental.initial_estimates)
+        expected = batch.optimize()
+        result = incremental.isam.calculateEstimate()
+        for i in range(len(poses)):
+            np.testing.assert_allclose(result.atPose3(i).translation(), expected.atPose3(i).translation(), atol=1e-2)
+        # The loop closure pulls the last pose back onto the first one.
+        self.assertLess(np.linalg.norm(result.atPose3(len(poses) - 1).translation()), 0.5)
+
+    def test_loop_closure_to_future_pose_waits_for_the_pose(self):
+        manager = FactorGraphManager(incremental=True)
+        manager.add_pose(gtsam.Pose3())
+        manager.add_loop_closure(0, 1, gtsam.Pose3(), confidence=5.0)
+        manager.update()
+        self.assertEqual(manager.pending_factor_count, 1)
+        manager.add_pose(gtsam.Pose3(gtsam.Rot3(), gtsam.Point3(0.2, 0.0, 0.0)))
+        estimate = manager.update()
+        self.assertEqual(estimate.size(), 2)
+        self.assertEqual(manager.isam.getFactorsUnsafe().size(), 3)
+        self.assertEqual(manager.pending_factor_count, 0)
+
+    def test_batch_mode_rejects_update(self):
+        with self.assertRaises(ValueError):
+            FactorGraphManager().update()
+
+    def test_load_state_rebuilds_isam(self):
+        manager = FactorGraphManager(incremental=True)
+        for pose in noisy_square(10):
+            manager.add_pose(pose)
+        manager.update()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manager.save_state(tmp_dir)
+            restored = FactorGraphManager(incremental=True)
+            restored.load_state(tmp_dir)
+        self.assertEqual(restored.next_pose_id, 10)
+        self.assertEqual(restored.update().size(), 10)
+
+class TestSparsification(unittest.TestCase):
+    def setUp(self):
+        # Drive 10 m, stand still for 50 keyframes, then drive back towards the start.
+        rng = np.random.default_rng(0)
+        xs = np.concatenate([np.linspace(0, 10, 20), np.full(50, 10.0) + rng.normal(0, 0.002, 50), np.linspace(9.5, 0.5, 30)])
+        self.poses = [gtsam.Pose3(gtsam.Rot3(), gtsam.Point3(x, 0.0, 0.0)) for x in xs]
+
+    def build(self):
+        manager = FactorGraphManager()
+        manager.add_poses(self.poses)
+        # Closures at a stationary keyframe that will be merged, and near the start.
+        manager.add_loop_closure(95, 40, self.poses[95].between(self.poses[40]), 10.0)
+        manager.add_loop_closure(99, 1, self.poses[99].between(self.poses[1]), 10.0)
+        return manager
+
+    def test_merges_stationary_keyframes_and_keeps_loop_closures(self):
+        reference = self.build()
+        expected = reference.optimize()
+        manager = self.build()
+        merged = manager.sparsify(min_translation=0.05, window=10)
+
+        # The stationary keyframes 20..69 all fold into keyframe 19, where the drive ended.
+        self.assertEqual(merged, {pose_id: 19 for pose_id in range(20, 70)})
+        self.assertEqual(manager.initial_estimates.size(), 50)
+        self.assertEqual(manager.graph.size(), 1 + 49 + 2)
+        result = manager.optimize()
+        for pose_id in manager.pose_ids:
+            np.testing.assert_allclose(result.atPose3(pose_id).translation(), expected.atPose3(pose_id).translation(), atol=0.02)
+
+    def test_recent_window_is_never_merged(self):
+        manager = self.build()
+        self.assertEqual(manager.sparsify(window=100), {})
+        merged = manager.sparsify(window=75)
+        self.assertTrue(all(pose_id < 25 for pose_id in merged))
+        with self.assertRaises(ValueError):
+            manager.sparsify(window=0)
+
+    def test_sparsified_graph_round_trips_and_keeps_growing(self):
+        manager = FactorGraphManager(incremental=True)
+        manager.add_poses(self.poses)
+        manager.update()
+        manager.sparsify(window=10)
+        manager.add_pose(gtsam.Pose3())
+        self.assertEqual(manager.update().size(), 51)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manager.save_state(tmp_dir)
+            restored = FactorGraphManager()
+            restored.load_state(tmp_dir)
+        self.assertEqual(restored.next_pose_id, 101)
+        self.assertEqual(restored.graph.size(), manager.graph.size())
+
+class TestFactorGraphCheckpoints(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "graph_state")
+        self.poses = noisy_square(50)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def assert_same_solution(self, a, b):
+        result_a, result_b = a.optimize(), b.optimize()
+        self.assertEqual(result_a.size(), result_b.size())
+        for i in range(result_a.size()):
+            self.assertTrue(result_a.atPose3(i).equals(result_b.atPose3(i), 1e-9))
+
+    def test_round_trip(self):
+        manager = FactorGraphManager(loop_closure_kernel="cauchy")
+        manager.add_poses(self.poses)
+        manager.add_loop_closure(49, 0, gtsam.Pose3(), 10.0)
+        manager.add_loop_closure(25, 3, gtsam.Pose3(), 2.0, kernel="huber")
+        manager.save_state(self.path)
+
+        restored = FactorGraphManager()
+        restored.load_state(self.path)
+        self.assertEqual(restored.graph.size(), manager.graph.size())
+        self.assertEqual(restored.next_pose_id, 50)
+        self.assertIsInstance(restored.graph.at(51).noiseModel(), gtsam.noiseModel.Robust)
+        self.assert_same_solution(manager, restored)
+
+    def test_delta_segments_only_hold_new_data(self):
+        manager = FactorGraphManager()
+        manager.add_poses(self.poses[:40])
+        first = manager.save_state(self.path)
+        manager.add_poses(self.poses[40:])
+        manager.add_loop_closure(49, 0, gtsam.Pose3(), 10.0)
+        latest = manager.save_state(self.path)
+
+        self.assertEqual(latest[:1], first)
+        with np.load(os.path.join(self.path, latest[1])) as segment:
+            self.assertEqual(segment["pose_ids"].tolist(), list(range(40, 50)))
+            self.assertEqual(len(segment["factors"]), 11)
+
+        restored = FactorGraphManager()
+        restored.load_state(self.path)
+        self.assert_same_solution(manager, restored)
+        old = FactorGraphManager()
+        old.load_state(self.path, segments=first)
+        self.assertEqual(old.initial_estimates.size(), 40)
+
+    def test_saving_an_older_state_starts_a_new_generation(self):
+        manager = FactorGraphManager()
+        manager.add_poses(self.poses[:20])
+        first = manager.save_state(self.path)
+        manager.add_poses(self.poses[20:])
+        latest = manager.save_state(self.path)
+
+        restored = FactorGraphManager()
+        restored.load_state(self.path, segments=first)
+        restored.add_pose(self.poses[20])
+        rewritten = restored.save_state(self.path)
+        self.assertEqual(len(rewritten), 1)
+        self.assertNotIn(rewritten[0], latest)
+        # By default the files of the earlier checkpoint are kept and still readable.
+        previous = FactorGraphManager()
+        previous.load_state(self.path, segments=latest)
+        self.assertEqual(previous.initial_estimates.size(), 50)
+        self.assertFalse(any(name.endswith(".tmp") for name in os.listdir(self.path)))
+        self.assertEqual(prune_segments(self.path), sorted(latest))
+        self.assertEqual(sorted(os.listdir(self.path)), sorted(rewritten + ["manifest.json"]))
+
+    def test_new_generation_prunes_superseded_segments(self):
+        manager = FactorGraphManager()
+        manager.add_poses(self.poses[:20])
+        first = manager.save_state(self.path)
+        manager.add_poses(self.poses[20:30])
+        manager.save_state(self.path)
+        self.assertTrue(manager.sparsify(min_translation=1e3, min_rotation=1e3, window=1))  # Forces a full checkpoint.
+        manager.add_poses(self.poses[30:])
+        rewritten = manager.save_state(self.path, prune=True)
+
+        self.assertEqual(len(rewritten), 1)
+        self.assertNotIn(rewritten[0], first)
+        self.assertEqual(sorted(os.listdir(self.path)), sorted(rewritten + ["manifest.json"]))
+        restored = FactorGraphManager()
+        restored.load_state(self.path)
+        self.assertEqual(restored.pose_ids, manager.pose_ids)
+        self.assertEqual(restored.graph.size(), manager.graph.size())
+
+    def test_pruning_keeps_segments_of_live_checkpoints(self):
+        root = self.tmp_dir.name
+
+        def checkpoint(manager, name):
+            # As save_atomic_checkpoint in ppo_control_loop: one directory per checkpoint, one shared graph_state.
+            segments = manager.save_state(self.path)
+            os.makedirs(os.path.join(root, name))
+            write_json_atomic(os.path.join(root, name, "graph_state.json"), {"path": self.path, "segments": segments})
+            prune_segments(self.path, keep=checkpoint_references(root, self.path))
+            return segments
+
+        manager = FactorGraphManager()
+        manager.add_poses(self.poses[:30])
+        first = checkpoint(manager, "ppo_slam_checkpoint_5")
+        self.assertTrue(manager.sparsify(min_translation=1e3, min_rotation=1e3, window=1))
+        manager.add_poses(self.poses[30:])
+        second = checkpoint(manager, "ppo_slam_checkpoint_10")
+        self.assertFalse(set(first) & set(second))
+
+        old = FactorGraphManager()
+        old.load_state(self.path, segments=first)
+        self.assertEqual(old.initial_estimates.size(), 30)
+        latest = FactorGraphManager()
+        latest.load_state(self.path)
+        self.assertEqual(latest.pose_ids, manager.pose_ids)
+
+        # Once the older checkpoint is gone, its segments are pruned.
+        os.remove(os.path.join(root, "ppo_slam_checkpoint_5", "graph_state.json"))
+        self.assertEqual(prune_segments(self.path, keep=checkpoint_references(root, self.path)), sorted(first))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from src.keyframe_map import keyframe_groundtruth_indices, load_keyframe_poses, nearest_indices, query_near_pose
+from src.trajectory_io import read_tum, write_tum
+from src.vector_db import VectorDB
+
+class TestKeyframeMap(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        # A fr1_xyz-like ground truth: small motion around (1.3, 0.6, 1.6).
+        self.stamps = 1305031102.0 + np.arange(100) * 0.03
+        positions = np.array([1.3, 0.6, 1.6]) + 0.2 * np.column_stack([
+            np.sin(np.arange(100) * 0.1), np.cos(np.arange(100) * 0.1), np.zeros(100),
+        ])
+        self.groundtruth_file = os.path.join(self.tmp_dir.name, "groundtruth.txt")
+        write_tum(self.groundtruth_file, self.stamps, positions)
+        self.captions_file = os.path.join(self.tmp_dir.name, "captions.txt")
+        self.keyframes = []
+        with open(self.captions_file, "w") as f:
+            for i, caption in enumerate(["a desk with a monitor", "a kitchen sink", "a sofa by a window"]):
+                filename = f"{self.stamps[i * 40] + 0.004:.6f}.png"
+                f.write(f"{filename}\t{caption}\n")
+                self.keyframes.append({"id": i, "filename": filename, "caption": caption})
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def build_map(self, poses):
+        db = VectorDB(collection_name="keyframes")
+        db.create_collection()
+        db.index_captions(self.captions_file, poses=poses)
+        return db
+
+    def test_nearest_indices(self):
+        np.testing.assert_array_equal(nearest_indices([0.0, 1.0, 2.0], [-1.0, 0.4, 0.6, 1.5, 9.0]), [0, 0, 1, 1, 2])
+        self.assertEqual(keyframe_groundtruth_indices(read_tum(self.groundtruth_file), self.keyframes),
+                         {keyframe["filename"]: i * 40 for i, keyframe in enumerate(self.keyframes)})
+
+    def test_query_at_groundtruth_position_finds_candidate(self):
+        db = self.build_map(load_keyframe_poses(self.groundtruth_file, self.keyframes))
+        self.assertEqual(len(db.pose_index), 3)
+        embedding = db.get_embedding("a kitchen sink", task_type="RETRIEVAL_QUERY")
+        # The PPO loop queries with the ground-truth position of the current step.
+        groundtruth = read_tum(self.groundtruth_file)
+        results = query_near_pose(db, embedding, groundtruth[40, 1:4], radius=1.0)
+        self.assertEqual([point.id for point in results], [1])
+        # The simulated estimate lives in another frame and matches nothing.
+        self.assertIsNone(db.query(embedding, top_k=1, near_pose=[4.0, np.sin(4.0), 0.0], radius=1.0))
+
+    def test_map_without_poses_is_searched_unrestricted(self):
+        db = self.build_map(load_keyframe_poses(os.path.join(self.tmp_dir.name, "missing.txt"), self.keyframes))
+        embedding = db.get_embedding("a kitchen sink", task_type="RETRIEVAL_QUERY")
+        results = query_near_pose(db, embedding, [1.3, 0.6, 1.6], radius=1.0)
+        self.assertEqual([point.id for point in results], [1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import tempfile
+import time
+import numpy as np
+from src.loop_closure_verifier import (
+    CaptionOverlapIndex, LoopClosureVerifier, StubVerificationModel, VerdictCache, tokenize,
+)
+
+CAPTIONS = [
+    (10, "a desk with a computer monitor and a keyboard"),
+    (11, "a photo of a kitchen with a sink"),
+    (12, "the keyboard on a desk"),
+    (13, ""),
+]
+
+def set_jaccard(a, b):
+    a, b = set(tokenize(a)), set(tokenize(b))
+    return len(a & b) / len(a | b) if a | b else 0.0
+
+class TestCaptionOverlapIndex(unittest.TestCase):
+    def test_scores_match_set_jaccard(self):
+        index = CaptionOverlapIndex(CAPTIONS)
+        live = "a computer keyboard on the desk near a window"
+        expected = [set_jaccard(live, caption) for _, caption in CAPTIONS]
+        np.testing.assert_allclose(index.scores(live), expected)
+        np.testing.assert_allclose(index.scores(live, [12, 10]), [expected[2], expected[0]])
+
+    def test_verify_thresholds_confidence(self):
+        index = CaptionOverlapIndex(CAPTIONS)
+        is_match, confidence = index.verify("kitchen sink", [10, 11])
+        np.testing.assert_array_equal(is_match, [False, True])
+        self.assertEqual(confidence[0], 0.0)
+        self.assertAlmostEqual(confidence[1], 2 / 3)
+
+    def test_unknown_ids_are_non_matches(self):
+        index = CaptionOverlapIndex(CAPTIONS)
+        is_match, confidence = index.verify("kitchen sink", [99, 11, 98])
+        np.testing.assert_array_equal(is_match, [False, True, False])
+        np.testing.assert_allclose(confidence, [0.0, 2 / 3, 0.0])
+        np.testing.assert_array_equal(index.scores("kitchen sink", [99]), [0.0])
+
+    def test_add_skips_known_ids(self):
+        index = CaptionOverlapIndex(CAPTIONS[:2])
+        index.add(CAPTIONS)
+        self.assertEqual(len(index), 4)
+        self.assertAlmostEqual(index.scores("keyboard desk", [12])[0], 1.0)
+
+class TestLoopClosureVerifier(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_candidates_are_verified_concurrently(self):
+        model = StubVerificationModel(latency_s=0.2)
+        verifier = LoopClosureVerifier(model, model_name="stub", max_workers=4)
+        start = time.monotonic()
+        match = verifier.first_match("kitchen sink", ["a desk", "a bed", "a sofa", "a kitchen sink"])
+        elapsed = time.monotonic() - start
+        verifier.close()
+        self.assertEqual(match, 3)
+        self.assertLess(elapsed, 0.6)
+
+    def test_verdicts_persist_across_runs(self):
+        model = StubVerificationModel()
+        verifier = LoopClosureVerifier(model, model_name="stub", cache=VerdictCache(self.tmp_dir.name))
+        self.assertIsNone(verifier.first_match("kitchen sink", ["a desk", "a bed"]))
+        verifier.close()
+        self.assertEqual(model.calls, 2)
+
+        verifier = LoopClosureVerifier(model, model_name="stub", cache=VerdictCache(self.tmp_dir.name))
+        self.assertFalse(verifier.verify("kitchen sink", "a desk"))
+        self.assertTrue(verifier.verify("kitchen sink", "the kitchen sink"))
+        verifier.close()
+        self.assertEqual(model.calls, 3)
+        self.assertEqual(verifier.cache.hits, 1)
+
+    def test_failed_model_call_is_a_non_match(self):
+        class FlakyModel(StubVerificationModel):
+            def generate_content(self, prompt):
+                if "a bed" in prompt:
+                    raise RuntimeError("quota exceeded")
+                return super().generate_content(prompt)
+
+        model = FlakyModel(latency_s=0.05)
+        verifier = LoopClosureVerifier(model, model_name="stub", cache=VerdictCache(self.tmp_dir.name))
+        self.assertEqual(verifier.first_match("kitchen sink", ["a bed", "a desk", "the kitchen sink"]), 2)
+        self.assertIsNone(verifier.first_match("kitchen sink", ["a bed", "a desk"]))
+        verifier.close()
+        self.assertEqual(verifier.failures, 2)
+        # The failed pair is retried next time rather than cached as "no".
+        self.assertIsNone(verifier.cache.get(VerdictCache.make_key("stub", "kitchen sink", "a bed")))
+        self.assertFalse(verifier.cache.get(VerdictCache.make_key("stub", "kitchen sink", "a desk")))
+
+if __name__ == '__main__':
+    unittest.main()
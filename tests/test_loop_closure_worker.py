@@ -0,0 +1,47 @@
+import unittest
+import threading
+import time
+from src.loop_closure_worker import LoopClosureWorker
+
+class TestLoopClosureWorker(unittest.TestCase):
+    def test_constraints_are_drained_on_the_caller_thread(self):
+        worker = LoopClosureWorker(lambda keyframe_id: (keyframe_id, 0, 1.0) if keyframe_id % 2 else None)
+        for keyframe_id in range(6):
+            worker.submit(keyframe_id)
+        remaining = worker.close()
+        self.assertEqual(remaining, [(1, 0, 1.0), (3, 0, 1.0), (5, 0, 1.0)])
+        self.assertEqual(worker.stats["processed"], 6)
+        self.assertEqual(worker.stats["constraints"], 3)
+
+    def test_full_queue_drops_oldest_without_blocking(self):
+        release = threading.Event()
+        seen = []
+
+        def process(keyframe_id):
+            release.wait()
+            seen.append(keyframe_id)
+
+        worker = LoopClosureWorker(process, max_queue=2)
+        worker.submit(0)
+        while worker.backlog:  # Wait until keyframe 0 is being processed.
+            time.sleep(0.001)
+        start = time.monotonic()
+        results = [worker.submit(keyframe_id) for keyframe_id in range(1, 6)]
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertEqual(results, [True, True, False, False, False])
+        release.set()
+        worker.close()
+        self.assertEqual(seen, [0, 4, 5])
+        self.assertEqual(worker.stats["dropped"], 3)
+
+    def test_failures_are_counted(self):
+        def process(keyframe_id):
+            raise RuntimeError("search backend unavailable")
+
+        worker = LoopClosureWorker(process)
+        worker.submit(0)
+        self.assertEqual(worker.close(), [])
+        self.assertEqual(worker.stats["failed"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import numpy as np
+from qdrant_client import models
+from src.pose_index import VoxelPoseIndex
+from src.vector_db import VectorDB
+
+class TestVoxelPoseIndex(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.positions = rng.uniform(-20, 20, size=(2000, 3))
+        self.index = VoxelPoseIndex(voxel_size=2.0)
+        self.index.add_many(range(len(self.positions)), self.positions)
+
+    def test_radius_query_matches_brute_force(self):
+        center = np.array([1.0, -3.0, 2.5])
+        for radius in (0.5, 3.0, 100.0):
+            expected = np.flatnonzero(np.linalg.norm(self.positions - center, axis=1) <= radius)
+            self.assertEqual(sorted(self.index.query_radius(center, radius).tolist()), expected.tolist())
+
+    def test_ellipsoid_query_matches_brute_force(self):
+        center = np.zeros(3)
+        covariance = np.diag([9.0, 1.0, 0.25])
+        delta = self.positions - center
+        mahalanobis_sq = np.einsum("ij,ij->i", delta @ np.linalg.inv(covariance), delta)
+        expected = np.flatnonzero(mahalanobis_sq <= 7.815)
+        self.assertEqual(sorted(self.index.query_ellipsoid(center, covariance).tolist()), expected.tolist())
+
+    def test_move_and_remove(self):
+        self.index.add(0, [100.0, 100.0, 100.0])
+        self.assertEqual(self.index.query_radius([100.0, 100.0, 100.0], 0.1).tolist(), [0])
+        self.index.remove(0)
+        self.assertEqual(len(self.index.query_radius([100.0, 100.0, 100.0], 0.1)), 0)
+        self.assertEqual(len(self.index), 1999)
+
+class TestPoseRestrictedQuery(unittest.TestCase):
+    def test_query_only_returns_nearby_keyframes(self):
+        for backend in ("qdrant", "numpy"):
+            db = VectorDB(collection_name="poses", backend=backend)
+            db.create_collection()
+            captions = [f"a desk with a monitor {i}" for i in range(20)]
+            ids = list(range(20))
+            embeddings = db.get_embedding(captions)
+            db.client.upsert(
+                collection_name="poses",
+                points=[models.PointStruct(id=i, vector=e, payload={"caption": c}) for i, e, c in zip(ids, embeddings, captions)],
+                wait=True,
+            )
+            for i in ids:
+                db.set_keyframe_pose(i, [float(i), 0.0, 0.0])
+
+            query_embedding = db.get_embedding("a desk with a monitor 3", task_type="RETRIEVAL_QUERY")
+            self.assertEqual(db.query(query_embedding, top_k=1)[0].id, 3)
+            results = db.query(query_embedding, top_k=10, near_pose=[15.0, 0.0, 0.0], radius=1.5)
+            self.assertEqual(sorted(p.id for p in results), [14, 15, 16])
+            self.assertIsNone(db.query(query_embedding, near_pose=[0.0, 50.0, 0.0], radius=1.0))
+
+if __name__ == "__main__":
+    unittest.main()
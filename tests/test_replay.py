@@ -0,0 +1,105 @@
+import unittest
+import os
+import tempfile
+from unittest import mock
+import numpy as np
+import src.replay
+from src.embedders import GEMINI_EMBEDDING_MODEL, LocalEmbedder, ReplayEmbedder, get_embedder
+from src.replay import ReplayGenerativeModel, ReplayMissError, ReplayStore
+
+class CountingEmbedder(LocalEmbedder):
+    def __init__(self):
+        super().__init__(dim=16)
+        self.calls = []
+
+    def embed(self, texts, task_type="RETRIEVAL_DOCUMENT"):
+        self.calls.append(list(texts))
+        return super().embed(texts, task_type=task_type)
+
+class EchoModel:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+        return type("Response", (), {"text": f"echo: {prompt} #{self.calls}"})()
+
+class TestReplayStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "replay.sqlite")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_embeddings_replay_offline(self):
+        embedder = CountingEmbedder()
+        recorder = ReplayEmbedder(ReplayStore(self.path, mode="auto"), embedder)
+        recorded = recorder.embed(["a desk", "a sofa", "a desk"])
+        recorder.embed(["a sofa", "a bed"])
+        self.assertEqual(embedder.calls, [["a desk", "a sofa"], ["a bed"]])
+        recorder.store.close()
+
+        store = ReplayStore(self.path, mode="replay")
+        replayer = ReplayEmbedder(store, model_name=embedder.model_name, dim=16)
+        np.testing.assert_array_equal(replayer.embed(["a desk", "a sofa", "a desk"]), recorded)
+        self.assertEqual(store.stats, {"replayed": 3, "recorded": 0})
+        with self.assertRaises(ReplayMissError):
+            replayer.embed(["a desk"], task_type="RETRIEVAL_QUERY")
+
+    def test_generations_replay_offline(self):
+        model = EchoModel()
+        recorder = ReplayGenerativeModel(ReplayStore(self.path, mode="auto"), model, "echo")
+        first = recorder.generate_content("same place?").text
+        self.assertEqual(recorder.generate_content("same place?").text, first)
+        self.assertEqual(model.calls, 1)
+        recorder.store.close()
+
+        replayer = ReplayGenerativeModel(ReplayStore(self.path, mode="replay"), None, "echo")
+        self.assertEqual(replayer.generate_content("same place?").text, first)
+        with self.assertRaises(ReplayMissError):
+            replayer.generate_content("another prompt")
+
+    def test_record_mode_overwrites(self):
+        model = EchoModel()
+        ReplayGenerativeModel(ReplayStore(self.path, mode="auto"), model, "echo").generate_content("p")
+        ReplayGenerativeModel(ReplayStore(self.path, mode="record"), model, "echo").generate_content("p")
+        replayer = ReplayGenerativeModel(ReplayStore(self.path, mode="replay"), None, "echo")
+        self.assertEqual(replayer.generate_content("p").text, "echo: p #2")
+
+class TestDefaultEmbedderReplay(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "replay.sqlite")
+        self.env = mock.patch.dict(os.environ, {"SLAM_REPLAY_MODE": "replay", "SLAM_REPLAY_PATH": self.path})
+        self.env.start()
+        for name in ("GEMINI_API_KEY", "EMBEDDER"):
+            os.environ.pop(name, None)
+        src.replay._default_store = None
+
+    def tearDown(self):
+        if src.replay._default_store is not None:
+            src.replay._default_store.close()
+        src.replay._default_store = None
+        self.env.stop()
+        self.tmp_dir.cleanup()
+
+    def test_default_serves_recorded_gemini_embeddings_without_key(self):
+        recorder = ReplayEmbedder(ReplayStore(self.path, mode="record"), LocalEmbedder())
+        recorder.model_name = GEMINI_EMBEDDING_MODEL  # Stands in for a recorded Gemini session.
+        recorded = recorder.embed(["a desk", "a sofa"])
+        recorder.store.close()
+
+        embedder = get_embedder()
+        self.assertIsInstance(embedder, ReplayEmbedder)
+        np.testing.assert_array_equal(embedder.embed(["a sofa", "a desk"]), recorded[::-1])
+        with self.assertRaises(ReplayMissError):
+            embedder.embed(["a bed"])
+
+    def test_default_fails_without_recordings(self):
+        with self.assertRaises(ValueError):
+            get_embedder()
+        self.assertIsInstance(get_embedder("local"), LocalEmbedder)
+
+if __name__ == '__main__':
+    unittest.main()
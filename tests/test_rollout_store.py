@@ -0,0 +1,84 @@
+import os
+import pickle
+import tempfile
+import unittest
+import numpy as np
+from src.rollout_store import RolloutStore, convert_pickle, write_chunk
+
+def make_columns(start: int, rows: int) -> dict:
+    steps = np.arange(start, start + rows)
+    return {
+        "obs": np.repeat(steps[:, None], 5, axis=1).astype(np.float32),
+        "action": steps % 3,
+        "reward": -steps.astype(np.float32),
+        "next_obs": np.repeat(steps[:, None] + 1, 5, axis=1).astype(np.float32),
+        "done": steps % 100 == 99,
+    }
+
+class TestRolloutStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "rollouts")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_append_and_reopen(self):
+        store = RolloutStore(self.path)
+        store.append(make_columns(0, 250))
+        store.append(make_columns(250, 100))
+
+        reopened = RolloutStore(self.path)
+        self.assertEqual(len(reopened), 350)
+        self.assertEqual(reopened.num_chunks, 2)
+        np.testing.assert_array_equal(reopened.column("reward"), -np.arange(350, dtype=np.float32))
+        self.assertIsInstance(next(reopened.iter_chunks())["obs"], np.memmap)
+
+    def test_get_crosses_chunks_in_request_order(self):
+        store = RolloutStore(self.path)
+        for start in range(0, 300, 100):
+            store.append(make_columns(start, 100))
+        indices = np.array([299, 0, 150, 99, 100])
+        batch = store.get(indices)
+        np.testing.assert_array_equal(batch["obs"][:, 0], indices)
+        np.testing.assert_array_equal(batch["action"], indices % 3)
+        np.testing.assert_array_equal(batch["done"], indices % 100 == 99)
+        with self.assertRaises(IndexError):
+            store.get([300])
+
+    def test_minibatches_cover_every_row_once(self):
+        store = RolloutStore(self.path)
+        store.append(make_columns(0, 70))
+        store.append(make_columns(70, 30))
+        seen = np.concatenate([b["obs"][:, 0] for b in store.iter_minibatches(32, np.random.default_rng(0))])
+        np.testing.assert_array_equal(np.sort(seen), np.arange(100))
+        self.assertEqual(len(store.sample(16, np.random.default_rng(0))["reward"]), 16)
+
+    def test_registered_chunks_must_match_schema(self):
+        store = RolloutStore(self.path)
+        store.append(make_columns(0, 10))
+        columns = make_columns(10, 10)
+        columns["obs"] = columns["obs"][:, :3]
+        write_chunk(self.path, "bad_chunk", columns)
+        with self.assertRaises(ValueError):
+            store.add_chunk("bad_chunk")
+        self.assertEqual(len(RolloutStore(self.path)), 10)
+
+    def test_convert_pickle(self):
+        columns = make_columns(0, 25)
+        rollouts = [
+            (columns["obs"][i], int(columns["action"][i]), float(columns["reward"][i]), columns["next_obs"][i], bool(columns["done"][i]))
+            for i in range(25)
+        ]
+        pkl_path = os.path.join(self.tmp_dir.name, "rollouts.pkl")
+        with open(pkl_path, "wb") as f:
+            pickle.dump(rollouts, f)
+
+        store = convert_pickle(pkl_path, self.path, chunk_size=10)
+        self.assertEqual(store.num_chunks, 3)
+        batch = store.get(np.arange(25))
+        for name, expected in columns.items():
+            np.testing.assert_array_equal(batch[name], expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+from src.sb3_vec_env import SB3VectorSLAMAtroposEnv
+
+class TestSB3VectorSLAMAtroposEnv(unittest.TestCase):
+    def setUp(self):
+        self.env = SB3VectorSLAMAtroposEnv(num_envs=4, max_steps=10)
+        self.env.seed(0)
+        self.env.reset()
+
+    def test_env_method_runs_once(self):
+        self.env.step(np.zeros(4, dtype=np.int64))
+        calls = []
+        original_reset = self.env.venv.reset
+
+        def counting_reset(**kwargs):
+            calls.append(kwargs)
+            return original_reset(**kwargs)
+
+        self.env.venv.reset = counting_reset
+        results = self.env.env_method("reset")
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 4)
+        np.testing.assert_array_equal(self.env.venv._step_count, 0)
+        with self.assertRaises(ValueError):
+            self.env.env_method("reset", indices=[1])
+
+    def test_get_and_set_attr(self):
+        self.assertEqual(self.env.get_attr("max_steps"), [10] * 4)
+        self.assertEqual(self.env.get_attr("max_steps", indices=[2]), [10])
+        self.env.set_attr("drift_noise_std", 0.0)
+        self.assertEqual(self.env.venv.drift_noise_std, 0.0)
+        self.env.set_attr("max_steps", 20, indices=range(4))
+        self.assertEqual(self.env.venv.max_steps, 20)
+        with self.assertRaises(ValueError):
+            self.env.set_attr("max_steps", 5, indices=[0, 1])
+        self.assertEqual(self.env.venv.max_steps, 20)
+
+    def test_step_reports_terminal_observation(self):
+        for _ in range(10):
+            self.env.step_async(np.zeros(4, dtype=np.int64))
+            observations, rewards, dones, infos = self.env.step_wait()
+        self.assertTrue(dones.all())
+        self.assertEqual(infos[0]["terminal_observation"][0], 0.0)  # 30 fps - 10 * 5, clipped
+        np.testing.assert_array_equal(observations[0], np.array([30.0, 1.0, 50.0, 0.1, 0.2], dtype=np.float32))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import json
+import os
+import tempfile
+import threading
+import time
+from src.tracing import Tracer
+
+class TestTracer(unittest.TestCase):
+    def test_stage_stats(self):
+        tracer = Tracer()
+        for duration_ms in range(1, 101):
+            tracer.record("embed", 0, duration_ms * 1_000_000)
+        with tracer.span("verify"):
+            time.sleep(0.01)
+        stats = tracer.stats()
+        self.assertEqual(stats["embed"]["count"], 100)
+        self.assertAlmostEqual(stats["embed"]["p50_ms"], 50.5)
+        self.assertAlmostEqual(stats["embed"]["p99_ms"], 99.01)
+        self.assertGreaterEqual(stats["verify"]["max_ms"], 10.0)
+        counts, _ = tracer.histogram("embed", bins=10)
+        self.assertEqual(counts.tolist(), [10] * 10)
+
+    def test_chrome_trace_export(self):
+        tracer = Tracer()
+        with tracer.span("keyframe"):
+            with tracer.span("search", top_k=5):
+                pass
+            worker = threading.Thread(target=lambda: tracer.record("verify", time.perf_counter_ns(), 1000))
+            worker.start()
+            worker.join()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "traces", "run.json")
+            tracer.export_chrome_trace(path)
+            with open(path) as f:
+                trace = json.load(f)
+        events = {event["name"]: event for event in trace["traceEvents"]}
+        self.assertEqual(set(events), {"keyframe", "search", "verify"})
+        self.assertNotEqual(events["verify"]["tid"], events["search"]["tid"])
+        self.assertEqual(events["search"]["ph"], "X")
+        self.assertEqual(events["search"]["args"], {"top_k": 5})
+        # Nested spans lie inside their parent on the same thread.
+        self.assertGreaterEqual(events["search"]["ts"], events["keyframe"]["ts"])
+        self.assertLessEqual(events["search"]["ts"] + events["search"]["dur"],
+                             events["keyframe"]["ts"] + events["keyframe"]["dur"])
+        self.assertIn("keyframe", trace["otherData"]["stages"])
+
+    def test_disabled_tracer_records_nothing(self):
+        tracer = Tracer(enabled=False)
+        with tracer.span("embed"):
+            pass
+        tracer.record("tracking_step", 0, 1_000_000)
+        self.assertEqual(tracer.stats(), {})
+
+    def test_durations_are_bounded(self):
+        tracer = Tracer(max_samples=50)
+        for duration_ms in range(1, 201):
+            tracer.record("embed", 0, duration_ms * 1_000_000)
+        stats = tracer.stats()["embed"]
+        self.assertEqual(stats["count"], 200)
+        self.assertAlmostEqual(stats["mean_ms"], 100.5)
+        self.assertEqual(stats["max_ms"], 200.0)
+        self.assertAlmostEqual(stats["p50_ms"], 175.5)  # Median of the last 50 spans
+        self.assertEqual(tracer.histogram("embed")[0].sum(), 50)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from src.trajectory_io import CACHE_SUFFIX, format_tum, read_tum, write_tum
+
+class TestTrajectoryIO(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "trajectory.txt")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        rng = np.random.default_rng(0)
+        timestamps = 1305031102.1753 + np.arange(50) * 0.033
+        positions = rng.normal(size=(50, 3))
+        quaternions = rng.normal(size=(50, 4))
+        write_tum(self.path, timestamps, positions, quaternions)
+        poses = read_tum(self.path, use_cache=False)
+        np.testing.assert_allclose(poses[:, 0], timestamps, rtol=0, atol=5e-7)
+        np.testing.assert_allclose(poses[:, 1:4], positions, atol=1e-9)
+        np.testing.assert_allclose(poses[:, 4:], quaternions, atol=1e-9)
+
+    def test_matches_line_parser(self):
+        with open(self.path, "w") as f:
+            f.write("# ground truth trajectory\n# timestamp tx ty tz qx qy qz qw\n")
+            f.write("1305031098.6659 1.3563 0.6305 1.6380 0.6132 0.5962 -0.3311 -0.3986\n")
+            f.write("1305031098.6758 1.3543 0.6306 1.6360 0.6129 0.5966 -0.3316 -0.3980\n")
+        poses = read_tum(self.path)
+        with open(self.path) as f:
+            expected = [[float(x) for x in line.split()] for line in f if not line.startswith("#")]
+        np.testing.assert_array_equal(poses, expected)
+        self.assertEqual(poses.dtype, np.float64)
+
+    def test_cache_is_reused_until_the_file_changes(self):
+        write_tum(self.path, [0.0, 1.0], [[0, 0, 0], [1, 2, 3]])
+        first = read_tum(self.path)
+        self.assertTrue(os.path.exists(self.path + CACHE_SUFFIX))
+        np.testing.assert_array_equal(first[:, 4:], [[0, 0, 0, 1], [0, 0, 0, 1]])
+
+        # An unchanged file is served from the sidecar without parsing.
+        stat = os.stat(self.path)
+        with open(self.path, "r+") as f:
+            text = f.read()
+            f.seek(0)
+            f.write(text.replace("1.000000 1.0", "9.000000 1.0"))
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        np.testing.assert_array_equal(read_tum(self.path), first)
+
+        write_tum(self.path, [0.0, 1.0, 2.0], [[0, 0, 0], [1, 2, 3], [4, 5, 6]])
+        self.assertEqual(len(read_tum(self.path)), 3)
+
+    def test_format_without_header(self):
+        text = format_tum([1.5], [[1, 2, 3]])
+        self.assertEqual(text, "1.500000 1.000000000 2.000000000 3.000000000 0.000000000 0.000000000 0.000000000 1.000000000\n")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from src.trajectory_metrics import (
+    associate, evaluate_directory, evaluate_trajectory, load_tum_trajectory, quaternions_to_matrices,
+    relative_pose_error, umeyama_alignment,
+)
+
+def random_quaternions(rng, n):
+    q = rng.normal(size=(n, 4))
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+def write_tum(path, stamps, positions, quaternions):
+    np.savetxt(path, np.column_stack([stamps, positions, quaternions]), header="timestamp tx ty tz qx qy qz qw")
+
+class TestTrajectoryMetrics(unittest.TestCase):
+    def test_associate_matches_nearest_neighbour_loop(self):
+        rng = np.random.default_rng(0)
+        stamps_ref = np.sort(rng.uniform(0, 10, 300))
+        stamps_est = np.sort(rng.uniform(0, 10, 120))
+        ref_indices, est_indices = associate(stamps_ref, stamps_est, max_diff=0.02)
+
+        expected_ref, expected_est = [], []
+        for i, stamp in enumerate(stamps_est):  # evo: loop over the shorter trajectory
+            diffs = np.abs(stamps_ref - stamp)
+            j = int(np.argmin(diffs))
+            if diffs[j] <= 0.02:
+                expected_ref.append(j)
+                expected_est.append(i)
+        np.testing.assert_array_equal(ref_indices, expected_ref)
+        np.testing.assert_array_equal(est_indices, expected_est)
+
+    def test_umeyama_recovers_similarity_transform(self):
+        rng = np.random.default_rng(1)
+        source = rng.normal(size=(50, 3))
+        rotation = quaternions_to_matrices(random_quaternions(rng, 1))[0]
+        target = 2.5 * source @ rotation.T + [1.0, -2.0, 0.5]
+        r, t, s = umeyama_alignment(source, target, with_scale=True)
+        np.testing.assert_allclose(r, rotation, atol=1e-9)
+        np.testing.assert_allclose(t, [1.0, -2.0, 0.5], atol=1e-9)
+        self.assertAlmostEqual(s, 2.5)
+
+    def test_rpe_is_invariant_to_rigid_motion(self):
+        rng = np.random.default_rng(2)
+        positions = np.cumsum(rng.normal(size=(40, 3)), axis=0)
+        rotations = quaternions_to_matrices(random_quaternions(rng, 40))
+        offset = quaternions_to_matrices(random_quaternions(rng, 1))[0]
+        moved_positions = positions @ offset.T + [3.0, 1.0, -1.0]
+        stats = relative_pose_error(positions, rotations, moved_positions, offset @ rotations)
+        self.assertLess(stats["rmse"], 1e-9)
+        self.assertLess(stats["rot_max"], 1e-5)
+
+        # Identity orientations: the per-step error is the change in position offset.
+        identity = np.tile(np.eye(3), (40, 1, 1))
+        shifted = positions + np.arange(40)[:, None] * [0.1, 0.0, 0.0]
+        stats = relative_pose_error(positions, identity, shifted, identity, delta=2)
+        self.assertAlmostEqual(stats["mean"], 0.2)
+
+    def test_evaluate_directory(self):
+        rng = np.random.default_rng(3)
+        stamps = np.arange(200) * 0.033
+        positions = np.cumsum(rng.normal(scale=0.05, size=(200, 3)), axis=0)
+        quaternions = random_quaternions(rng, 200)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            ground_truth_file = os.path.join(tmp_dir, "groundtruth.txt")
+            write_tum(ground_truth_file, stamps, positions, quaternions)
+            os.makedirs(os.path.join(tmp_dir, "rag-slam"))
+            write_tum(os.path.join(tmp_dir, "rag-slam", "seed0.txt"), stamps[::2] + 0.001, positions[::2] + 5.0,
+                      quaternions[::2])
+            noise = rng.normal(scale=0.02, size=(200, 3))
+            write_tum(os.path.join(tmp_dir, "noisy.txt"), stamps, positions + noise, quaternions)
+            with open(os.path.join(tmp_dir, "broken.txt"), "w") as f:
+                f.write("0.0 1.0 2.0\n")
+
+            rows = evaluate_directory(ground_truth_file, tmp_dir, workers=2)
+            ground_truth = load_tum_trajectory(ground_truth_file)
+
+        by_name = {os.path.basename(row["trajectory"]): row for row in rows}
+        self.assertEqual(set(by_name), {"seed0.txt", "noisy.txt", "broken.txt"})
+        self.assertIn("error", by_name["broken.txt"])
+        self.assertEqual(by_name["seed0.txt"]["matched"], 100)
+        self.assertLess(by_name["seed0.txt"]["ate_rmse"], 1e-9)  # A pure offset is removed by alignment.
+        noisy = by_name["noisy.txt"]
+        self.assertEqual(noisy, {"trajectory": noisy["trajectory"], **evaluate_trajectory(
+            ground_truth, (stamps, positions + noise, quaternions))})
+        self.assertAlmostEqual(noisy["ate_rmse"], 0.02 * np.sqrt(3), delta=0.01)
+
+if __name__ == '__main__':
+    unittest.main()
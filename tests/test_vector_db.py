@@ -1,6 +1,8 @@
 import unittest
 import os
+import tempfile
 import numpy as np
+from src.embedders import LocalEmbedder
 from src.vector_db import VectorDB
 from qdrant_client import models
 
@@ -23,6 +25,18 @@ class TestVectorDB(unittest.TestCase):
         result, _ = self.db.client.scroll(collection_name="test_collection")
         self.assertEqual(len(result), 3)
 
+    def test_streaming_ingestion_preserves_line_ids(self):
+        with open(self.captions_file, "a") as f:
+            f.write("malformed line without a tab\n")
+            for i in range(100):
+                f.write(f"frame{i}.jpg\tcaption number {i}\n")
+        self.assertTrue(self.db.index_captions(self.captions_file, batch_size=7, max_inflight=3))
+        result, _ = self.db.client.scroll(collection_name="test_collection", limit=1000)
+        self.assertEqual(len(result), 103)
+        payloads = {point.id: point.payload for point in result}
+        self.assertEqual(payloads[4], {"filename": "frame0.jpg", "caption": "caption number 0"})
+        self.assertNotIn(3, payloads)
+
     def test_geometric_pruning(self):
         # Add a point with a geometric descriptor
         self.db.client.upsert(
@@ -42,5 +56,207 @@ class TestVectorDB(unittest.TestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0].id, 100)
 
+    def test_query_batch_aligned_with_single_queries(self):
+        self.db.index_captions(self.captions_file)
+        embeddings = self.db.get_embedding(
+            ["a third test caption", "another test caption", "a test caption"], task_type="RETRIEVAL_QUERY"
+        )
+        batch_results = self.db.query_batch(embeddings, top_k=2)
+        self.assertEqual(len(batch_results), 3)
+        for embedding, points in zip(embeddings, batch_results):
+            self.assertEqual([p.id for p in points], [p.id for p in self.db.query(embedding, top_k=2)])
+        self.assertEqual(batch_results[1][0].payload["filename"], "file2.jpg")
+
+    def test_query_batch_per_query_filters(self):
+        self.db.index_captions(self.captions_file)
+        self.db.client.upsert(
+            collection_name="test_collection",
+            points=[
+                models.PointStruct(
+                    id=100,
+                    vector=np.random.rand(768).tolist(),
+                    payload={"caption": "a geometric caption", "geometric_descriptor": "geo_1"}
+                )
+            ],
+            wait=True,
+        )
+        embedding = self.db.get_embedding("a test caption", task_type="RETRIEVAL_QUERY")
+        filtered, unfiltered = self.db.query_batch([embedding, embedding], top_k=5, geo_filters=["geo_1", None])
+        self.assertEqual([p.id for p in filtered], [100])
+        self.assertEqual(len(unfiltered), 4)
+
+class TestPersistentVectorDB(unittest.TestCase):
+    backend = "qdrant"
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.captions_file = os.path.join(self.tmp_dir.name, "captions.txt")
+        with open(self.captions_file, "w") as f:
+            for i in range(10):
+                f.write(f"frame{i}.jpg\tcaption number {i}\n")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def open_db(self):
+        return VectorDB(collection_name="persistent", backend=self.backend, path=os.path.join(self.tmp_dir.name, "db"))
+
+    def test_warm_start_and_incremental_append(self):
+        db = self.open_db()
+        self.assertTrue(db.create_collection(recreate=False))
+        db.index_captions(self.captions_file, skip_existing=True)
+        self.assertEqual(db.count(), 10)
+        db.close()
+
+        with open(self.captions_file, "a") as f:
+            f.write("frame10.jpg\ta brand new caption\n")
+        db = self.open_db()
+        self.assertFalse(db.create_collection(recreate=False))
+        self.assertEqual(db.count(), 10)
+        embedded = []
+        original_embed = db.embedder.embed
+        db.embedder.embed = lambda texts, task_type: embedded.extend(texts) or original_embed(texts, task_type)
+        db.index_captions(self.captions_file, skip_existing=True)
+        self.assertEqual(embedded, ["a brand new caption"])
+        self.assertEqual(db.count(), 11)
+        query_embedding = original_embed(["caption number 3"], "RETRIEVAL_QUERY")[0].tolist()
+        self.assertEqual(db.query(query_embedding, top_k=1)[0].payload["filename"], "frame3.jpg")
+
+    def test_warm_start_rejects_a_different_embedder(self):
+        db = self.open_db()
+        db.create_collection(recreate=False)
+        db.index_captions(self.captions_file)
+        self.assertEqual(db.collection_metadata(), {"embedder": db.embedder.model_name, "dim": 768})
+        db.close()
+
+        other = VectorDB(collection_name="persistent", embedder=LocalEmbedder(ngram_range=(2, 4)),
+                         backend=self.backend, path=os.path.join(self.tmp_dir.name, "db"))
+        with self.assertRaises(ValueError):
+            other.create_collection(recreate=False)
+        self.assertTrue(other.create_collection(recreate=True))
+        self.assertEqual(other.count(), 0)
+        other.close()
+
+        with self.assertRaises(ValueError):
+            self.open_db().create_collection(recreate=False)
+
+    def test_snapshot_round_trip(self):
+        db = self.open_db()
+        db.create_collection()
+        db.index_captions(self.captions_file)
+        snapshot_root = os.path.join(self.tmp_dir.name, "snapshots")
+        self.assertTrue(db.save_snapshot(snapshot_root).endswith("v0001"))
+        db.save_snapshot(snapshot_root)
+
+        restored = VectorDB(collection_name="restored", embedder=db.embedder, backend=self.backend)
+        self.assertEqual(restored.restore_snapshot(snapshot_root), 2)
+        self.assertEqual(restored.count(), 10)
+        original = {p.id: p.payload for p in db.iter_points()}
+        self.assertEqual({p.id: p.payload for p in restored.iter_points()}, original)
+        mismatched = VectorDB(collection_name="mismatched", embedder=LocalEmbedder(ngram_range=(2, 4)), backend=self.backend)
+        with self.assertRaises(ValueError):
+            mismatched.restore_snapshot(snapshot_root)
+
+    def test_delete_points_survives_reopen(self):
+        db = self.open_db()
+        db.create_collection()
+        db.index_captions(self.captions_file, poses={f"frame{i}.jpg": [float(i), 0.0, 0.0] for i in range(10)})
+        db.delete_points([0, 4])
+        self.assertEqual(sorted(db.keyframes_near([4.0, 0.0, 0.0], radius=1.0)), [3, 5])
+        db.close()
+
+        db = self.open_db()
+        self.assertFalse(db.create_collection(recreate=False))
+        self.assertEqual(db.count(), 8)
+        self.assertEqual(sorted(p.id for p in db.iter_points()), [1, 2, 3, 5, 6, 7, 8, 9])
+        query_embedding = db.get_embedding("caption number 9", task_type="RETRIEVAL_QUERY")
+        self.assertEqual(db.query(query_embedding, top_k=1)[0].payload["filename"], "frame9.jpg")
+
+class TestPersistentNumpyVectorDB(TestPersistentVectorDB):
+    backend = "numpy"
+
+class TestNumpyBackend(TestVectorDB):
+    def setUp(self):
+        self.db = VectorDB(collection_name="test_collection", backend="numpy")
+        self.db.create_collection()
+        self.captions_file = "test_captions.txt"
+        with open(self.captions_file, "w") as f:
+            f.write("file1.jpg\ta test caption\n")
+            f.write("file2.jpg\tanother test caption\n")
+            f.write("file3.jpg\ta third test caption\n")
+
+    def test_matches_exact_qdrant_ranking(self):
+        reference = VectorDB(collection_name="test_collection", embedder=self.db.embedder)
+        reference.create_collection()
+        vectors = np.random.default_rng(0).normal(size=(200, 768))
+        for db in (self.db, reference):
+            db.client.upsert(
+                collection_name="test_collection",
+                points=[models.PointStruct(id=i, vector=v.tolist(), payload={}) for i, v in enumerate(vectors)],
+                wait=True,
+            )
+        query = vectors[7] + 0.1
+        expected = [p.id for p in reference.query(query.tolist(), top_k=10)]
+        results = self.db.query(query.tolist(), top_k=10)
+        self.assertEqual([p.id for p in results], expected)
+        self.assertEqual(results[0].id, 7)
+
+    def test_float16_storage(self):
+        db = VectorDB(collection_name="half", embedder=self.db.embedder, backend="numpy", dtype=np.float16)
+        db.create_collection()
+        self.assertTrue(db.index_captions(self.captions_file))
+        query_embedding = db.get_embedding("another test caption", task_type="RETRIEVAL_QUERY")
+        self.assertEqual(db.query(query_embedding, top_k=1)[0].payload["filename"], "file2.jpg")
+
+class TestQuantization(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.vectors = rng.normal(size=(2000, 768)).astype(np.float32)
+        self.queries = self.vectors[:50] + 0.3 * rng.normal(size=(50, 768)).astype(np.float32)
+
+    def build(self, quantization, backend="numpy", path=None):
+        db = VectorDB(collection_name="quantized", backend=backend, path=path)
+        db.create_collection(quantization=quantization)
+        db.client.upsert(
+            collection_name="quantized",
+            points=[models.PointStruct(id=i, vector=v.tolist(), payload={}) for i, v in enumerate(self.vectors)],
+            wait=True,
+        )
+        return db
+
+    def recall_at_10(self, db, reference):
+        hits = 0
+        for query in self.queries:
+            expected = {p.id for p in reference.query(query.tolist(), top_k=10)}
+            hits += len(expected & {p.id for p in db.query(query.tolist(), top_k=10)})
+        return hits / (10 * len(self.queries))
+
+    def test_rescored_recall_close_to_float(self):
+        reference = self.build(None)
+        self.assertGreater(self.recall_at_10(self.build("int8"), reference), 0.95)
+        binary = self.build("binary")
+        top_1 = [binary.query(query.tolist(), top_k=1)[0].id for query in self.queries]
+        self.assertEqual(top_1, list(range(len(self.queries))))
+
+    def test_rescored_scores_are_exact(self):
+        reference = self.build(None)
+        db = self.build("int8")
+        expected = reference.query(self.queries[0].tolist(), top_k=3)
+        results = db.query(self.queries[0].tolist(), top_k=3)
+        self.assertEqual([p.id for p in results], [p.id for p in expected])
+        self.assertAlmostEqual(results[0].score, expected[0].score, places=5)
+
+    def test_codes_survive_reopen(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db = self.build("int8", path=tmp_dir)
+            expected = [p.id for p in db.query(self.queries[0].tolist(), top_k=5)]
+            db.close()
+            reopened = VectorDB(collection_name="quantized", backend="numpy", path=tmp_dir)
+            self.assertEqual([p.id for p in reopened.query(self.queries[0].tolist(), top_k=5)], expected)
+
+    def test_qdrant_accepts_quantization(self):
+        db = self.build("int8", backend="qdrant")
+        self.assertEqual(db.query(self.vectors[5].tolist(), top_k=1)[0].id, 5)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file